@@ -1,21 +1,48 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt
 from flask_cors import CORS
 from flask_migrate import Migrate
 from dotenv import load_dotenv
 from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import text
+from sqlalchemy import text, event, Insert, Update, Delete
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
 import os
 import io
+import csv
+import random
+import re
+import json
+import base64
+import bisect
+import hashlib
+import heapq
+import sys
+import threading
+import time
+import unicodedata
+import uuid
+import zipfile
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import sqlite3
 import tempfile
 from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import partial, wraps
+from types import SimpleNamespace
+from xml.sax.saxutils import escape as xml_escape
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.units import inch
 import pandas as pd
+import numpy as np
 
 # Load environment variables
 load_dotenv()
@@ -26,10 +53,95 @@ app = Flask(__name__)
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///../instance/library.db')
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgres://'):
+    # Hosting providers still hand out the old scheme, which SQLAlchemy no longer accepts
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'postgresql://' + app.config['SQLALCHEMY_DATABASE_URI'][len('postgres://'):]
+# Connection pool: pre-ping drops connections the server closed; sizes apply to server databases
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_pre_ping': True}
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update(
+        pool_size=int(os.getenv('DB_POOL_SIZE', 10)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800))
+    )
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Reports and exports read through their own engine (see reporting_endpoint), with a small pool
+# and a statement timeout so they can't hold up the circulation desk. By default it is a
+# read-only connection to the same database; REPORTING_DATABASE_URL can point it at a replica.
+app.config['REPORTING_STATEMENT_TIMEOUT_MS'] = int(os.getenv('REPORTING_STATEMENT_TIMEOUT_MS', 60000))
+
+
+def reporting_bind(primary_uri):
+    """Engine options for the read-only 'reporting' bind"""
+    uri = os.getenv('REPORTING_DATABASE_URL') or primary_uri
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    url = make_url(uri)
+    timeout = app.config['REPORTING_STATEMENT_TIMEOUT_MS']
+    # Marks the engine's connections for limit_reporting_statement
+    options = {'pool_pre_ping': True, 'execution_options': {'reporting': True}}
+
+    backend = url.get_backend_name()
+    if backend == 'sqlite':
+        if not url.database or url.database == ':memory:':
+            options['url'] = url
+            return options
+        # Read-only URI connection; alongside a WAL writer it never takes a lock the desk waits on
+        database = url.database if url.database.startswith('file:') else 'file:' + url.database
+        url = url.set(database=database).update_query_dict({'mode': 'ro', 'uri': 'true'})
+    elif backend == 'postgresql':
+        options['connect_args'] = {
+            'options': f'-c default_transaction_read_only=on -c statement_timeout={timeout}'
+        }
+    elif backend == 'mysql':
+        options['connect_args'] = {
+            'init_command': f'SET SESSION transaction_read_only = 1, SESSION max_execution_time = {timeout}'
+        }
+
+    options.update(
+        url=url,
+        pool_size=int(os.getenv('REPORTING_POOL_SIZE', 4)),
+        max_overflow=int(os.getenv('REPORTING_MAX_OVERFLOW', 4)),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800))
+    )
+    return options
+
+app.config['SQLALCHEMY_BINDS'] = {'reporting': reporting_bind(app.config['SQLALCHEMY_DATABASE_URI'])}
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-string')
 # Set JWT token to expire after 8 hours (for gate entry sessions)
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=8)
+# Serve OPAC searches from an in-memory columnar copy of the books table in each worker (SQLite only,
+# see catalogue_snapshot_enabled)
+app.config['CATALOGUE_SNAPSHOT'] = os.getenv('CATALOGUE_SNAPSHOT', 'false').lower() == 'true'
+# Catalogue response cache: entries per worker, and an optional directory shared by workers on one host
+app.config['RESPONSE_CACHE_SIZE'] = int(os.getenv('RESPONSE_CACHE_SIZE', 512))
+app.config['RESPONSE_CACHE_DIR'] = os.getenv('RESPONSE_CACHE_DIR')
+# SQLite storage profile, applied to every new connection (see set_sqlite_pragmas)
+app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'wal')
+app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'normal')
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+app.config['SQLITE_CACHE_SIZE_KB'] = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+# Attempts for circulation and gate writes that hit a locked database
+app.config['DB_BUSY_RETRIES'] = int(os.getenv('DB_BUSY_RETRIES', 4))
+# Hot/cold archival: returned loans and gate logs older than these many days move to the
+# archive tables (0 keeps them live), in chunks of ARCHIVE_BATCH_SIZE rows per transaction
+app.config['ARCHIVE_CIRCULATIONS_AFTER_DAYS'] = int(os.getenv('ARCHIVE_CIRCULATIONS_AFTER_DAYS', 730))
+app.config['ARCHIVE_GATE_LOGS_AFTER_DAYS'] = int(os.getenv('ARCHIVE_GATE_LOGS_AFTER_DAYS', 180))
+app.config['ARCHIVE_BATCH_SIZE'] = int(os.getenv('ARCHIVE_BATCH_SIZE', 2000))
+# Bulk imports insert and commit this many rows per transaction (and streamed CSV imports read
+# this many at a time), reporting at most IMPORT_ERROR_SAMPLE row errors when streaming
+app.config['IMPORT_CHUNK_SIZE'] = int(os.getenv('IMPORT_CHUNK_SIZE', 1000))
+app.config['IMPORT_ERROR_SAMPLE'] = int(os.getenv('IMPORT_ERROR_SAMPLE', 100))
+# Background import jobs (?background=true) run on a pool of this many threads per process;
+# 0 runs each job inline as soon as it is queued
+app.config['IMPORT_JOB_WORKERS'] = int(os.getenv('IMPORT_JOB_WORKERS', 2))
+# Bulk user imports hash passwords on a pool of this many processes (1 hashes in the request)
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+# Catalogue exports read the books table and send it on in batches of this many rows
+app.config['CATALOGUE_EXPORT_BATCH_SIZE'] = int(os.getenv('CATALOGUE_EXPORT_BATCH_SIZE', 5000))
 # Upload folder configuration
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 
@@ -38,8 +150,18 @@ import logging
 logging.basicConfig(level=logging.INFO)
 app.logger.setLevel(logging.INFO)
 
+class RoutingSession(FlaskSQLAlchemySession):
+    """Reads go to the 'reporting' engine while session.info['reporting'] is set (see
+    reporting_endpoint); flushes and INSERT/UPDATE/DELETE statements always use the primary"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and self.info.get('reporting') and not self._flushing
+                and not isinstance(clause, (Insert, Update, Delete))):
+            return self._db.engines['reporting']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 # Initialize extensions
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 jwt = JWTManager(app)
 
 # CORS configuration for localhost development
@@ -51,6 +173,107 @@ CORS(app,
 
 migrate = Migrate(app, db)
 
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers (reports, OPAC) run alongside the single writer; busy_timeout makes
+    writers queue for the lock instead of failing straight away with "database is locked"."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        journal_mode = app.config['SQLITE_JOURNAL_MODE']
+        if journal_mode and re.fullmatch(r'[a-zA-Z]+', journal_mode):
+            try:
+                cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+            except sqlite3.OperationalError:
+                pass  # read-only (reporting) connection; the writer sets the journal mode
+        synchronous = app.config['SQLITE_SYNCHRONOUS']
+        if synchronous and re.fullmatch(r'[a-zA-Z]+', synchronous):
+            cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        cursor.execute(f"PRAGMA mmap_size = {int(app.config['SQLITE_MMAP_SIZE'])}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size = {-int(app.config['SQLITE_CACHE_SIZE_KB'])}")
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def limit_reporting_statement(conn, cursor, statement, parameters, context, executemany):
+    """Interrupt SQLite report queries that run past REPORTING_STATEMENT_TIMEOUT_MS. Server
+    databases enforce the timeout themselves (see reporting_bind)."""
+    timeout = app.config['REPORTING_STATEMENT_TIMEOUT_MS']
+    if timeout <= 0 or not conn.get_execution_options().get('reporting'):
+        return
+    dbapi_connection = conn.connection.dbapi_connection
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    limits = conn.info  # lives as long as the DBAPI connection
+    limits['deadline'] = time.monotonic() + timeout / 1000
+    if 'progress_handler' not in limits:
+        dbapi_connection.set_progress_handler(lambda: time.monotonic() > limits['deadline'], 10000)
+        limits['progress_handler'] = True
+
+
+def reporting_endpoint(view):
+    """Run a report or export view's reads on the read-only reporting engine, so its long
+    SELECTs don't share connections or locks with circulation writes"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        db.session.info['reporting'] = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            db.session.info.pop('reporting', None)
+    return wrapper
+
+
+def month_bucket(column):
+    """`column` truncated to a 'YYYY-MM' string, for monthly GROUP BYs on any backend"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        # Inlined rather than bound: PostgreSQL only matches the SELECT and GROUP BY expressions
+        # when they are textually the same, and each bind would get its own placeholder
+        return db.func.to_char(column, db.literal_column("'YYYY-MM'"))
+    if dialect in ('mysql', 'mariadb'):
+        return db.func.date_format(column, '%Y-%m')
+    return db.func.strftime('%Y-%m', column)
+
+
+def is_database_busy(error):
+    """Whether an OperationalError is SQLite lock contention, which is worth retrying"""
+    message = str(getattr(error, 'orig', error)).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def retry_on_busy(view):
+    """Re-run a write view from the start when SQLite reports the database as locked.
+
+    busy_timeout already waits for the write lock, but a transaction that read before
+    writing can still fail once another desk commits first; re-running it on a fresh
+    snapshot is then the only fix. The view must let busy errors propagate
+    (see is_database_busy). Gives up with a 503 after DB_BUSY_RETRIES attempts.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        attempts = max(1, app.config['DB_BUSY_RETRIES'])
+        for attempt in range(attempts):
+            try:
+                return view(*args, **kwargs)
+            except OperationalError as e:
+                db.session.rollback()
+                if not is_database_busy(e):
+                    return jsonify({'error': str(e)}), 500
+                if attempt + 1 < attempts:
+                    # Jittered exponential backoff so competing desks don't retry in lockstep
+                    time.sleep(random.uniform(0.5, 1.0) * 0.05 * 2 ** attempt)
+        app.logger.warning(f"{view.__name__}: database still locked after {attempts} attempts")
+        response = jsonify({'error': 'The database is busy. Please try again.'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    return wrapper
+
 # Define models inline
 class College(db.Model):
     __tablename__ = 'colleges'
@@ -99,7 +322,12 @@ class User(db.Model):
     profile_picture = db.Column(db.String(255), nullable=True)  # Profile picture path
     is_active = db.Column(db.Boolean, default=True)
     first_login_completed = db.Column(db.Boolean, default=False)  # Track if user has completed mandatory password change
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        # Active-member lookups: role + is_active + validity_date > today
+        db.Index('ix_users_role_active_validity', 'role', 'is_active', 'validity_date'),
+    )
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -129,15 +357,20 @@ class User(db.Model):
 
     def is_expired(self):
         """Check if the user account has expired (including accounts expiring today)"""
-        from datetime import date
-        if not self.validity_date:
-            return False
-        return date.today() >= self.validity_date
+        return User.validity_expired(self.validity_date)
 
     def is_account_active(self):
         """Check if the user account is active and not expired"""
         return self.is_active and not self.is_expired()
 
+    @staticmethod
+    def validity_expired(validity_date):
+        """is_expired() for a bare validity date, e.g. from a column-only query"""
+        from datetime import date
+        if not validity_date:
+            return False
+        return date.today() >= validity_date
+
     @staticmethod
     def get_active_users():
         """Get all users who are active and not expired"""
@@ -169,9 +402,14 @@ class User(db.Model):
 
     def get_expiration_status(self):
         """Get detailed expiration status information"""
-        from datetime import date, timedelta
+        return User.expiration_status_for(self.validity_date)
+
+    @staticmethod
+    def expiration_status_for(validity_date):
+        """get_expiration_status() for a bare validity date"""
+        from datetime import date
 
-        if not self.validity_date:
+        if not validity_date:
             return {
                 'is_expired': False,
                 'status': 'no_expiration',
@@ -180,7 +418,7 @@ class User(db.Model):
             }
 
         today = date.today()
-        days_remaining = (self.validity_date - today).days
+        days_remaining = (validity_date - today).days
 
         if days_remaining < 0:
             return {
@@ -217,7 +455,7 @@ class Book(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     access_no = db.Column(db.String(50), nullable=False, unique=True)
-    title = db.Column(db.String(200), nullable=False)
+    title = db.Column(db.String(200), nullable=False, index=True)
     # Multiple authors support
     author_1 = db.Column(db.String(200), nullable=False)  # Primary author (required)
     author_2 = db.Column(db.String(200), nullable=True)   # Optional
@@ -227,16 +465,34 @@ class Book(db.Model):
     author = db.Column(db.String(200), nullable=True)
     publisher = db.Column(db.String(100))
     department = db.Column(db.String(100))
-    category = db.Column(db.String(50))
+    category = db.Column(db.String(50), index=True)
     location = db.Column(db.String(50))
     number_of_copies = db.Column(db.Integer, default=1)
     available_copies = db.Column(db.Integer, default=1)
     isbn = db.Column(db.String(20))
+    # Canonical ISBN-13 derived from isbn, for indexed exact-match lookups
+    isbn13 = db.Column(db.String(13), index=True)
     # New mandatory fields
     pages = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Numeric(10, 2), nullable=False)  # Decimal field for price
     edition = db.Column(db.String(50), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Circulation counters, bumped by record_book_issue and rebuilt by reconcile_book_circulation_counters
+    issue_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    last_issued_at = db.Column(db.DateTime)
+    issue_count_30d = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        # Top-books ORDER BY ... LIMIT and rank lookups; id breaks ties
+        db.Index('ix_books_issue_count', 'issue_count', 'id'),
+        db.Index('ix_books_issue_count_30d', 'issue_count_30d', 'id'),
+    )
+
+    @db.validates('isbn')
+    def _set_isbn13(self, key, value):
+        """Keep isbn13 in step with every write to isbn"""
+        self.isbn13 = normalize_isbn(value)
+        return value
 
 class Ebook(db.Model):
     __tablename__ = 'ebooks'
@@ -292,7 +548,7 @@ class Circulation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False)
-    issue_date = db.Column(db.DateTime, default=datetime.utcnow)
+    issue_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     due_date = db.Column(db.DateTime, nullable=False)
     return_date = db.Column(db.DateTime)
     status = db.Column(db.String(20), default='issued')  # issued, returned, overdue
@@ -301,6 +557,13 @@ class Circulation(db.Model):
     renewal_count = db.Column(db.Integer, default=0)
     max_renewals = db.Column(db.Integer, default=2)
 
+    __table_args__ = (
+        db.Index('ix_circulations_user_status', 'user_id', 'status'),
+        db.Index('ix_circulations_book_status', 'book_id', 'status'),
+        # Overdue sweeps: status = 'issued' AND due_date < now
+        db.Index('ix_circulations_status_due_date', 'status', 'due_date'),
+    )
+
     # Relationships
     user = db.relationship('User', backref='circulations')
     book = db.relationship('Book', backref='circulations')
@@ -348,6 +611,11 @@ class Reservation(db.Model):
     queue_position = db.Column(db.Integer)  # Position in reservation queue
     notes = db.Column(db.Text)  # Additional notes
 
+    __table_args__ = (
+        # Reservation queue of a book, already in queue order
+        db.Index('ix_reservations_book_status_queue', 'book_id', 'status', 'queue_position'),
+    )
+
     # Relationships
     user = db.relationship('User', backref='reservations')
     book = db.relationship('Book', backref='reservations')
@@ -378,6 +646,11 @@ class Fine(db.Model):
     paid_date = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_fines_user_status', 'user_id', 'status'),
+        db.Index('ix_fines_circulation_status', 'circulation_id', 'status'),
+    )
+
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id], backref='fines')
     circulation = db.relationship('Circulation', backref='fines')
@@ -562,12 +835,54 @@ class GateEntryLog(db.Model):
     exit_time = db.Column(db.DateTime, nullable=True)
     status = db.Column(db.String(20), default='in')  # in, out
     scanned_by = db.Column(db.Integer, db.ForeignKey('gate_entry_credentials.id'), nullable=False)
-    created_date = db.Column(db.DateTime, default=datetime.now)  # Use local time
+    created_date = db.Column(db.DateTime, default=datetime.now, index=True)  # Use local time
+
+    __table_args__ = (
+        # A member's latest gate entry, and their entries in a date range
+        db.Index('ix_gate_entry_logs_user_created_date', 'user_id', 'created_date'),
+    )
 
     # Relationships
     user = db.relationship('User', backref='gate_logs')
     scanned_by_credential = db.relationship('GateEntryCredential', backref='scanned_logs')
 
+# Archive tables: closed loans and old gate logs moved out of the hot tables by
+# archive_history(). Same columns and ids as the live rows; no foreign keys, so books and
+# credentials can still be edited or removed freely.
+class CirculationArchive(db.Model):
+    __tablename__ = 'circulations_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    book_id = db.Column(db.Integer, nullable=False)
+    issue_date = db.Column(db.DateTime, index=True)
+    due_date = db.Column(db.DateTime, nullable=False)
+    return_date = db.Column(db.DateTime)
+    status = db.Column(db.String(20))
+    fine_amount = db.Column(db.Float)
+    renewal_count = db.Column(db.Integer)
+    max_renewals = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index('ix_circulations_archive_user_id', 'user_id'),
+        db.Index('ix_circulations_archive_book_id', 'book_id'),
+    )
+
+class GateEntryLogArchive(db.Model):
+    __tablename__ = 'gate_entry_logs_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    entry_time = db.Column(db.DateTime)
+    exit_time = db.Column(db.DateTime)
+    status = db.Column(db.String(20))
+    scanned_by = db.Column(db.Integer, nullable=False)
+    created_date = db.Column(db.DateTime, index=True)
+
+    __table_args__ = (
+        db.Index('ix_gate_entry_logs_archive_user_created_date', 'user_id', 'created_date'),
+    )
+
 # Holiday model for holiday management (prevents fines on holidays)
 class Holiday(db.Model):
     __tablename__ = 'holidays'
@@ -622,6 +937,161 @@ class Holiday(db.Model):
         
         return holidays
 
+# Precomputed OPAC facet counts (books per category, department and availability)
+class BookFacetCount(db.Model):
+    __tablename__ = 'book_facet_counts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    facet = db.Column(db.String(20), nullable=False)  # category, department, availability
+    value = db.Column(db.String(100), nullable=False)  # '' when the book has no value
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (db.UniqueConstraint('facet', 'value'),)
+
+# Daily circulation rollup per college and department, maintained on issue and return.
+# Loans are counted against the day they were issued, so a period's returned, overdue and
+# fine figures describe the loans issued in that period, like the raw reports did.
+class CirculationDailyStat(db.Model):
+    __tablename__ = 'circulation_daily_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    college_id = db.Column(db.Integer)  # NULL for members without a college/department
+    department_id = db.Column(db.Integer)
+    issued = db.Column(db.Integer, nullable=False, default=0)
+    returned = db.Column(db.Integer, nullable=False, default=0)
+    overdue = db.Column(db.Integer, nullable=False, default=0)  # returned after the due date
+    fined = db.Column(db.Integer, nullable=False, default=0)
+    fine_total = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.Index('ix_circulation_daily_stats_date_college_department', 'date', 'college_id', 'department_id'),
+    )
+
+# Named counters bumped by writes, used to invalidate cached responses across workers
+class CacheGeneration(db.Model):
+    __tablename__ = 'cache_generations'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+# Trigram index for typo-tolerant search: the vocabulary of normalized title/author words
+# and the trigrams of each word (trigram -> term postings, clustered by word length)
+class SearchTerm(db.Model):
+    __tablename__ = 'search_terms'
+
+    id = db.Column(db.Integer, primary_key=True)
+    term = db.Column(db.String(100), nullable=False, unique=True)
+    length = db.Column(db.Integer, nullable=False)
+
+class SearchTermTrigram(db.Model):
+    __tablename__ = 'search_term_trigrams'
+
+    trigram = db.Column(db.String(3), primary_key=True)
+    term_length = db.Column(db.Integer, primary_key=True)
+    term_id = db.Column(db.Integer, db.ForeignKey('search_terms.id'), primary_key=True)
+
+# Change log of book rows, written by triggers, so catalogue snapshots can refresh incrementally
+class BookChange(db.Model):
+    __tablename__ = 'book_changes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, nullable=False)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+# Distinct author names across author_1..author_4 and the legacy author column, linked to
+# their books through book_authors and kept in step by sync_book_authors on every book write
+class Author(db.Model):
+    __tablename__ = 'authors'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)  # as first catalogued
+    normalized_name = db.Column(db.String(200), nullable=False, unique=True)
+
+class BookAuthor(db.Model):
+    __tablename__ = 'book_authors'
+
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id'), primary_key=True)
+    author_id = db.Column(db.Integer, db.ForeignKey('authors.id'), primary_key=True)
+    position = db.Column(db.Integer, nullable=False)  # 1 for the primary author
+
+    __table_args__ = (
+        # Author filter: matching author ids -> their books
+        db.Index('ix_book_authors_author_book', 'author_id', 'book_id'),
+    )
+
+# Every word-suffix of each normalized author name ("john ronald smith", "ronald smith",
+# "smith"), so a filter can match any word of a name with one index range scan
+class AuthorNameKey(db.Model):
+    __tablename__ = 'author_name_keys'
+
+    key = db.Column(db.String(200), primary_key=True)
+    author_id = db.Column(db.Integer, db.ForeignKey('authors.id'), primary_key=True)
+
+# Bulk imports queued with ?background=true: the upload spooled to `path`, and progress
+# written back after every committed chunk so any worker process can report it
+class ImportJob(db.Model):
+    __tablename__ = 'import_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # books, users, ebooks, journals, holidays
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    filename = db.Column(db.String(255))
+    path = db.Column(db.String(500))
+    params = db.Column(db.Text)  # JSON keyword arguments for the kind's import function
+    checkpoint_key = db.Column(db.String(64))  # ImportCheckpoint of the upload
+    rows = db.Column(db.Integer, nullable=False, default=0)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    rejected = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.Text)  # JSON list, the first IMPORT_ERROR_SAMPLE row errors
+    errors_truncated = db.Column(db.Boolean, default=False)
+    message = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_import_jobs_created_by_created_at', 'created_by', 'created_at'),
+    )
+
+    def to_dict(self):
+        finished = self.finished_at or datetime.utcnow()
+        elapsed = (finished - self.started_at).total_seconds() if self.started_at else 0
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'filename': self.filename,
+            'rows': self.rows,
+            'created': self.created,
+            'rejected': self.rejected,
+            'errors': json.loads(self.errors) if self.errors else [],
+            'errors_truncated': bool(self.errors_truncated),
+            'message': self.message,
+            'rows_per_second': round(self.rows / elapsed, 1) if elapsed > 0 else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+# How far each unfinished bulk import has got, keyed by the upload's content
+# (upload_checkpoint_key): sheet chunks committed so far, the ones to retry and the totals of
+# the rest, so uploading the same file again carries on instead of rejecting the rows already
+# imported. The row goes once every chunk is in.
+class ImportCheckpoint(db.Model):
+    __tablename__ = 'import_checkpoints'
+
+    key = db.Column(db.String(64), primary_key=True)
+    chunks_done = db.Column(db.Integer, nullable=False, default=0)
+    pending_chunks = db.Column(db.Text)  # JSON list, chunks before chunks_done whose inserts failed
+    rows = db.Column(db.Integer, nullable=False, default=0)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    rejected = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.Text)  # JSON list, the first IMPORT_ERROR_SAMPLE row errors
+    errors_truncated = db.Column(db.Boolean, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Note: Blueprint imports commented out due to circular import issues
 # Will add routes directly to app for now
 # from routes.admin import admin_bp
@@ -907,6 +1377,183 @@ def uploaded_file(filename):
     upload_dir = os.path.join(os.path.dirname(__file__), 'uploads')
     return send_from_directory(upload_dir, filename)
 
+# Keyset (cursor) pagination helpers
+# A sort key is a list of (column, descending) pairs whose last column is unique (usually the id)
+def encode_cursor(values):
+    """Encode the sort-key values of the last row on a page as an opaque cursor"""
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, sort_keys):
+    """Decode a cursor for the given sort key. Returns [] for the first page and None if the cursor is invalid"""
+    if not cursor:
+        return []
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        if not isinstance(values, list) or len(values) != len(sort_keys):
+            return None
+        decoded = []
+        for (column, _), value in zip(sort_keys, values):
+            if value is not None and isinstance(column.type, db.DateTime):
+                value = datetime.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError):
+        return None
+
+def keyset_filter(sort_keys, values):
+    """Filter for rows strictly after `values` in sort-key order"""
+    directions = {descending for _, descending in sort_keys}
+    if len(directions) == 1:
+        # Row-value comparison lets the database seek straight into a composite index
+        columns = db.tuple_(*[column for column, _ in sort_keys])
+        bound = db.tuple_(*[db.literal(value, column.type) for (column, _), value in zip(sort_keys, values)])
+        return columns < bound if directions.pop() else columns > bound
+
+    conditions = []
+    for i, (column, descending) in enumerate(sort_keys):
+        equal_prefix = [sort_keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        conditions.append(db.and_(*equal_prefix, step))
+    return db.or_(*conditions)
+
+def keyset_segments(sort_keys, values):
+    """Filters for the rows after `values`, in scan order. Only the leading sort column may be
+    NULL (legacy rows without a date). A row-value comparison never matches NULL, so rows with a
+    NULL lead are read as a segment of their own, before or after the others depending on where
+    the database sorts NULL; each segment is still a seek on the (lead, id) index."""
+    lead, descending = sort_keys[0]
+    # NULL sorts as the highest value on PostgreSQL and the lowest on SQLite and MySQL
+    nulls_last = (db.engine.dialect.name == 'postgresql') != descending
+    if values[0] is None:
+        segments = [db.and_(lead.is_(None), keyset_filter(sort_keys[1:], values[1:]))]
+        return segments if nulls_last else segments + [lead.is_not(None)]
+    segments = [keyset_filter(sort_keys, values)]
+    return segments + [lead.is_(None)] if nulls_last else segments
+
+def keyset_paginate(query, sort_keys, cursor_values, per_page, key_of, include_total=False):
+    """Fetch one page after `cursor_values`; key_of(row) returns the sort-key values of a result row"""
+    total = query.order_by(None).count() if include_total else None
+
+    order = [column.desc() if descending else column.asc() for column, descending in sort_keys]
+    if not cursor_values:
+        rows = query.order_by(*order).limit(per_page + 1).all()
+    else:
+        rows = []
+        for segment in keyset_segments(sort_keys, cursor_values):
+            rows += query.filter(segment).order_by(*order).limit(per_page + 1 - len(rows)).all()
+            if len(rows) > per_page:
+                break
+
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(key_of(rows[-1])) if has_next and rows else None
+
+    pagination = {
+        'per_page': per_page,
+        'has_next': has_next,
+        'next_cursor': next_cursor
+    }
+    if include_total:
+        pagination['total'] = total
+    return rows, pagination
+
+# Sparse fieldsets
+# A `fields=` parameter selects a subset of a list endpoint's fields. Each field maps to the
+# columns it needs and a function that serializes it from a result row, so only those columns
+# are SELECTed (no ORM entities are built) and computed fields run only when asked for.
+def parse_fields_param(value, field_specs):
+    """Split `fields=a,b,c` into field names; None when absent (full representation)"""
+    if value is None:
+        return None, []
+    fields = []
+    for name in value.split(','):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+    unknown = [name for name in fields if name not in field_specs]
+    return fields, unknown
+
+def select_fields(query, field_specs, fields, extra_columns=()):
+    """Turn an entity query into a column-only query covering `fields` and `extra_columns`"""
+    columns = []
+    seen = set()
+    for column in [c for name in fields for c in field_specs[name][0]] + list(extra_columns):
+        if column.key not in seen:
+            seen.add(column.key)
+            columns.append(column)
+    return query.with_entities(*columns)
+
+def serialize_fields(rows, field_specs, fields):
+    return [{name: field_specs[name][1](row) for name in fields} for row in rows]
+
+def unknown_fields_error(unknown, field_specs):
+    return jsonify({
+        'error': f"Unknown field(s): {', '.join(unknown)}",
+        'available_fields': list(field_specs)
+    }), 400
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+BOOK_LIST_FIELDS = {
+    'id': ((Book.id,), lambda r: r.id),
+    'access_no': ((Book.access_no,), lambda r: r.access_no),
+    'title': ((Book.title,), lambda r: r.title),
+    'author_1': ((Book.author_1, Book.author), lambda r: r.author_1 or r.author),
+    'author_2': ((Book.author_2,), lambda r: r.author_2),
+    'author_3': ((Book.author_3,), lambda r: r.author_3),
+    'author_4': ((Book.author_4,), lambda r: r.author_4),
+    'author': ((Book.author, Book.author_1), lambda r: r.author or r.author_1),
+    'publisher': ((Book.publisher,), lambda r: r.publisher),
+    'department': ((Book.department,), lambda r: r.department),
+    'category': ((Book.category,), lambda r: r.category),
+    'location': ((Book.location,), lambda r: r.location),
+    'number_of_copies': ((Book.number_of_copies,), lambda r: r.number_of_copies),
+    'available_copies': ((Book.available_copies,), lambda r: r.available_copies),
+    'isbn': ((Book.isbn,), lambda r: r.isbn),
+    'pages': ((Book.pages,), lambda r: r.pages),
+    'price': ((Book.price,), lambda r: float(r.price) if r.price else None),
+    'edition': ((Book.edition,), lambda r: r.edition),
+    'created_at': ((Book.created_at,), lambda r: _iso(r.created_at)),
+}
+
+PUBLIC_BOOK_FIELDS = dict(
+    BOOK_LIST_FIELDS,
+    author_1=((Book.author_1,), lambda r: r.author_1),
+    authors=(
+        (Book.author_1, Book.author_2, Book.author_3, Book.author_4),
+        lambda r: [a for a in (r.author_1, r.author_2, r.author_3, r.author_4) if a]
+    ),
+)
+
+USER_LIST_FIELDS = {
+    'id': ((User.id,), lambda r: r.id),
+    'user_id': ((User.user_id,), lambda r: r.user_id),
+    'username': ((User.username,), lambda r: r.username),
+    'name': ((User.name,), lambda r: r.name),
+    'email': ((User.email,), lambda r: r.email),
+    'role': ((User.role,), lambda r: r.role),
+    'designation': ((User.designation,), lambda r: r.designation),
+    'dob': ((User.dob,), lambda r: _iso(r.dob)),
+    'validity_date': ((User.validity_date,), lambda r: _iso(r.validity_date)),
+    'college': ((College.name.label('college_name'),), lambda r: r.college_name),
+    'department': ((Department.name.label('department_name'),), lambda r: r.department_name),
+    'college_id': ((User.college_id,), lambda r: r.college_id),
+    'department_id': ((User.department_id,), lambda r: r.department_id),
+    'batch_from': ((User.batch_from,), lambda r: r.batch_from),
+    'batch_to': ((User.batch_to,), lambda r: r.batch_to),
+    'is_active': ((User.is_active,), lambda r: r.is_active),
+    'created_at': ((User.created_at,), lambda r: _iso(r.created_at)),
+    'expiration_status': ((User.validity_date,), lambda r: User.expiration_status_for(r.validity_date)),
+    'is_expired': ((User.validity_date,), lambda r: User.validity_expired(r.validity_date)),
+    'is_account_active': (
+        (User.is_active, User.validity_date),
+        lambda r: r.is_active and not User.validity_expired(r.validity_date)
+    ),
+}
+
 # Book Management Routes
 @app.route('/api/admin/books', methods=['GET'])
 @jwt_required()
@@ -920,16 +1567,48 @@ def get_books():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 10))
         search = request.args.get('search', '')
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
+        fields, unknown = parse_fields_param(request.args.get('fields'), BOOK_LIST_FIELDS)
+        if unknown:
+            return unknown_fields_error(unknown, BOOK_LIST_FIELDS)
 
         query = Book.query
         if search:
             query = query.filter(
                 Book.title.contains(search) |
-                Book.author.contains(search) |
+                Book.id.in_(author_book_ids(search)) |
                 Book.access_no.contains(search)
             )
+        if fields:
+            # Sparse fieldset: select only the requested columns (plus the keyset sort keys)
+            query = select_fields(query, BOOK_LIST_FIELDS, fields, [Book.title, Book.id])
+
+        if cursor is not None:
+            # Keyset pagination: seek on (title, id) instead of OFFSET, total only on request
+            sort_keys = [(Book.title, False), (Book.id, False)]
+            cursor_values = decode_cursor(cursor, sort_keys)
+            if cursor_values is None:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            items, pagination = keyset_paginate(
+                query, sort_keys, cursor_values, per_page,
+                lambda book: (book.title, book.id), include_total
+            )
+        else:
+            books = query.paginate(page=page, per_page=per_page, error_out=False)
+            items = books.items
+            pagination = {
+                'page': books.page,
+                'pages': books.pages,
+                'per_page': books.per_page,
+                'total': books.total
+            }
 
-        books = query.paginate(page=page, per_page=per_page, error_out=False)
+        if fields:
+            return jsonify({
+                'books': serialize_fields(items, BOOK_LIST_FIELDS, fields),
+                'pagination': pagination
+            }), 200
 
         return jsonify({
             'books': [{
@@ -955,13 +1634,8 @@ def get_books():
                 'price': float(getattr(book, 'price', 0)) if getattr(book, 'price', None) else None,
                 'edition': getattr(book, 'edition', None),
                 'created_at': book.created_at.isoformat()
-            } for book in books.items],
-            'pagination': {
-                'page': books.page,
-                'pages': books.pages,
-                'per_page': books.per_page,
-                'total': books.total
-            }
+            } for book in items],
+            'pagination': pagination
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1025,6 +1699,7 @@ def create_book():
 
         # Create multiple book records for multiple copies
         created_books = []
+        facet_changes = Counter()
         base_access_no = data.get('access_no', '').strip()
 
         # Determine starting access number
@@ -1082,6 +1757,7 @@ def create_book():
             )
 
             db.session.add(book)
+            book_facet_changes(after=book_facet_values(book), changes=facet_changes)
             created_books.append({
                 'id': None,  # Will be set after commit
                 'access_no': access_no,
@@ -1089,6 +1765,7 @@ def create_book():
                 'author': book.author_1
             })
 
+        record_catalogue_write(facet_changes, [book])
         db.session.commit()
 
         # Update IDs after commit
@@ -1104,6 +1781,533 @@ def create_book():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Bulk imports (books, users, e-books, journals, holidays)
+# Each kind of sheet is described by a SheetSchema (fields, unique keys, derived columns).
+# Sheets are validated column-wise with pandas, checked against existing keys in one pass,
+# and inserted with executemany in chunks of IMPORT_CHUNK_SIZE rows, each committed with its
+# bookkeeping, instead of row by row through the ORM in one long transaction. With
+# ?stream=true a CSV upload is also read IMPORT_CHUNK_SIZE rows at a time and only counters
+# and the first IMPORT_ERROR_SAMPLE row errors are kept, so memory stays flat for any size.
+# Every mode works through the sheet IMPORT_CHUNK_SIZE rows at a time and checkpoints each
+# committed chunk against the upload's content, so a failed import can simply be uploaded again.
+def sheet_column(df, column):
+    """A sheet column as objects with blanks as None (all None when the column is missing)"""
+    if column not in df.columns:
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    values = df[column]
+    return values.astype(object).where(values.notna(), None)
+
+def sheet_row_numbers(df, first_row=1):
+    """Row numbers for error messages; chunks of a streamed file keep counting from the start"""
+    return pd.Series(df.index + first_row, index=df.index)
+
+def taken_keys(keys, valid, existing):
+    """Mask of rows whose key is already taken: in `existing`, or by an earlier valid row of the
+    sheet (a repeated key goes to its first valid row)"""
+    position = pd.Series(np.arange(len(keys)), index=keys.index)
+    stored = keys.isin(existing)
+    first_valid = position.where(valid & ~stored, len(keys)).groupby(keys).transform('min')
+    return stored | (keys.notna() & (position > first_valid))
+
+def existing_values(column, values):
+    """The subset of `values` already present in `column`"""
+    values = list(values)
+    existing = set()
+    for start in range(0, len(values), 500):
+        existing.update(value for (value,) in db.session.query(column).filter(column.in_(values[start:start + 500])))
+    return existing
+
+def split_sheet(records, problems, row_numbers):
+    """(rows, row numbers, {row number: error}) from a frame of column values and each row's problem ('' if none)"""
+    ok = problems == ''
+    records = records[ok]
+    records = records.astype(object).where(records.notna(), None)
+    errors = dict(zip(row_numbers[~ok].tolist(), problems[~ok]))
+    return records.to_dict('records'), row_numbers[ok].tolist(), errors
+
+class InsertError(str):
+    """A row error from a failed insert or commit rather than from validation: the same rows
+    may go in when tried again, so a checkpointed import retries their chunk"""
+
+def insert_import_rows(model, rows, row_numbers, record_chunk=None):
+    """Insert validated rows into `model`'s table in chunks of IMPORT_CHUNK_SIZE; each chunk
+    commits together with `record_chunk(rows)` bookkeeping. A chunk that fails is rolled back
+    and its rows reported as InsertErrors. Returns (inserted rows, {row number: error})."""
+    chunk_size = app.config['IMPORT_CHUNK_SIZE']
+    inserted = []
+    errors = {}
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            db.session.execute(model.__table__.insert(), chunk)
+            if record_chunk:
+                record_chunk(chunk)
+            db.session.commit()
+            inserted.extend(chunk)
+        except Exception as e:
+            db.session.rollback()
+            for row_number in row_numbers[start:start + chunk_size]:
+                errors[row_number] = InsertError(e)
+    return inserted, errors
+
+SHEET_TRUE_VALUES = {'true', 'yes', 'y', '1'}
+SHEET_FALSE_VALUES = {'false', 'no', 'n', '0'}
+
+class SheetField:
+    """One column of an import sheet and the checks its values must pass. `type` is text,
+    number, whole (a number truncated to an integer), year, date or boolean; blank cells
+    take `default`. A required field needs a value in every row and the column in the file;
+    required_column alone only needs the column."""
+
+    def __init__(self, name, label=None, type='text', required=False, required_column=False, default=None,
+                 choices=None, positive=False, non_negative=False, strip=False):
+        self.name = name
+        self.label = label or name.replace('_', ' ').capitalize()
+        self.type = type
+        self.required = required
+        self.required_column = required or required_column
+        self.default = default
+        self.choices = choices
+        self.positive = positive
+        self.non_negative = non_negative
+        self.strip = strip
+
+    def parse(self, df):
+        """(values, [(mask of rows failing a check, message)]) for this column of `df`, checks in order"""
+        text = sheet_column(df, self.name)
+        if self.strip:
+            stripped = text.str.strip()
+            text = stripped.where(stripped.notna() & (stripped != ''), None)
+        given = text.notna()
+        checks = []
+        if self.required:
+            checks.append((~given, f'{self.label} is required'))
+
+        if self.type in ('number', 'whole', 'year'):
+            values = pd.to_numeric(text, errors='coerce')
+            if self.type == 'year':
+                checks.append((given & (values.isna() | (values != np.trunc(values))), f'{self.label} must be a year'))
+                # Rejected rows are blanked so the cast succeeds
+                values = values.where(values == np.trunc(values)).astype('Int64')
+            else:
+                checks.append((given & values.isna(), f'{self.label} must be a valid number'))
+                if self.type == 'whole':
+                    values = np.trunc(values)
+        elif self.type == 'date':
+            values = pd.to_datetime(text, errors='coerce', format='mixed').dt.date
+            checks.append((given & values.isna(), f'{self.label} must be a valid date'))
+        elif self.type == 'boolean':
+            lowered = text.str.strip().str.lower()
+            values = pd.Series(np.where(lowered.isin(SHEET_TRUE_VALUES), True,
+                                        np.where(lowered.isin(SHEET_FALSE_VALUES), False, None)), index=df.index)
+            checks.append((given & values.isna(), f'{self.label} must be true or false'))
+        else:
+            values = text
+
+        if self.choices is not None:
+            checks.append((given & ~text.isin(self.choices), f'Invalid {self.label.lower()}'))
+        if self.positive:
+            checks.append((values <= 0, f'{self.label} must be a positive number'))
+        if self.non_negative:
+            checks.append((values < 0, f'{self.label} cannot be negative'))
+        if self.default is not None:
+            values = values.fillna(self.default)
+            if self.type == 'whole':
+                values = values.astype(int)
+        return values, checks
+
+class SheetSchema:
+    """How one kind of import sheet maps onto a table.
+
+    Every field is a column of `model`, and so is each keyword parameter of the import
+    (a category, the uploading user, ...). `unique` lists (field name, label, model columns)
+    keys that must not be in any of those columns already nor repeat in the sheet;
+    `derive(values, **params)` returns further {column: values}. `record_chunk(rows)` runs in
+    each insert transaction, and row numbers in errors start at `first_row`.
+    """
+
+    def __init__(self, model, fields, unique=(), derive=None, record_chunk=None, first_row=1):
+        self.model = model
+        self.fields = fields
+        self.unique = unique
+        self.derive = derive
+        self.record_chunk = record_chunk
+        self.first_row = first_row
+
+    @property
+    def required_columns(self):
+        return [field.name for field in self.fields if field.required_column]
+
+def validate_sheet(schema, df, **params):
+    """Split a sheet (read with dtype=str) into rows for schema.model and per-row errors.
+
+    Returns (rows, row_numbers, errors): column dicts for the rows to insert, their sheet row
+    numbers, and {row number: message} for the rows left out. A row is reported for its first
+    problem, field checks in field order, then unique keys in order; a key is taken when the
+    table already has it or an earlier valid row of the sheet uses it.
+    """
+    values = {}
+    conditions, messages = [], []
+    for field in schema.fields:
+        values[field.name], checks = field.parse(df)
+        for mask, message in checks:
+            conditions.append(mask.fillna(False).astype(bool))
+            messages.append(message)
+    problems = pd.Series(np.select(conditions, messages, default='') if conditions else '', index=df.index)
+
+    for name, label, columns in schema.unique:
+        keys = values[name]
+        candidates = keys.dropna().unique()
+        existing = set().union(*(existing_values(column, candidates) for column in columns))
+        taken = taken_keys(keys, problems == '', existing) & (problems == '')
+        problems = problems.mask(taken, f'{label} ' + keys.astype(str) + ' already exists')
+
+    records = pd.DataFrame(values, index=df.index).assign(**params)
+    if schema.derive:
+        records = records.assign(**schema.derive(values, **params))
+    return split_sheet(records, problems, sheet_row_numbers(df, schema.first_row))
+
+def ingest_sheet(schema, df, **params):
+    """Validate a sheet (or one chunk of it) and insert its valid rows; returns (inserted rows, {row number: error})"""
+    rows, row_numbers, errors = validate_sheet(schema, df, **params)
+    inserted, insert_errors = insert_import_rows(schema.model, rows, row_numbers, schema.record_chunk)
+    errors.update(insert_errors)
+    return inserted, errors
+
+def import_error_report(errors):
+    """{row number: message} as the "Row n: message" list every import endpoint returns"""
+    return [f"Row {row_number}: {message}" for row_number, message in sorted(errors.items())]
+
+def wants_streaming_import():
+    return request.args.get('stream', request.form.get('stream', 'false')).lower() == 'true'
+
+def upload_checkpoint_key(kind, params, stream):
+    """The ImportCheckpoint key of an upload: a hash of its content, the import kind and
+    parameters, and the chunk size (which fixes the chunk boundaries). With ?restart=true the
+    checkpoint is dropped first, so the file is imported from the top again."""
+    digest = hashlib.sha256(json.dumps([kind, params, app.config['IMPORT_CHUNK_SIZE']], sort_keys=True).encode())
+    for block in iter(lambda: stream.read(1 << 20), b''):
+        digest.update(block)
+    stream.seek(0)
+    key = digest.hexdigest()
+    if request.args.get('restart', request.form.get('restart', 'false')).lower() == 'true':
+        ImportCheckpoint.query.filter_by(key=key).delete()
+        db.session.commit()
+    return key
+
+def sheet_chunks(df):
+    """A sheet read in full, as IMPORT_CHUNK_SIZE-row slices (the index, and so row numbers, runs on)"""
+    chunk_size = app.config['IMPORT_CHUNK_SIZE']
+    return (df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size))
+
+def csv_chunks(source):
+    """A CSV file IMPORT_CHUNK_SIZE rows at a time (no chunks for an empty file)"""
+    try:
+        return pd.read_csv(source, dtype=str, chunksize=app.config['IMPORT_CHUNK_SIZE'])
+    except pd.errors.EmptyDataError:
+        return iter(())
+
+def stream_csv_import(file, required_columns, import_chunk, checkpoint_key=None):
+    """Import a CSV upload IMPORT_CHUNK_SIZE rows at a time; see import_sheet_chunks"""
+    return import_sheet_chunks(csv_chunks(file.stream), required_columns, import_chunk, checkpoint_key=checkpoint_key)
+
+def import_whole_sheet(df, import_chunk, checkpoint_key=None):
+    """Import a sheet read in full chunk by chunk, checkpointed like a streamed one. Returns the
+    inserted rows and {row number: error} of this upload, and how many rows an earlier upload
+    of the same file had already imported."""
+    inserted, errors = [], {}
+
+    def import_and_collect(chunk):
+        chunk_inserted, chunk_errors = import_chunk(chunk)
+        inserted.extend(chunk_inserted)
+        errors.update(chunk_errors)
+        return chunk_inserted, chunk_errors
+
+    summary, _ = import_sheet_chunks(sheet_chunks(df), [], import_and_collect, checkpoint_key=checkpoint_key)
+    return inserted, errors, (summary or {}).get('resumed_rows', 0)
+
+def import_sheet_chunks(chunks, required_columns, import_chunk, progress=None, checkpoint_key=None):
+    """Import a sheet given as DataFrame chunks. `import_chunk(df)` validates and commits one
+    chunk and returns (inserted rows, {row number: error}); `progress(summary)` is called
+    after each chunk.
+
+    With a checkpoint_key, chunks an earlier upload of the same file already committed are
+    skipped (the summary starts from that upload's totals and says how many rows it covered
+    as 'resumed_rows'), and each chunk's checkpoint commits together with its rows. A chunk
+    with rows whose insert failed (InsertError) stays pending, out of the checkpoint's totals,
+    and the next upload tries it again. Once the last chunk is in with none pending the
+    checkpoint is deleted, so uploading the file after that imports it afresh.
+
+    Returns (summary, None), or (None, message) when the file has no data rows or lacks a
+    required column, in which case nothing is imported. A file that turns out to be malformed
+    part way stops there; the summary says where.
+    """
+    summary = {'rows': 0, 'created': 0, 'rejected': 0, 'errors': [], 'errors_truncated': False}
+    sample_size = app.config['IMPORT_ERROR_SAMPLE']
+
+    def add_chunk(totals, rows, inserted, errors):
+        totals['rows'] += rows
+        totals['created'] += len(inserted)
+        totals['rejected'] += len(errors)
+        for row_number in sorted(errors):
+            if len(totals['errors']) == sample_size:
+                totals['errors_truncated'] = True
+                break
+            totals['errors'].append(f"Row {row_number}: {errors[row_number]}")
+
+    checkpoint = None
+    chunks_done, pending = 0, set()
+    if checkpoint_key:
+        checkpoint = db.session.get(ImportCheckpoint, checkpoint_key) or ImportCheckpoint(key=checkpoint_key, chunks_done=0)
+        chunks_done, pending = checkpoint.chunks_done, set(json.loads(checkpoint.pending_chunks or '[]'))
+        if chunks_done:
+            summary.update(rows=checkpoint.rows, created=checkpoint.created, rejected=checkpoint.rejected,
+                           errors=json.loads(checkpoint.errors or '[]'),
+                           errors_truncated=bool(checkpoint.errors_truncated), resumed_rows=checkpoint.rows)
+    # What the checkpoint records: the totals of the chunks that won't be tried again
+    settled = dict(summary, errors=list(summary['errors']))
+    try:
+        for chunk_number, df in enumerate(chunks):
+            if chunk_number == 0:
+                missing_columns = [column for column in required_columns if column not in df.columns]
+                if missing_columns:
+                    return None, f'File is missing required columns: {missing_columns}. Required columns are: {required_columns}'
+            if chunk_number < chunks_done and chunk_number not in pending:
+                continue
+            if checkpoint:
+                # Staged now so it commits with the chunk's first insert
+                checkpoint.chunks_done = max(chunks_done, chunk_number + 1)
+                checkpoint.pending_chunks = json.dumps(sorted(pending - {chunk_number}))
+                db.session.add(checkpoint)
+            inserted, errors = import_chunk(df)
+            add_chunk(summary, len(df), inserted, errors)
+            if checkpoint:
+                chunks_done = max(chunks_done, chunk_number + 1)
+                if any(isinstance(message, InsertError) for message in errors.values()):
+                    pending.add(chunk_number)
+                else:
+                    pending.discard(chunk_number)
+                    add_chunk(settled, len(df), inserted, errors)
+                # Again, in case the chunk had nothing to insert or an insert was rolled back
+                checkpoint.chunks_done, checkpoint.pending_chunks = chunks_done, json.dumps(sorted(pending))
+                checkpoint.rows, checkpoint.created, checkpoint.rejected = settled['rows'], settled['created'], settled['rejected']
+                checkpoint.errors = json.dumps(settled['errors'])
+                checkpoint.errors_truncated = settled['errors_truncated']
+                db.session.add(checkpoint)
+                db.session.commit()
+            if progress:
+                progress(summary)
+    except pd.errors.EmptyDataError:
+        pass
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        summary['stopped'] = f'Stopped after {summary["rows"]} rows: {str(e)}'
+    if checkpoint and not pending and 'stopped' not in summary and db.inspect(checkpoint).persistent:
+        # Finished: resuming is only for an import that didn't get to the end
+        db.session.delete(checkpoint)
+        db.session.commit()
+    if summary['rows'] == 0 and 'stopped' not in summary:
+        return None, 'File is empty or has no data rows'
+    return summary, None
+
+def streaming_import_response(summary, noun):
+    return jsonify(dict(summary, message=f"Successfully created {summary['created']} {noun}")), 201
+
+# Background import jobs: the upload is spooled to IMPORT_JOB_DIR and an ImportJob row
+# queued; a worker thread imports it chunk by chunk through the same import functions as
+# the request path and records progress on the row, which the status endpoint reads.
+IMPORT_JOB_DIR = os.path.join(app.config['UPLOAD_FOLDER'], 'imports')
+
+# kind -> (required columns, import function(df, **job params) returning (inserted, errors)),
+# registered next to each import function
+IMPORT_JOB_KINDS = {}
+
+class InlineExecutor(Executor):
+    """Runs each job in the submitting thread before returning (IMPORT_JOB_WORKERS=0, checks)"""
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+_import_executor = None
+_import_executor_lock = threading.Lock()
+
+def get_import_executor():
+    global _import_executor
+    with _import_executor_lock:
+        if _import_executor is None:
+            workers = app.config['IMPORT_JOB_WORKERS']
+            _import_executor = ThreadPoolExecutor(workers, thread_name_prefix='import') if workers > 0 else InlineExecutor()
+        return _import_executor
+
+def set_import_executor(executor):
+    """Run import jobs on `executor` from now on (e.g. an InlineExecutor in checks)"""
+    global _import_executor
+    with _import_executor_lock:
+        _import_executor = executor
+
+def wants_background_import():
+    return request.args.get('background', request.form.get('background', 'false')).lower() == 'true'
+
+def start_import_job(kind, file, params, created_by, checkpoint_key=None):
+    """Spool the upload, queue an ImportJob for it and answer 202 with the job"""
+    extension = os.path.splitext(file.filename or '')[1].lower()
+    if extension not in ('.csv', '.xlsx', '.xls'):
+        return jsonify({'error': 'Invalid file format. Please upload Excel or CSV file'}), 400
+    job_id = uuid.uuid4().hex
+    os.makedirs(IMPORT_JOB_DIR, exist_ok=True)
+    path = os.path.join(IMPORT_JOB_DIR, job_id + extension)
+    file.save(path)
+    job = ImportJob(id=job_id, kind=kind, filename=file.filename, path=path, params=json.dumps(params),
+                    checkpoint_key=checkpoint_key, created_by=created_by)
+    db.session.add(job)
+    db.session.commit()
+    get_import_executor().submit(run_import_job, job_id)
+    db.session.refresh(job)
+    return jsonify({'message': 'Import queued', 'job': job.to_dict()}), 202
+
+def import_job_chunks(path):
+    if path.endswith('.csv'):
+        return csv_chunks(path)
+    # Workbooks can't be read incrementally
+    return sheet_chunks(pd.read_excel(path, dtype=str))
+
+def run_import_job(job_id):
+    """Import a queued job's file, recording progress after every chunk"""
+    with app.app_context():
+        job = db.session.get(ImportJob, job_id)
+        try:
+            required_columns, import_sheet = IMPORT_JOB_KINDS[job.kind]
+            params = json.loads(job.params or '{}')
+            job.status = 'running'
+            job.started_at = datetime.utcnow()
+            db.session.commit()
+
+            def progress(summary):
+                job.rows, job.created, job.rejected = summary['rows'], summary['created'], summary['rejected']
+                job.errors = json.dumps(summary['errors'])
+                job.errors_truncated = summary['errors_truncated']
+                db.session.commit()
+
+            summary, error = import_sheet_chunks(import_job_chunks(job.path), required_columns,
+                                                 lambda df: import_sheet(df, **params), progress, job.checkpoint_key)
+            if error:
+                job.status, job.message = 'failed', error
+            else:
+                progress(summary)
+                job.status = 'done'
+                job.message = summary.get('stopped') or f"Created {summary['created']} of {summary['rows']} rows"
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Import job {job_id} failed: {e}")
+            job.status, job.message = 'failed', str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+            db.session.remove()
+
+def fail_interrupted_import_jobs():
+    """Mark jobs left queued or running by a process that has since stopped as failed, and
+    delete their spooled files. Only call it while no worker is running jobs (at startup)."""
+    jobs = ImportJob.query.filter(ImportJob.status.in_(['queued', 'running'])).all()
+    for job in jobs:
+        job.status = 'failed'
+        job.message = ('Interrupted by a server restart; upload the file again to carry on '
+                       'from the last committed chunk')
+        job.finished_at = datetime.utcnow()
+        try:
+            os.remove(job.path)
+        except (OSError, TypeError):
+            pass
+    db.session.commit()
+    return len(jobs)
+
+# Import jobs run on threads of the process that queued them, so a restart leaves its jobs
+# behind. `python app.py` fails them at startup; under a WSGI server run this before the
+# workers start (e.g. in the deploy script), not from a worker, whose siblings may be mid-job.
+@app.cli.command('fail-interrupted-import-jobs')
+def fail_interrupted_import_jobs_command():
+    """Mark import jobs a stopped server left queued or running as failed"""
+    failed = fail_interrupted_import_jobs()
+    print(f"✅ {failed} interrupted import jobs marked failed")
+
+@app.route('/api/admin/import-jobs', methods=['GET'])
+@jwt_required()
+def get_import_jobs():
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        if not user or user.role not in ['admin', 'librarian']:
+            return jsonify({'error': 'Admin/Librarian access required'}), 403
+
+        jobs = ImportJob.query.filter_by(created_by=user_id).order_by(ImportJob.created_at.desc()).limit(50).all()
+        return jsonify({'jobs': [job.to_dict() for job in jobs]}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/import-jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_import_job(job_id):
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        if not user or user.role not in ['admin', 'librarian']:
+            return jsonify({'error': 'Admin/Librarian access required'}), 403
+
+        job = db.session.get(ImportJob, job_id)
+        if not job or (job.created_by != user_id and user.role != 'admin'):
+            return jsonify({'error': 'Import job not found'}), 404
+        return jsonify({'job': job.to_dict()}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def record_book_import(rows):
+    """Facet counts, search vocabulary, author index and suggest updates for inserted book rows"""
+    ids = dict(db.session.query(Book.access_no, Book.id).filter(Book.access_no.in_([row['access_no'] for row in rows])))
+    books = [SimpleNamespace(id=ids[row['access_no']], **row) for row in rows]
+    facet_changes = Counter()
+    for book in books:
+        book_facet_changes(after=book_facet_values(book), changes=facet_changes)
+    record_catalogue_write(facet_changes, books)
+
+def book_sheet_columns(values, category):
+    return {
+        # Legacy author field for backward compatibility
+        'author': values['author_1'],
+        'number_of_copies': 1,  # each record is one physical copy
+        'available_copies': 1,
+        # Book's isbn validator doesn't run for Core inserts
+        'isbn13': values['isbn'].map(normalize_isbn, na_action='ignore'),
+    }
+
+# Accession sheets; the category comes from the upload form, not the sheet
+BOOK_SHEET = SheetSchema(Book, [
+    SheetField('access_no', 'Access number', required=True),
+    SheetField('title', required=True),
+    SheetField('author_1', 'Author 1', required=True),
+    SheetField('author_2', 'Author 2'),
+    SheetField('author_3', 'Author 3'),
+    SheetField('author_4', 'Author 4'),
+    SheetField('publisher', required_column=True),
+    SheetField('department'),
+    SheetField('location'),
+    SheetField('isbn', 'ISBN'),
+    SheetField('pages', type='whole', positive=True, default=0),
+    SheetField('price', type='number', required=True, non_negative=True),
+    SheetField('edition', default='Not Specified'),
+], unique=[('access_no', 'Access number', [Book.access_no])], derive=book_sheet_columns,
+   record_chunk=record_book_import)
+
+IMPORT_JOB_KINDS['books'] = (BOOK_SHEET.required_columns, partial(ingest_sheet, BOOK_SHEET))
+
 @app.route('/api/admin/books/bulk', methods=['POST'])
 @jwt_required()
 def bulk_create_books():
@@ -1122,27 +2326,33 @@ def bulk_create_books():
         if not category:
             return jsonify({'error': 'Category is required'}), 400
 
-        # Read Excel or CSV file
+        filename = file.filename.lower()
+        checkpoint_key = upload_checkpoint_key('books', {'category': category}, file.stream)
+        if wants_background_import():
+            return start_import_job('books', file, {'category': category}, user_id, checkpoint_key)
+        if wants_streaming_import():
+            if not filename.endswith('.csv'):
+                return jsonify({'error': 'Streaming imports need a CSV file'}), 400
+            summary, error = stream_csv_import(file, BOOK_SHEET.required_columns,
+                                               lambda df: ingest_sheet(BOOK_SHEET, df, category=category), checkpoint_key)
+            if error:
+                return jsonify({'error': error}), 400
+            return streaming_import_response(summary, 'books')
+
+        # Read Excel or CSV file, every cell as text so access numbers and ISBNs keep their digits
         try:
-            import pandas as pd
-            # Check file extension to determine how to read
-            filename = file.filename.lower()
             if filename.endswith('.csv'):
-                df = pd.read_csv(file)
+                df = pd.read_csv(file, dtype=str)
             elif filename.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file)
+                df = pd.read_excel(file, dtype=str)
             else:
                 return jsonify({'error': 'Unsupported file format. Please use Excel (.xlsx, .xls) or CSV (.csv) files'}), 400
-        except ImportError:
-            return jsonify({'error': 'pandas library not installed'}), 500
         except Exception as e:
             return jsonify({'error': f'Error reading file: {str(e)}'}), 400
 
         # Validate required columns (number_of_copies removed - will default to 1)
         # Made department, location, pages, edition optional for bulk upload
-        required_columns = ['access_no', 'title', 'author_1', 'publisher', 'price']
-        optional_columns = ['author_2', 'author_3', 'author_4', 'isbn', 'department', 'location', 'pages', 'edition']
-
+        required_columns = BOOK_SHEET.required_columns
         missing_columns = [col for col in required_columns if col not in df.columns]
         if missing_columns:
             return jsonify({
@@ -1153,84 +2363,25 @@ def bulk_create_books():
         if df.empty:
             return jsonify({'error': 'File is empty or has no data rows'}), 400
 
-        created_books = []
-        errors = []
-
-        for index, row in df.iterrows():
-            try:
-                access_no = str(row['access_no'])
-
-                # Check if book already exists
-                existing = Book.query.filter_by(access_no=access_no).first()
-                if existing:
-                    errors.append(f"Row {index + 1}: Access number {access_no} already exists")
-                    continue
-
-                # Validate mandatory fields
-                if not row['author_1'] or pd.isna(row['author_1']):
-                    errors.append(f"Row {index + 1}: Author 1 is required")
-                    continue
-
-                # Validate optional numeric fields if provided
-                pages_value = None
-                if 'pages' in df.columns and not pd.isna(row.get('pages')):
-                    try:
-                        pages_value = int(row['pages'])
-                        if pages_value <= 0:
-                            errors.append(f"Row {index + 1}: Pages must be a positive number")
-                            continue
-                    except (ValueError, TypeError):
-                        errors.append(f"Row {index + 1}: Pages must be a valid number")
-                        continue
-
-                if not row['price'] or pd.isna(row['price']) or float(row['price']) < 0:
-                    errors.append(f"Row {index + 1}: Price cannot be negative")
-                    continue
-
-                book = Book(
-                    access_no=access_no,
-                    title=row['title'],
-                    # Multiple authors
-                    author_1=row['author_1'],
-                    author_2=row.get('author_2') if not pd.isna(row.get('author_2', '')) else None,
-                    author_3=row.get('author_3') if not pd.isna(row.get('author_3', '')) else None,
-                    author_4=row.get('author_4') if not pd.isna(row.get('author_4', '')) else None,
-                    # Legacy author field for backward compatibility
-                    author=row['author_1'],
-                    publisher=row['publisher'],
-                    # Optional fields with defaults
-                    department=row.get('department') if 'department' in df.columns and not pd.isna(row.get('department')) else None,
-                    category=category,  # Use category from form parameter
-                    location=row.get('location') if 'location' in df.columns and not pd.isna(row.get('location')) else None,
-                    number_of_copies=1,  # Default to 1 copy per book record
-                    available_copies=1,  # Default to 1 available copy
-                    isbn=row.get('isbn', ''),
-                    # Optional fields with defaults - pages and edition now optional
-                    pages=pages_value if pages_value is not None else 0,  # Default to 0 if not provided
-                    price=float(row['price']),
-                    edition=row.get('edition') if 'edition' in df.columns and not pd.isna(row.get('edition')) else 'Not Specified'
-                )
+        inserted, errors, resumed_rows = import_whole_sheet(df, lambda df: ingest_sheet(BOOK_SHEET, df, category=category),
+                                                            checkpoint_key)
 
-                db.session.add(book)
-                created_books.append({
-                    'access_no': access_no,
-                    'title': row['title'],
-                    'author': row['author_1'],
-                    'category': category
-                })
-
-            except Exception as e:
-                errors.append(f"Row {index + 1}: {str(e)}")
-
-        db.session.commit()
+        created_books = [{
+            'access_no': row['access_no'],
+            'title': row['title'],
+            'author': row['author_1'],
+            'category': category
+        } for row in inserted]
 
         return jsonify({
             'message': f'Successfully created {len(created_books)} books',
             'created_books': created_books,
-            'errors': errors
+            'errors': import_error_report(errors),
+            'resumed_rows': resumed_rows
         }), 201
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/admin/books/sample', methods=['GET'])
@@ -1350,6 +2501,8 @@ def update_book(book_id):
         if new_available < 0:
             return jsonify({'error': 'Cannot reduce copies below issued books count'}), 400
 
+        facets_before = book_facet_values(book)
+
         book.access_no = access_no
         book.call_no = call_no  # Update call number
         book.title = title
@@ -1372,6 +2525,7 @@ def update_book(book_id):
         book.price = price
         book.edition = edition
 
+        record_catalogue_write(book_facet_changes(before=facets_before, after=book_facet_values(book)), [book])
         db.session.commit()
 
         return jsonify({
@@ -1404,6 +2558,7 @@ def delete_book(book_id):
         if book.available_copies < book.number_of_copies:
             return jsonify({'error': 'Cannot delete book that is currently issued'}), 400
 
+        record_catalogue_write(book_facet_changes(before=book_facet_values(book)), deleted_books=[book])
         db.session.delete(book)
         db.session.commit()
 
@@ -1440,7 +2595,15 @@ def delete_all_books():
             Circulation.query.delete()
 
         # Delete all books
+        BookAuthor.query.delete()
+        AuthorNameKey.query.delete()
+        Author.query.delete()
         Book.query.delete()
+        BookFacetCount.query.delete()
+        SearchTermTrigram.query.delete()
+        SearchTerm.query.delete()
+        queue_suggest_change('clear', None)
+        bump_catalogue_generation()
 
         # Commit the transaction
         db.session.commit()
@@ -1648,7 +2811,11 @@ def fulfill_reservation(reservation_id):
         )
 
         # Update book availability
+        facets_before = book_facet_values(book)
         book.available_copies -= 1
+        record_catalogue_write(book_facet_changes(before=facets_before, after=book_facet_values(book)))
+        record_book_issue(book)
+        record_circulation_issue(reservation.user)
 
         # Mark reservation as fulfilled
         reservation.status = 'fulfilled'
@@ -1832,151 +2999,2370 @@ def update_category(category_id):
         db.session.commit()
 
         return jsonify({
-            'message': 'Category updated successfully',
-            'category': {
-                'id': category.id,
-                'name': category.name,
-                'description': category.description,
-                'created_at': category.created_at.isoformat()
-            }
+            'message': 'Category updated successfully',
+            'category': {
+                'id': category.id,
+                'name': category.name,
+                'description': category.description,
+                'created_at': category.created_at.isoformat()
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/categories/<int:category_id>', methods=['DELETE'])
+@jwt_required()
+def delete_category(category_id):
+    try:
+        category = Category.query.get_or_404(category_id)
+
+        # Check if category is being used by any books
+        books_using_category = Book.query.filter_by(category=category.name).count()
+        ebooks_using_category = Ebook.query.filter_by(category=category.name).count()
+
+        if books_using_category > 0 or ebooks_using_category > 0:
+            return jsonify({
+                'error': f'Cannot delete category "{category.name}" as it is being used by {books_using_category + ebooks_using_category} book(s)'
+            }), 400
+
+        db.session.delete(category)
+        db.session.commit()
+
+        return jsonify({'message': 'Category deleted successfully'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Full-text search index for the OPAC (SQLite FTS5)
+# books_fts is an external-content index over the books table, kept in sync by triggers
+BOOKS_FTS_COLUMNS = ['title', 'author_1', 'author_2', 'author_3', 'author_4',
+                     'publisher', 'category', 'department', 'access_no', 'isbn']
+# bm25 column weights, same order as BOOKS_FTS_COLUMNS
+BOOKS_FTS_WEIGHTS = [10.0, 5.0, 4.0, 4.0, 4.0, 2.0, 1.0, 1.0, 3.0, 3.0]
+
+_books_fts_available = None
+
+def setup_books_fts():
+    """Create the books_fts index and its sync triggers if they don't exist"""
+    global _books_fts_available
+
+    if db.engine.dialect.name != 'sqlite':
+        _books_fts_available = False
+        return False
+
+    columns = ', '.join(BOOKS_FTS_COLUMNS)
+    new_values = ', '.join(f'new.{col}' for col in BOOKS_FTS_COLUMNS)
+    old_values = ', '.join(f'old.{col}' for col in BOOKS_FTS_COLUMNS)
+
+    try:
+        exists = db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+        )).scalar()
+
+        if not exists:
+            print("Creating books_fts full-text index...")
+            db.session.execute(text(
+                f"CREATE VIRTUAL TABLE books_fts USING fts5({columns}, "
+                f"content='books', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            ))
+
+        # Only re-index when a searchable column changes, not on every availability update
+        db.session.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+                INSERT INTO books_fts(rowid, {columns}) VALUES (new.id, {new_values});
+            END
+        """))
+        db.session.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+                INSERT INTO books_fts(books_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            END
+        """))
+        db.session.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF {columns} ON books BEGIN
+                INSERT INTO books_fts(books_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO books_fts(rowid, {columns}) VALUES (new.id, {new_values});
+            END
+        """))
+
+        if not exists:
+            # Index the books that are already in the catalogue
+            db.session.execute(text("INSERT INTO books_fts(books_fts) VALUES ('rebuild')"))
+            print("✅ books_fts full-text index created")
+
+        db.session.commit()
+        _books_fts_available = True
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️  Full-text index unavailable, OPAC search will use LIKE matching: {e}")
+        _books_fts_available = False
+
+    return _books_fts_available
+
+def books_fts_available():
+    """Check (once per process) whether the books_fts index can be queried"""
+    global _books_fts_available
+    if _books_fts_available is None and db.engine.dialect.name != 'sqlite':
+        _books_fts_available = False
+    elif _books_fts_available is None:
+        try:
+            _books_fts_available = bool(db.session.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+            )).scalar())
+        except Exception:
+            db.session.rollback()
+            _books_fts_available = False
+    return _books_fts_available
+
+def build_fts_query(search):
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    tokens = re.findall(r'\w+', search.lower())
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+def books_fts_subquery(search):
+    """Subquery of (book_id, rank) for books matching the search text, or None if FTS can't be used"""
+    fts_query = build_fts_query(search)
+    if not fts_query or not books_fts_available():
+        return None
+
+    weights = ', '.join(str(weight) for weight in BOOKS_FTS_WEIGHTS)
+    return text(
+        f"SELECT rowid AS book_id, bm25(books_fts, {weights}) AS rank "
+        f"FROM books_fts WHERE books_fts MATCH :fts_query"
+    ).bindparams(fts_query=fts_query).columns(
+        book_id=db.Integer, rank=db.Float
+    ).subquery('books_fts_match')
+
+def apply_books_like_search(query, search):
+    """Legacy substring search, used when the full-text index is not available"""
+    search_filter = f"%{search}%"
+    return query.filter(
+        db.or_(
+            Book.title.ilike(search_filter),
+            Book.id.in_(author_book_ids(search)),
+            Book.access_no.ilike(search_filter),
+            Book.isbn.ilike(search_filter) if Book.isbn else False
+        )
+    )
+
+# Unified discovery index
+# One FTS5 table covers every public collection so a single query can rank books, e-resources,
+# journals, theses, news clippings and question banks together. Each source table keeps it in
+# sync through triggers; rowid = item id * DISCOVER_TYPE_SLOTS + type code, so a row can be
+# replaced without scanning the index. Field templates are SQL over a source row ({row}).
+DISCOVER_TYPE_SLOTS = 8
+DISCOVER_FTS_FIELDS = ['title', 'creators', 'subject', 'identifiers']
+DISCOVER_FTS_WEIGHTS = [0.0, 10.0, 5.0, 3.0, 2.0]  # type (unindexed), then the fields above
+DISCOVER_SOURCES = [
+    {
+        'type': 'book', 'code': 1, 'model': Book, 'table': 'books',
+        'title': ['{row}.title'],
+        'creators': ['{row}.author_1', '{row}.author_2', '{row}.author_3', '{row}.author_4', '{row}.publisher'],
+        'subject': ['{row}.category', '{row}.department'],
+        'identifiers': ['{row}.access_no', '{row}.isbn'],
+        'like_columns': [Book.title, Book.author, Book.access_no, Book.isbn],
+    },
+    {
+        'type': 'ebook', 'code': 2, 'model': Ebook, 'table': 'ebooks',
+        'title': ['{row}.web_title'],
+        'creators': [],
+        'subject': ['{row}.subject', '{row}.type', '{row}.web_detail'],
+        'identifiers': ['{row}.access_no'],
+        'like_columns': [Ebook.web_title, Ebook.subject, Ebook.access_no],
+    },
+    {
+        'type': 'journal', 'code': 3, 'model': Journal, 'table': 'journals',
+        'title': ['{row}.journal_name'],
+        'creators': [],
+        'subject': ['{row}.journal_type'],
+        'identifiers': [],
+        'like_columns': [Journal.journal_name],
+    },
+    {
+        'type': 'thesis', 'code': 4, 'model': Thesis, 'table': 'thesis',
+        'title': ['{row}.title'],
+        'creators': ['{row}.author', '{row}.project_guide'],
+        'subject': ['{row}.type', '(SELECT name FROM departments WHERE id = {row}.department_id)'],
+        'identifiers': ['{row}.thesis_number'],
+        'like_columns': [Thesis.title, Thesis.author, Thesis.thesis_number],
+    },
+    {
+        'type': 'news_clipping', 'code': 5, 'model': NewsClipping, 'table': 'news_clippings',
+        'title': ['{row}.news_title'],
+        'creators': ['{row}.newspaper_name'],
+        'subject': ['{row}.news_subject', '{row}.keywords', '{row}.news_type', '{row}.abstract'],
+        'identifiers': ['{row}.clipping_no'],
+        'like_columns': [NewsClipping.news_title, NewsClipping.newspaper_name,
+                         NewsClipping.news_subject, NewsClipping.keywords],
+    },
+    {
+        'type': 'question_bank', 'code': 6, 'model': QuestionBank, 'table': 'question_banks',
+        'title': ['{row}.subject_name'],
+        'creators': [],
+        'subject': ['{row}.regulation',
+                    '(SELECT name FROM colleges WHERE id = {row}.college_id)',
+                    '(SELECT name FROM departments WHERE id = {row}.department_id)'],
+        'identifiers': ['{row}.subject_code'],
+        'like_columns': [QuestionBank.subject_name, QuestionBank.subject_code, QuestionBank.regulation],
+    },
+]
+DISCOVER_TYPES = {source['type']: source for source in DISCOVER_SOURCES}
+
+_discover_fts_available = None
+
+def _discover_field_sql(source, field, row):
+    parts = [template.format(row=row) for template in source[field]]
+    if not parts:
+        return "''"
+    return " || ' ' || ".join(f"COALESCE({part}, '')" for part in parts)
+
+def _discover_values_sql(source, row):
+    rowid = f"{row}.id * {DISCOVER_TYPE_SLOTS} + {source['code']}"
+    fields = ', '.join(_discover_field_sql(source, field, row) for field in DISCOVER_FTS_FIELDS)
+    return f"{rowid}, '{source['type']}', {fields}"
+
+def rebuild_discover_index():
+    """Re-index every public collection into discover_fts"""
+    columns = 'rowid, type, ' + ', '.join(DISCOVER_FTS_FIELDS)
+    db.session.execute(text("DELETE FROM discover_fts"))
+    for source in DISCOVER_SOURCES:
+        db.session.execute(text(
+            f"INSERT INTO discover_fts({columns}) "
+            f"SELECT {_discover_values_sql(source, 'src')} FROM {source['table']} AS src"
+        ))
+
+def setup_discover_index():
+    """Create the discover_fts index and the sync triggers on its source tables"""
+    global _discover_fts_available
+
+    if db.engine.dialect.name != 'sqlite':
+        _discover_fts_available = False
+        return False
+
+    columns = 'rowid, type, ' + ', '.join(DISCOVER_FTS_FIELDS)
+    try:
+        exists = db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'discover_fts'"
+        )).scalar()
+
+        if not exists:
+            print("Creating discover_fts search index...")
+            db.session.execute(text(
+                f"CREATE VIRTUAL TABLE discover_fts USING fts5(type UNINDEXED, {', '.join(DISCOVER_FTS_FIELDS)}, "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            ))
+
+        for source in DISCOVER_SOURCES:
+            table = source['table']
+            old_rowid = f"old.id * {DISCOVER_TYPE_SLOTS} + {source['code']}"
+            # Only re-index when an indexed column of the row itself changes (not e.g. download_count)
+            watched = sorted({
+                match for field in DISCOVER_FTS_FIELDS for template in source[field]
+                for match in re.findall(r'\{row\}\.(\w+)', template)
+            })
+            db.session.execute(text(f"""
+                CREATE TRIGGER IF NOT EXISTS discover_fts_{table}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO discover_fts({columns}) VALUES ({_discover_values_sql(source, 'new')});
+                END
+            """))
+            db.session.execute(text(f"""
+                CREATE TRIGGER IF NOT EXISTS discover_fts_{table}_ad AFTER DELETE ON {table} BEGIN
+                    DELETE FROM discover_fts WHERE rowid = {old_rowid};
+                END
+            """))
+            db.session.execute(text(f"""
+                CREATE TRIGGER IF NOT EXISTS discover_fts_{table}_au AFTER UPDATE OF {', '.join(watched)} ON {table} BEGIN
+                    DELETE FROM discover_fts WHERE rowid = {old_rowid};
+                    INSERT INTO discover_fts({columns}) VALUES ({_discover_values_sql(source, 'new')});
+                END
+            """))
+
+        if not exists:
+            rebuild_discover_index()
+            print("✅ discover_fts search index created")
+
+        db.session.commit()
+        _discover_fts_available = True
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️  Discovery index unavailable, /api/discover will use LIKE matching: {e}")
+        _discover_fts_available = False
+
+    return _discover_fts_available
+
+def discover_fts_available():
+    global _discover_fts_available
+    if _discover_fts_available is None and db.engine.dialect.name != 'sqlite':
+        _discover_fts_available = False
+    elif _discover_fts_available is None:
+        try:
+            _discover_fts_available = bool(db.session.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'discover_fts'"
+            )).scalar())
+        except Exception:
+            db.session.rollback()
+            _discover_fts_available = False
+    return _discover_fts_available
+
+def discover_search_fts(fts_query, types, offset, limit):
+    """Ranked (type, id, score) hits from discover_fts, plus per-type match counts"""
+    type_params = {f'type_{i}': t for i, t in enumerate(types)}
+    type_filter = ', '.join(f':{name}' for name in type_params)
+    weights = ', '.join(str(weight) for weight in DISCOVER_FTS_WEIGHTS)
+
+    counts = dict(db.session.execute(text(
+        "SELECT type, COUNT(*) FROM discover_fts WHERE discover_fts MATCH :fts_query GROUP BY type"
+    ), {'fts_query': fts_query}).all())
+
+    rows = db.session.execute(text(
+        f"SELECT rowid, type, bm25(discover_fts, {weights}) AS score FROM discover_fts "
+        f"WHERE discover_fts MATCH :fts_query AND type IN ({type_filter}) "
+        f"ORDER BY score, rowid LIMIT :limit OFFSET :offset"
+    ), {'fts_query': fts_query, 'limit': limit, 'offset': offset, **type_params}).all()
+
+    hits = [(row.type, row.rowid // DISCOVER_TYPE_SLOTS, round(-row.score, 4)) for row in rows]
+    return hits, counts
+
+def discover_search_like(search, types, offset, limit):
+    """Fallback without the FTS index: substring match per collection, newest first"""
+    search_filter = f"%{search}%"
+    counts = {}
+    candidates = []
+    for source in DISCOVER_SOURCES:
+        model = source['model']
+        query = db.session.query(model.id, model.created_at).filter(
+            db.or_(*[column.ilike(search_filter) for column in source['like_columns']])
+        )
+        counts[source['type']] = query.order_by(None).count()
+        if source['type'] in types:
+            rows = query.order_by(model.created_at.desc()).limit(offset + limit).all()
+            candidates.extend((row.created_at or datetime.min, source['type'], row.id) for row in rows)
+
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    hits = [(item_type, item_id, None) for _, item_type, item_id in candidates[offset:offset + limit]]
+    return hits, counts
+
+def discover_summary(item_type, item):
+    """Common result shape for /api/discover, with the collection-specific extras under `details`"""
+    if item_type == 'book':
+        authors = [a for a in (item.author_1, item.author_2, item.author_3, item.author_4) if a]
+        return {
+            'title': item.title,
+            'subtitle': ', '.join(authors) or item.author,
+            'identifier': item.access_no,
+            'details': {
+                'isbn': item.isbn,
+                'publisher': item.publisher,
+                'category': item.category,
+                'available_copies': item.available_copies
+            }
+        }
+    if item_type == 'ebook':
+        return {
+            'title': item.web_title,
+            'subtitle': item.subject,
+            'identifier': item.access_no,
+            'details': {'type': item.type, 'website': item.website}
+        }
+    if item_type == 'journal':
+        return {
+            'title': item.journal_name,
+            'subtitle': item.journal_type,
+            'identifier': None,
+            'details': {}
+        }
+    if item_type == 'thesis':
+        return {
+            'title': item.title,
+            'subtitle': item.author,
+            'identifier': item.thesis_number,
+            'details': {
+                'project_guide': item.project_guide,
+                'type': item.type,
+                'department_name': item.department.name if item.department else None
+            }
+        }
+    if item_type == 'news_clipping':
+        return {
+            'title': item.news_title,
+            'subtitle': item.newspaper_name,
+            'identifier': item.clipping_no,
+            'details': {
+                'news_type': item.news_type,
+                'date': item.date.isoformat() if item.date else None
+            }
+        }
+    return {
+        'title': item.subject_name,
+        'subtitle': item.subject_code,
+        'identifier': item.subject_code,
+        'details': {
+            'regulation': item.regulation,
+            'college': item.college.name if item.college else None,
+            'department': item.department.name if item.department else None
+        }
+    }
+
+# Typo-tolerant (fuzzy) search over titles and authors
+# Query words are matched to vocabulary words that share enough trigrams, and the
+# corrected words are then looked up in books_fts (or with LIKE when FTS is unavailable)
+FUZZY_SEARCH_COLUMNS = ['title', 'author_1', 'author_2', 'author_3', 'author_4']
+FUZZY_TERMS_PER_WORD = 5
+FUZZY_MAX_RESULTS = 200
+
+def normalize_search_text(value):
+    """Lowercase, strip accents and split into words, the same way the FTS tokenizer does"""
+    if not value:
+        return []
+    if not value.isascii():
+        decomposed = unicodedata.normalize('NFKD', value)
+        value = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.findall(r'[^\W_]+', value.lower())
+
+def word_trigrams(word):
+    """Trigrams of a word, padded like pg_trgm so short words still get a few"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def trigram_similarity(first, second):
+    first_trigrams = word_trigrams(first)
+    second_trigrams = word_trigrams(second)
+    return len(first_trigrams & second_trigrams) / len(first_trigrams | second_trigrams)
+
+def fuzzy_similarity_threshold(word):
+    # Short words have few trigrams, so one typo costs a larger share of them
+    return 0.3 if len(word) > 4 else 0.2
+
+def book_search_words(book):
+    words = set()
+    for column in FUZZY_SEARCH_COLUMNS:
+        words.update(normalize_search_text(getattr(book, column, None)))
+    return words
+
+def insert_search_terms(words):
+    """Add words (found missing) and their trigrams to the vocabulary"""
+    words = sorted(word for word in words if len(word) <= 100)
+    # Another book write may add the same new word at once; skip the rows it got in first
+    term_insert = conflict_insert(SearchTerm.__table__)
+    term_insert = (SearchTerm.__table__.insert() if term_insert is None
+                   else term_insert.on_conflict_do_nothing(index_elements=['term']))
+    trigram_insert = conflict_insert(SearchTermTrigram.__table__)
+    trigram_insert = SearchTermTrigram.__table__.insert() if trigram_insert is None else trigram_insert.on_conflict_do_nothing()
+    for start in range(0, len(words), 500):
+        chunk = words[start:start + 500]
+        db.session.execute(term_insert, [{'term': word, 'length': len(word)} for word in chunk])
+        term_ids = db.session.query(SearchTerm.term, SearchTerm.id).filter(SearchTerm.term.in_(chunk)).all()
+        db.session.execute(trigram_insert, [
+            {'trigram': trigram, 'term_length': len(term), 'term_id': term_id}
+            for term, term_id in term_ids
+            for trigram in word_trigrams(term)
+        ])
+
+def index_book_search_terms(books):
+    """Add any new title/author words of `books` to the trigram vocabulary.
+    Words of deleted books are left behind; they simply stop matching anything."""
+    words = set()
+    for book in books:
+        words.update(book_search_words(book))
+    if not words:
+        return
+
+    word_list = list(words)
+    for start in range(0, len(word_list), 500):
+        chunk = word_list[start:start + 500]
+        words.difference_update(term for (term,) in db.session.query(SearchTerm.term).filter(SearchTerm.term.in_(chunk)))
+
+    if words:
+        insert_search_terms(words)
+
+def rebuild_search_terms():
+    """Rebuild the trigram vocabulary from every book"""
+    SearchTermTrigram.query.delete()
+    SearchTerm.query.delete()
+
+    words = set()
+    columns = [getattr(Book, column) for column in FUZZY_SEARCH_COLUMNS]
+    for row in db.session.query(*columns).yield_per(5000):
+        for value in row:
+            words.update(normalize_search_text(value))
+
+    insert_search_terms(words)
+    db.session.commit()
+    return len(words)
+
+def fuzzy_term_candidates(word):
+    """Vocabulary words similar to `word` as (term, similarity), best first"""
+    trigrams = word_trigrams(word)
+    threshold = fuzzy_similarity_threshold(word)
+
+    # Estimate similarity from the postings alone (a word of length n has at most n + 1
+    # padded trigrams) so only a short list of the closest words is scored exactly
+    shared = db.func.count(SearchTermTrigram.trigram)
+    estimate = shared * 1.0 / (len(trigrams) + SearchTermTrigram.term_length + 1 - shared)
+    closest = db.session.query(SearchTermTrigram.term_id).filter(
+        SearchTermTrigram.trigram.in_(trigrams),
+        SearchTermTrigram.term_length.between(len(word) - 3, len(word) + 3)
+    ).group_by(SearchTermTrigram.term_id, SearchTermTrigram.term_length).having(
+        estimate >= threshold
+    ).order_by(estimate.desc()).limit(FUZZY_TERMS_PER_WORD * 4).subquery()
+    rows = db.session.query(SearchTerm.term).join(closest, closest.c.term_id == SearchTerm.id).all()
+
+    scored = [(term, trigram_similarity(word, term)) for (term,) in rows]
+    scored = [item for item in scored if item[1] >= threshold]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:FUZZY_TERMS_PER_WORD]
+
+def vocabulary_has_prefix(word):
+    return db.session.query(SearchTerm.id).filter(
+        SearchTerm.term >= word,
+        SearchTerm.term < word + '\uffff'
+    ).first() is not None
+
+def fuzzy_book_search(search, limit=FUZZY_MAX_RESULTS):
+    """Ids of books whose title/authors approximately match `search`, most similar first"""
+    word_matches = []
+    for word in normalize_search_text(search):
+        candidates = [term for term, _ in fuzzy_term_candidates(word)]
+        if candidates or vocabulary_has_prefix(word):
+            word_matches.append((word, candidates))
+        # Words matching nothing in the vocabulary are ignored rather than emptying the result
+
+    if not word_matches:
+        return []
+
+    if books_fts_available():
+        clauses = []
+        for word, candidates in word_matches:
+            alternatives = [f'"{word}"*'] + [f'"{term}"' for term in candidates if term != word]
+            clauses.append('(' + ' OR '.join(alternatives) + ')')
+        fts_query = '{' + ' '.join(FUZZY_SEARCH_COLUMNS) + '} : (' + ' AND '.join(clauses) + ')'
+        # No ORDER BY rank: computing bm25 over a very common word's whole match set is the
+        # slow part, and candidates are re-ranked by similarity below anyway
+        candidate_ids = [row[0] for row in db.session.execute(
+            text("SELECT rowid FROM books_fts WHERE books_fts MATCH :fts_query LIMIT :limit"),
+            {'fts_query': fts_query, 'limit': limit}
+        )]
+    else:
+        columns = [getattr(Book, column) for column in FUZZY_SEARCH_COLUMNS]
+        conditions = []
+        for word, candidates in word_matches:
+            conditions.append(db.or_(*[
+                column.ilike(f'%{term}%') for term in [word] + candidates for column in columns
+            ]))
+        candidate_ids = [row[0] for row in db.session.query(Book.id).filter(*conditions).limit(limit)]
+
+    if not candidate_ids:
+        return []
+
+    # Re-rank by how closely each query word matches the book's own words
+    columns = [getattr(Book, column) for column in FUZZY_SEARCH_COLUMNS]
+    scores = {}
+    for row in db.session.query(Book.id, *columns).filter(Book.id.in_(candidate_ids)):
+        book_words = set()
+        for value in row[1:]:
+            book_words.update(normalize_search_text(value))
+        total = 0.0
+        for word, _ in word_matches:
+            total += max(
+                (1.0 if book_word.startswith(word) else trigram_similarity(word, book_word)
+                 for book_word in book_words),
+                default=0.0
+            )
+        scores[row[0]] = total / len(word_matches)
+
+    position = {book_id: index for index, book_id in enumerate(candidate_ids)}
+    return sorted(scores, key=lambda book_id: (-scores[book_id], position[book_id]))
+
+def ranked_ids_order(column, ranked_ids):
+    """ORDER BY expression that keeps rows in the order of ranked_ids"""
+    return db.case({book_id: index for index, book_id in enumerate(ranked_ids)}, value=column, else_=len(ranked_ids))
+
+# OPAC facet counts, maintained incrementally on every book write
+BOOK_FACETS = ['category', 'department', 'availability']
+
+def book_facet_values(book):
+    """The facet values a book is counted under"""
+    return {
+        'category': (book.category or '').strip(),
+        'department': (book.department or '').strip(),
+        'availability': 'available' if (book.available_copies or 0) > 0 else 'unavailable'
+    }
+
+def book_facet_changes(before=None, after=None, changes=None):
+    """Accumulate the facet count changes of one book write into `changes`"""
+    if changes is None:
+        changes = Counter()
+    if before:
+        for facet, value in before.items():
+            changes[(facet, value)] -= 1
+    if after:
+        for facet, value in after.items():
+            changes[(facet, value)] += 1
+    return changes
+
+def conflict_insert(table):
+    """INSERT for `table` with .on_conflict_do_update()/.on_conflict_do_nothing(), or None on
+    backends without INSERT ... ON CONFLICT. Unlike an UPDATE followed by an INSERT when nothing
+    matched, it can't fail on the unique key when two transactions add the same row at once."""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
+def apply_book_facet_changes(changes):
+    """Add accumulated facet changes to book_facet_counts in the current transaction"""
+    rows = [{'facet': facet, 'value': value, 'count': delta}
+            for (facet, value), delta in changes.items() if delta != 0]
+    if not rows:
+        return
+    table = BookFacetCount.__table__
+    insert = conflict_insert(table)
+    if insert is not None:
+        db.session.execute(insert.on_conflict_do_update(
+            index_elements=['facet', 'value'],
+            set_={'count': table.c['count'] + insert.excluded['count']}
+        ), rows)
+        return
+    for row in rows:
+        updated = BookFacetCount.query.filter_by(facet=row['facet'], value=row['value']).update(
+            {BookFacetCount.count: BookFacetCount.count + row['count']},
+            synchronize_session=False
+        )
+        if not updated:
+            db.session.add(BookFacetCount(**row))
+
+def rebuild_book_facets():
+    """Recount every facet from the books table"""
+    BookFacetCount.query.delete()
+
+    availability = db.case((Book.available_copies > 0, 'available'), else_='unavailable')
+    facet_columns = {
+        'category': db.func.trim(db.func.coalesce(Book.category, '')),
+        'department': db.func.trim(db.func.coalesce(Book.department, '')),
+        'availability': availability
+    }
+    for facet, column in facet_columns.items():
+        rows = db.session.query(column, db.func.count(Book.id)).group_by(column).all()
+        for value, count in rows:
+            db.session.add(BookFacetCount(facet=facet, value=value, count=count))
+
+    db.session.commit()
+
+def get_book_facets():
+    """Facet counts for the OPAC filter UI"""
+    facets = {facet: [] for facet in BOOK_FACETS}
+    rows = BookFacetCount.query.filter(
+        BookFacetCount.count > 0,
+        BookFacetCount.value != ''
+    ).order_by(BookFacetCount.count.desc(), BookFacetCount.value).all()
+
+    for row in rows:
+        if row.facet in facets:
+            facets[row.facet].append({'value': row.value, 'count': row.count})
+    return facets
+
+# Normalized author index (authors, book_authors, author_name_keys)
+# Author filters match the start of any word of any of a book's authors, normalized like the
+# search vocabulary, as index lookups plus a join instead of LIKEs over the author columns
+BOOK_AUTHOR_COLUMNS = ['author_1', 'author_2', 'author_3', 'author_4', 'author']
+
+def normalize_author_name(value):
+    return ' '.join(normalize_search_text(value))[:200]
+
+def author_name_keys(normalized_name):
+    words = normalized_name.split(' ')
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+def book_author_names(book):
+    """{normalized name: name} of a book's authors, in author order, duplicates dropped"""
+    names = {}
+    for column in BOOK_AUTHOR_COLUMNS:
+        value = getattr(book, column, None)
+        normalized_name = normalize_author_name(value)
+        if normalized_name and normalized_name not in names:
+            names[normalized_name] = value.strip()[:200]
+    return names
+
+def author_ids_for(names):
+    """{normalized name: author id} for `names` ({normalized name: name}), adding new authors"""
+    ids = {}
+    normalized_names = list(names)
+    for start in range(0, len(normalized_names), 500):
+        chunk = normalized_names[start:start + 500]
+        ids.update(db.session.query(Author.normalized_name, Author.id).filter(Author.normalized_name.in_(chunk)))
+
+    missing = [normalized_name for normalized_name in normalized_names if normalized_name not in ids]
+    # Another import may add the same new author at once; skip the rows it got in first
+    author_insert = conflict_insert(Author.__table__)
+    author_insert = (Author.__table__.insert() if author_insert is None
+                     else author_insert.on_conflict_do_nothing(index_elements=['normalized_name']))
+    key_insert = conflict_insert(AuthorNameKey.__table__)
+    key_insert = AuthorNameKey.__table__.insert() if key_insert is None else key_insert.on_conflict_do_nothing()
+    for start in range(0, len(missing), 500):
+        chunk = missing[start:start + 500]
+        db.session.execute(author_insert, [
+            {'name': names[normalized_name], 'normalized_name': normalized_name} for normalized_name in chunk
+        ])
+        new_ids = dict(db.session.query(Author.normalized_name, Author.id).filter(Author.normalized_name.in_(chunk)))
+        db.session.execute(key_insert, [
+            {'key': key, 'author_id': author_id}
+            for normalized_name, author_id in new_ids.items()
+            for key in author_name_keys(normalized_name)
+        ])
+        ids.update(new_ids)
+    return ids
+
+def unlink_book_authors(book_ids):
+    for start in range(0, len(book_ids), 500):
+        BookAuthor.query.filter(BookAuthor.book_id.in_(book_ids[start:start + 500])).delete(synchronize_session=False)
+
+def sync_book_authors(books):
+    """Relink `books` (with ids) to their current authors in the current transaction.
+    Authors left without books stay behind; they simply stop matching anything."""
+    names_by_book = {book.id: book_author_names(book) for book in books}
+    ids = author_ids_for({
+        normalized_name: name for names in names_by_book.values() for normalized_name, name in names.items()
+    })
+    unlink_book_authors(list(names_by_book))
+    rows = [
+        {'book_id': book_id, 'author_id': ids[normalized_name], 'position': position}
+        for book_id, names in names_by_book.items()
+        for position, normalized_name in enumerate(names, 1)
+    ]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(BookAuthor.__table__.insert(), rows[start:start + 5000])
+
+def rebuild_book_authors():
+    """Rebuild authors, book_authors and author_name_keys from every book"""
+    BookAuthor.query.delete()
+    AuthorNameKey.query.delete()
+    Author.query.delete()
+
+    columns = [Book.id] + [getattr(Book, column) for column in BOOK_AUTHOR_COLUMNS]
+    batch = []
+    for row in db.session.query(*columns).yield_per(5000):
+        batch.append(row)
+        if len(batch) == 5000:
+            sync_book_authors(batch)
+            batch = []
+    if batch:
+        sync_book_authors(batch)
+
+    db.session.commit()
+    return Author.query.count()
+
+def author_book_ids(author):
+    """SELECT of the ids of books with an author whose name has a word starting with `author`.
+    A book matching through several authors is listed once per author."""
+    normalized_name = normalize_author_name(author)
+    if not normalized_name:
+        return db.select(BookAuthor.book_id).where(db.false())
+    matching_authors = db.select(AuthorNameKey.author_id).where(
+        AuthorNameKey.key >= normalized_name,
+        AuthorNameKey.key < normalized_name + '\uffff'
+    )
+    return db.select(BookAuthor.book_id).where(BookAuthor.author_id.in_(matching_authors))
+
+# Catalogue response cache
+# Cached OPAC responses are keyed on the normalized request parameters plus the catalogue
+# generation, which every book write (including availability changes) bumps in its own
+# transaction, so a committed write invalidates the cache in every worker at once.
+CATALOGUE_GENERATION = 'catalogue'
+
+def bump_catalogue_generation():
+    """Invalidate cached catalogue responses once the current transaction commits"""
+    db.session.info['catalogue_bumps'] = db.session.info.get('catalogue_bumps', 0) + 1
+    # Only ever an UPDATE of the row seed_catalogue_generation creates: two writers inserting
+    # it at once would collide on the primary key
+    CacheGeneration.query.filter_by(name=CATALOGUE_GENERATION).update(
+        {CacheGeneration.value: CacheGeneration.value + 1},
+        synchronize_session=False
+    )
+
+def seed_catalogue_generation():
+    """Create the catalogue generation row if it is missing (run_migrations)"""
+    insert = conflict_insert(CacheGeneration.__table__)
+    if insert is not None:
+        db.session.execute(insert.on_conflict_do_nothing(index_elements=['name']),
+                           {'name': CATALOGUE_GENERATION, 'value': 0})
+    elif db.session.get(CacheGeneration, CATALOGUE_GENERATION) is None:
+        db.session.add(CacheGeneration(name=CATALOGUE_GENERATION, value=0))
+    db.session.commit()
+
+def current_catalogue_generation():
+    value = db.session.query(CacheGeneration.value).filter_by(name=CATALOGUE_GENERATION).scalar()
+    return value or 0
+
+def record_catalogue_write(facet_changes=None, books=None, deleted_books=None):
+    """Bring facet counts, the fuzzy-search vocabulary, the author index, the suggest index and
+    the cache generation up to date with a book write, in the current transaction"""
+    if facet_changes:
+        apply_book_facet_changes(facet_changes)
+    if books:
+        index_book_search_terms(books)
+        if any(book.id is None for book in books):
+            db.session.flush()
+        sync_book_authors(books)
+        for book in books:
+            queue_suggest_change('upsert', book.id, suggest_book_values(book))
+    if deleted_books:
+        # Before the books themselves go, for databases that enforce the foreign key
+        unlink_book_authors([book.id for book in deleted_books])
+    for book in deleted_books or []:
+        queue_suggest_change('delete', book.id)
+    bump_catalogue_generation()
+
+BOOK_RECENT_ISSUE_WINDOW = timedelta(days=30)
+
+def record_book_issue(book):
+    """Count a new issue of `book`: circulation counters, in the caller's transaction, and autocomplete weight"""
+    # SQL-side increments, so two desks issuing the same book don't lose a count
+    book.issue_count = Book.issue_count + 1
+    book.issue_count_30d = Book.issue_count_30d + 1
+    book.last_issued_at = datetime.utcnow()
+    queue_suggest_change('issue', book.id)
+
+def reconcile_book_circulation_counters(book_ids=None):
+    """Recompute issue_count, last_issued_at and issue_count_30d from the loan history
+    (live and archived).
+
+    Run daily so the 30-day count forgets old issues, after deleting loan history, and to
+    repair the counters after circulations are edited outside the app. Limited to `book_ids`
+    when given. The caller commits.
+    """
+    cutoff = datetime.utcnow() - BOOK_RECENT_ISSUE_WINDOW
+    Loan = circulation_history()
+    loans = db.select(db.func.count(Loan.id)).where(Loan.book_id == Book.id)
+    values = {
+        Book.issue_count: loans.scalar_subquery(),
+        Book.last_issued_at: db.select(db.func.max(Loan.issue_date))
+            .where(Loan.book_id == Book.id).scalar_subquery(),
+        Book.issue_count_30d: loans.where(Loan.issue_date >= cutoff).scalar_subquery(),
+    }
+    statement = db.update(Book).values(values)
+    if book_ids is not None:
+        book_ids = list(book_ids)
+        if not book_ids:
+            return 0
+        statement = statement.where(Book.id.in_(book_ids))
+    return db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+def reconcile_book_circulation_counters_job():
+    """Scheduled reconcile: ages the rolling 30-day counts"""
+    with app.app_context():
+        try:
+            updated = reconcile_book_circulation_counters()
+            db.session.commit()
+            app.logger.info(f"Reconciled circulation counters for {updated} books")
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Circulation counter reconcile failed: {e}")
+
+def bump_circulation_daily_stat(day, user, **deltas):
+    """Add `deltas` (issued, returned, overdue, fined, fine_total) to the rollup row for `day`
+    and the member's college and department, in the current transaction"""
+    key = {
+        'date': day,
+        'college_id': user.college_id if user else None,
+        'department_id': user.department_id if user else None
+    }
+    # No unique key: two desks creating the same day's row at once just leave two rows to sum
+    updated = CirculationDailyStat.query.filter_by(**key).update(
+        {getattr(CirculationDailyStat, name): getattr(CirculationDailyStat, name) + delta
+         for name, delta in deltas.items()},
+        synchronize_session=False
+    )
+    if not updated:
+        db.session.add(CirculationDailyStat(**key, **deltas))
+
+def record_circulation_issue(user):
+    """Count a loan issued today to `user` in the daily rollup"""
+    bump_circulation_daily_stat(datetime.utcnow().date(), user, issued=1)
+
+def record_circulation_return(circulation):
+    """Count the return of `circulation` against the day it was issued"""
+    fine_amount = circulation.fine_amount or 0
+    late = circulation.return_date.date() > circulation.due_date.date()
+    bump_circulation_daily_stat(
+        (circulation.issue_date or circulation.return_date).date(), circulation.user,
+        returned=1, overdue=int(late), fined=int(fine_amount > 0), fine_total=fine_amount
+    )
+
+def rebuild_circulation_daily_stats(days=None):
+    """Recompute the daily rollup from the loan history (live and archived), for the issue
+    dates in `days` when given (e.g. after deleting loan history), otherwise entirely. The
+    caller commits."""
+    delete = CirculationDailyStat.query
+    if days is not None:
+        days = sorted(set(days))
+        if not days:
+            return 0
+        delete = delete.filter(CirculationDailyStat.date.in_(days))
+    delete.delete(synchronize_session=False)
+
+    Loan = circulation_history(days[0] if days else None)
+    issue_day = db.func.date(Loan.issue_date, type_=db.Date)
+
+    returned = Loan.return_date.isnot(None)
+    late = db.and_(returned, db.func.date(Loan.return_date) > db.func.date(Loan.due_date))
+    fined = db.func.coalesce(Loan.fine_amount, 0) > 0
+    rows = db.select(
+        issue_day,
+        User.college_id,
+        User.department_id,
+        db.func.count(Loan.id),
+        db.func.sum(db.case((returned, 1), else_=0)),
+        db.func.sum(db.case((late, 1), else_=0)),
+        db.func.sum(db.case((fined, 1), else_=0)),
+        db.func.sum(db.func.coalesce(Loan.fine_amount, 0))
+    ).select_from(Loan).outerjoin(User, User.id == Loan.user_id).where(
+        Loan.issue_date.isnot(None)
+    ).group_by(issue_day, User.college_id, User.department_id)
+    if days is not None:
+        rows = rows.where(issue_day.in_(days))
+
+    columns = ['date', 'college_id', 'department_id', 'issued', 'returned', 'overdue', 'fined', 'fine_total']
+    return db.session.execute(db.insert(CirculationDailyStat).from_select(columns, rows)).rowcount
+
+def circulation_stat_filters(start_date=None, end_date=None, college_id=None, department_id=None):
+    """Rollup row filters for an inclusive issue-date range and optional college/department"""
+    filters = []
+    if start_date:
+        filters.append(CirculationDailyStat.date >= start_date)
+    if end_date:
+        filters.append(CirculationDailyStat.date <= end_date)
+    if college_id:
+        filters.append(CirculationDailyStat.college_id == college_id)
+    if department_id:
+        filters.append(CirculationDailyStat.department_id == department_id)
+    return filters
+
+def circulation_stat_total(column, start_date=None, end_date=None):
+    """Sum of one rollup column over loans issued between two dates"""
+    return db.session.query(db.func.coalesce(db.func.sum(column), 0)).filter(
+        *circulation_stat_filters(start_date, end_date)
+    ).scalar()
+
+def monthly_circulation_stat(column, start_date, end_date, limit=12):
+    """[(YYYY-MM, sum of one rollup column)] for the first `limit` months with loans issued
+    between two dates"""
+    month = month_bucket(CirculationDailyStat.date).label('month')
+    return [
+        (label, int(total)) for label, total in db.session.query(month, db.func.sum(column)).filter(
+            *circulation_stat_filters(start_date, end_date)
+        ).group_by(month).having(db.func.sum(column) > 0).order_by(month).limit(limit).all()
+    ]
+
+def circulation_report_stat_column(report_type):
+    """Rollup column behind an analytics report type's monthly series, or None for
+    'issue_book', whose loans still marked 'issued' the rollup can't tell from overdue ones"""
+    if report_type == 'issue_book':
+        return None
+    if report_type == 'return_book':
+        return CirculationDailyStat.returned
+    if report_type == 'fine':
+        return CirculationDailyStat.fined
+    return CirculationDailyStat.issued
+
+def transaction_statistics(start_date, end_date, college_id=None, department_id=None):
+    """Issued/returned/outstanding totals and per-department breakdown for the transaction
+    statistics pages, summed from the daily rollup"""
+    filters = circulation_stat_filters(start_date, end_date, college_id, department_id)
+    issued_books, returned_books = db.session.query(
+        db.func.coalesce(db.func.sum(CirculationDailyStat.issued), 0),
+        db.func.coalesce(db.func.sum(CirculationDailyStat.returned), 0)
+    ).filter(*filters).one()
+
+    per_department = {
+        row.department_id: row for row in db.session.query(
+            CirculationDailyStat.department_id,
+            db.func.sum(CirculationDailyStat.issued).label('issued'),
+            db.func.sum(CirculationDailyStat.returned).label('returned')
+        ).filter(*filters, CirculationDailyStat.department_id.isnot(None))
+        .group_by(CirculationDailyStat.department_id).all()
+    }
+
+    if department_id:
+        # Single department stats, listed even without loans
+        departments = Department.query.filter(Department.id == department_id).all()
+    else:
+        departments_query = Department.query.filter(Department.id.in_(list(per_department)))
+        if college_id:
+            departments_query = departments_query.filter(Department.college_id == college_id)
+        departments = departments_query.all()
+
+    detailed_stats = []
+    for dept in departments:
+        row = per_department.get(dept.id)
+        dept_issued = int(row.issued) if row else 0
+        dept_returned = int(row.returned) if row else 0
+        detailed_stats.append({
+            'college_name': dept.college.name if dept.college else 'Unknown',
+            'department_name': dept.name,
+            'issued_books': dept_issued,
+            'returned_books': dept_returned,
+            'outstanding_books': dept_issued - dept_returned,
+            'return_rate': round((dept_returned / dept_issued * 100) if dept_issued > 0 else 0, 1)
+        })
+
+    # Sort detailed stats by college name, then by department name
+    detailed_stats.sort(key=lambda x: (x['college_name'], x['department_name']))
+
+    return {
+        'issued_books': int(issued_books),
+        'returned_books': int(returned_books),
+        'outstanding_books': int(issued_books) - int(returned_books),
+        'detailed_stats': detailed_stats
+    }
+
+# Hot/cold archival
+# Returned loans and gate logs past their horizon are moved to circulations_archive and
+# gate_entry_logs_archive, so desks, gate scans and status checks only touch recent rows.
+# Reports over a date range read through circulation_history() / gate_log_history(), which
+# bring the archive in only when the range starts at or before its newest row.
+
+def _history(model, archive_model, date_column, since):
+    newest = db.session.query(db.func.max(getattr(archive_model, date_column))).scalar()
+    if since is not None and not isinstance(since, datetime):
+        since = datetime(since.year, since.month, since.day)
+    if newest is None or (since is not None and since > newest):
+        return model
+    columns = [column.name for column in model.__table__.columns]
+    history = db.union_all(
+        db.select(*[model.__table__.c[name] for name in columns]),
+        db.select(*[archive_model.__table__.c[name] for name in columns])
+    ).subquery(f'{model.__tablename__}_history')
+    return db.aliased(model, history)
+
+def circulation_history(since=None, by='issue_date'):
+    """Circulation, or an alias of it over live and archived loans when loans issued (or
+    returned, with by='return_date') from `since` on (None: all time) may be in the archive.
+    Use it in place of Circulation in report queries."""
+    return _history(Circulation, CirculationArchive, by, since)
+
+def gate_log_history(since=None):
+    """GateEntryLog, or an alias of it over live and archived logs when logs created from
+    `since` on (None: all time) may be in the archive"""
+    return _history(GateEntryLog, GateEntryLogArchive, 'created_date', since)
+
+def archive_rows(model, archive_model, condition, batch_size):
+    """Move the rows of `model` matching `condition` to `archive_model`, committing each
+    chunk of `batch_size` rows on its own so desks and gates can write in between.
+    Returns the number of rows moved."""
+    live, archive = model.__table__, archive_model.__table__
+    columns = [column.name for column in live.columns]
+    # Leave the newest row live: SQLite would hand its id out again once it's deleted
+    condition = db.and_(condition, live.c.id < db.select(db.func.max(live.c.id)).scalar_subquery())
+    moved = 0
+    while True:
+        ids = db.session.execute(
+            db.select(live.c.id).where(condition).order_by(live.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return moved
+        db.session.execute(archive.insert().from_select(
+            columns, db.select(*[live.c[name] for name in columns]).where(live.c.id.in_(ids))
+        ))
+        db.session.execute(live.delete().where(live.c.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+
+def archive_history():
+    """Move returned loans and gate logs older than their configured horizons to the archive"""
+    batch_size = max(1, app.config['ARCHIVE_BATCH_SIZE'])
+    moved = {'circulations': 0, 'gate_entry_logs': 0}
+
+    circulation_days = app.config['ARCHIVE_CIRCULATIONS_AFTER_DAYS']
+    if circulation_days > 0:
+        moved['circulations'] = archive_rows(Circulation, CirculationArchive, db.and_(
+            Circulation.status == 'returned',
+            Circulation.return_date < datetime.utcnow() - timedelta(days=circulation_days),
+            # Fines keep a foreign key to their loan, so those loans stay live
+            ~db.exists().where(Fine.circulation_id == Circulation.id)
+        ), batch_size)
+
+    gate_log_days = app.config['ARCHIVE_GATE_LOGS_AFTER_DAYS']
+    if gate_log_days > 0:
+        # Gate logs are stamped in local time
+        moved['gate_entry_logs'] = archive_rows(
+            GateEntryLog, GateEntryLogArchive,
+            GateEntryLog.created_date < datetime.now() - timedelta(days=gate_log_days),
+            batch_size
+        )
+
+    return moved
+
+def archive_history_job():
+    """Scheduled archival of closed loans and old gate logs"""
+    with app.app_context():
+        try:
+            moved = archive_history()
+            app.logger.info(f"Archived {moved['circulations']} circulations and {moved['gate_entry_logs']} gate logs")
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Archival failed: {e}")
+
+def delete_archived_history(user_id):
+    """Delete a member's archived loans and gate logs in the current transaction. Returns the
+    book ids and issue dates of the deleted loans, for recounting."""
+    loans = db.session.query(CirculationArchive.book_id, CirculationArchive.issue_date).filter_by(user_id=user_id).all()
+    CirculationArchive.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    GateEntryLogArchive.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    return {book_id for book_id, _ in loans}, {issue_date.date() for _, issue_date in loans if issue_date}
+
+class ResponseCache:
+    """In-process LRU of JSON-ready responses, optionally backed by a directory shared between workers"""
+
+    def __init__(self, max_entries=512, shared_dir=None):
+        self.max_entries = max_entries
+        self.shared_dir = shared_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared_generation = None
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(name, params, defaults=None):
+        """Normalize request parameters: drop blanks and default values, sort, lowercase names"""
+        defaults = defaults or {}
+        normalized = {}
+        for key, value in params.items():
+            key = key.lower()
+            value = str(value).strip()
+            if value == '' or defaults.get(key) == value:
+                continue
+            normalized[key] = value
+        return name + '?' + json.dumps(normalized, sort_keys=True)
+
+    def _shared_path(self, key, generation):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.shared_dir, f'{generation}_{digest}.json')
+
+    def get(self, key, generation):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        if self.shared_dir:
+            try:
+                with open(self._shared_path(key, generation), 'r', encoding='utf-8') as f:
+                    value = json.load(f)
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                self._store_local(key, generation, value)
+                return value
+            except (OSError, ValueError):
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, generation, value):
+        self._store_local(key, generation, value)
+        if self.shared_dir:
+            try:
+                self._prune_shared(generation)
+                path = self._shared_path(key, generation)
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(value, f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                app.logger.warning(f"Shared response cache write failed: {e}")
+
+    def _store_local(self, key, generation, value):
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _prune_shared(self, generation):
+        # Files from older generations can never be hit again
+        if self._shared_generation == generation:
+            return
+        self._shared_generation = generation
+        prefix = f'{generation}_'
+        for filename in os.listdir(self.shared_dir):
+            if filename.endswith('.json') and not filename.startswith(prefix):
+                try:
+                    os.remove(os.path.join(self.shared_dir, filename))
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared_hits': self.shared_hits,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'shared_dir': self.shared_dir
+            }
+
+catalogue_cache = ResponseCache(
+    max_entries=app.config['RESPONSE_CACHE_SIZE'],
+    shared_dir=app.config['RESPONSE_CACHE_DIR']
+)
+
+# Autocomplete (suggest) index
+# Titles, authors, publishers and subjects are kept in memory as a sorted array of normalized
+# strings (the whole value plus the tail starting at each later word), so a prefix is two
+# bisects. Each suggestion is weighted by how often its books have been issued. Prefixes that
+# match too many strings to scan per keystroke keep a precomputed list of top candidates.
+# Writes are applied in this worker after they commit; other workers notice the catalogue
+# generation moved and rebuild in the background, at most once per SUGGEST_REFRESH_SECONDS.
+SUGGEST_FIELDS = [
+    ('title', ['title']),
+    ('author', ['author_1', 'author_2', 'author_3', 'author_4']),
+    ('publisher', ['publisher']),
+    ('subject', ['category']),
+]
+SUGGEST_KIND_CODES = {kind: code for code, (kind, _) in enumerate(SUGGEST_FIELDS)}
+SUGGEST_SCAN_LIMIT = 2000
+SUGGEST_HEAVY_CANDIDATES = 50
+SUGGEST_MAX_WORD_STARTS = 4
+SUGGEST_REFRESH_SECONDS = int(os.getenv('SUGGEST_REFRESH_SECONDS', 60))
+
+def suggest_book_values(book):
+    """(kind, display text) pairs a book contributes to the suggest index"""
+    values = []
+    for kind, columns in SUGGEST_FIELDS:
+        for column in columns:
+            value = getattr(book, column, None)
+            if value and value.strip():
+                values.append((kind, value.strip()))
+    return values
+
+def suggest_match_strings(display):
+    words = normalize_search_text(display)
+    if not words:
+        return []
+    strings = [' '.join(words)]
+    for i in range(1, len(words)):
+        if len(strings) >= SUGGEST_MAX_WORD_STARTS:
+            break
+        if len(words[i]) >= 3:
+            strings.append(' '.join(words[i:]))
+    return strings
+
+class SuggestIndex:
+    """In-memory prefix index over catalogue values, weighted by circulation count"""
+
+    def __init__(self, generation=0):
+        self.generation = generation
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._keys = []               # sorted match strings
+        self._refs = array('i')       # entry id of each match string, parallel to _keys
+        self._ids = {}                # (kind code, normalized value) -> entry id
+        self._display = []            # entry id -> display text, None once removed
+        self._kinds = array('b')      # entry id -> index into SUGGEST_FIELDS
+        self._weights = array('q')    # entry id -> issue count summed over its books
+        self._books = array('i')      # entry id -> number of books carrying the value
+        self._book_entries = {}       # book id -> entry ids it contributes
+        self._book_weights = {}       # book id -> issue count, when non-zero
+        self._heavy = {}              # prefix -> candidate entry ids
+
+    def _rank(self, entry_id):
+        return (self._weights[entry_id], self._books[entry_id], -len(self._display[entry_id]))
+
+    def _new_entry(self, key, display, weight):
+        entry_id = len(self._display)
+        self._ids[key] = entry_id
+        self._display.append(display)
+        self._kinds.append(key[0])
+        self._weights.append(weight)
+        self._books.append(1)
+        return entry_id
+
+    def build(self, book_values, book_weights):
+        """Load every book at once: book_values is an iterable of (book id, values)"""
+        pairs = []
+        match_cache = {}  # publishers, subjects and common authors repeat across many books
+        for book_id, values in book_values:
+            weight = book_weights.get(book_id, 0)
+            entry_ids = []
+            for kind, display in values:
+                matches = match_cache.get(display)
+                if matches is None:
+                    matches = match_cache[display] = suggest_match_strings(display)
+                if not matches:
+                    continue
+                key = (SUGGEST_KIND_CODES[kind], matches[0])
+                entry_id = self._ids.get(key)
+                if entry_id is None:
+                    entry_id = self._new_entry(key, display, weight)
+                    pairs.extend((match, entry_id) for match in matches)
+                elif entry_id in entry_ids:
+                    continue
+                else:
+                    self._weights[entry_id] += weight
+                    self._books[entry_id] += 1
+                entry_ids.append(entry_id)
+            self._book_entries[book_id] = tuple(entry_ids)
+            if weight:
+                self._book_weights[book_id] = weight
+        pairs.sort()
+        self._keys = [match for match, _ in pairs]
+        self._refs = array('i', [entry_id for _, entry_id in pairs])
+        self._build_heavy_prefixes()
+
+    def _build_heavy_prefixes(self):
+        # Shortest prefixes first; a longer prefix can only be heavy inside a heavy shorter one.
+        # Entries are ranked once up front so picking each prefix's top candidates is cheap.
+        order = sorted(range(len(self._display)), key=self._rank, reverse=True)
+        position = array('i', bytes(4 * len(order)))
+        for pos, entry_id in enumerate(order):
+            position[entry_id] = pos
+        keys = self._keys
+        ranges = [(0, len(keys))]
+        length = 1
+        while ranges:
+            next_ranges = []
+            for lo, hi in ranges:
+                i = lo
+                while i < hi:
+                    if len(keys[i]) < length:
+                        i += 1
+                        continue
+                    prefix = keys[i][:length]
+                    end = bisect.bisect_left(keys, prefix + '\uffff', i, hi)
+                    if end - i > SUGGEST_SCAN_LIMIT:
+                        entry_ids = set(self._refs[i:end])
+                        self._heavy[prefix] = heapq.nsmallest(
+                            SUGGEST_HEAVY_CANDIDATES, entry_ids, key=position.__getitem__
+                        )
+                        next_ranges.append((i, end))
+                    i = end
+            ranges = next_ranges
+            length += 1
+
+    def _note_candidate(self, entry_id):
+        # A new or heavier entry may now belong in the candidate lists of its heavy prefixes
+        for match in suggest_match_strings(self._display[entry_id]):
+            for length in range(1, len(match) + 1):
+                candidates = self._heavy.get(match[:length])
+                if candidates is None:
+                    break
+                if entry_id not in candidates:
+                    candidates.append(entry_id)
+
+    def _add_value(self, kind, display, weight):
+        matches = suggest_match_strings(display)
+        if not matches:
+            return None
+        key = (SUGGEST_KIND_CODES[kind], matches[0])
+        entry_id = self._ids.get(key)
+        if entry_id is None:
+            entry_id = self._new_entry(key, display, weight)
+            for match in matches:
+                i = bisect.bisect_right(self._keys, match)
+                self._keys.insert(i, match)
+                self._refs.insert(i, entry_id)
+        else:
+            self._weights[entry_id] += weight
+            self._books[entry_id] += 1
+        self._note_candidate(entry_id)
+        return entry_id
+
+    def _remove_value(self, entry_id, weight):
+        self._weights[entry_id] -= weight
+        self._books[entry_id] -= 1
+        if self._books[entry_id] > 0:
+            return
+        matches = suggest_match_strings(self._display[entry_id])
+        for match in matches:
+            i = bisect.bisect_left(self._keys, match)
+            while i < len(self._keys) and self._keys[i] == match:
+                if self._refs[i] == entry_id:
+                    del self._keys[i]
+                    del self._refs[i]
+                    break
+                i += 1
+        del self._ids[(self._kinds[entry_id], matches[0])]
+        self._display[entry_id] = None
+
+    def upsert_book(self, book_id, values):
+        with self._lock:
+            weight = self._book_weights.get(book_id, 0)
+            for entry_id in self._book_entries.pop(book_id, ()):
+                self._remove_value(entry_id, weight)
+            entry_ids = []
+            seen = set()
+            for kind, display in values:
+                key = (kind, ' '.join(normalize_search_text(display)))
+                if key in seen:
+                    continue
+                seen.add(key)
+                entry_id = self._add_value(kind, display, weight)
+                if entry_id is not None:
+                    entry_ids.append(entry_id)
+            self._book_entries[book_id] = tuple(entry_ids)
+
+    def delete_book(self, book_id):
+        with self._lock:
+            weight = self._book_weights.pop(book_id, 0)
+            for entry_id in self._book_entries.pop(book_id, ()):
+                self._remove_value(entry_id, weight)
+
+    def add_issue(self, book_id):
+        with self._lock:
+            if book_id not in self._book_entries:
+                return
+            self._book_weights[book_id] = self._book_weights.get(book_id, 0) + 1
+            for entry_id in self._book_entries[book_id]:
+                self._weights[entry_id] += 1
+                self._note_candidate(entry_id)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def lookup(self, prefix, limit=10, kinds=None):
+        """Top `limit` suggestions whose value (or a later word of it) starts with `prefix`"""
+        prefix = ' '.join(normalize_search_text(prefix))
+        if not prefix:
+            return []
+        with self._lock:
+            candidates = self._heavy.get(prefix)
+            if candidates is not None:
+                live = [entry_id for entry_id in candidates if self._display[entry_id] is not None]
+                live.sort(key=self._rank, reverse=True)
+                del live[SUGGEST_HEAVY_CANDIDATES:]
+                self._heavy[prefix] = live
+                pool = live
+            else:
+                lo = bisect.bisect_left(self._keys, prefix)
+                hi = bisect.bisect_left(self._keys, prefix + '\uffff', lo)
+                # Bounded even for a prefix that has grown heavy since the last build
+                pool = set(self._refs[lo:min(hi, lo + SUGGEST_SCAN_LIMIT)])
+            if kinds:
+                codes = {SUGGEST_KIND_CODES[kind] for kind in kinds if kind in SUGGEST_KIND_CODES}
+                pool = [entry_id for entry_id in pool if self._kinds[entry_id] in codes]
+            top = heapq.nlargest(limit, pool, key=self._rank)
+            return [{
+                'text': self._display[entry_id],
+                'type': SUGGEST_FIELDS[self._kinds[entry_id]][0],
+                'weight': self._weights[entry_id]
+            } for entry_id in top]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'generation': self.generation,
+                'suggestions': len(self._ids),
+                'match_strings': len(self._keys),
+                'books': len(self._book_entries),
+                'heavy_prefixes': len(self._heavy)
+            }
+
+_suggest_index = None
+_suggest_refresh_lock = threading.Lock()
+_suggest_refresh_running = False
+_suggest_last_refresh = 0.0
+
+def build_suggest_index():
+    """Load the suggest index from the database (books plus their issue counts)"""
+    # Read the generation first: a write landing mid-build then only causes an extra refresh
+    index = SuggestIndex(current_catalogue_generation())
+    columns = [Book.id] + [getattr(Book, column) for _, names in SUGGEST_FIELDS for column in names]
+    issue_counts = dict(db.session.query(Book.id, Book.issue_count).filter(Book.issue_count > 0).all())
+    rows = db.session.query(*columns).yield_per(5000)
+    index.build(((row.id, suggest_book_values(row)) for row in rows), issue_counts)
+    return index
+
+def refresh_suggest_index():
+    global _suggest_index, _suggest_last_refresh
+    _suggest_index = build_suggest_index()
+    _suggest_last_refresh = time.monotonic()
+    return _suggest_index
+
+def _refresh_suggest_index_in_background():
+    global _suggest_refresh_running
+    try:
+        with app.app_context():
+            refresh_suggest_index()
+    except Exception as e:
+        app.logger.warning(f"Suggest index refresh failed: {e}")
+    finally:
+        _suggest_refresh_running = False
+
+def start_suggest_index_build():
+    """(Re)build the suggest index on a background thread, unless a build is already running"""
+    global _suggest_refresh_running
+    with _suggest_refresh_lock:
+        if _suggest_refresh_running:
+            return
+        _suggest_refresh_running = True
+    threading.Thread(target=_refresh_suggest_index_in_background, daemon=True).start()
+
+def _forget_suggest_build():
+    # A process forked mid-build (gunicorn --preload) doesn't inherit the thread, only the flag
+    global _suggest_refresh_running, _suggest_refresh_lock
+    _suggest_refresh_lock = threading.Lock()
+    _suggest_refresh_running = False
+
+def get_suggest_index():
+    """The suggest index, or None while the first build is still running; refreshed in the
+    background when another worker changed the catalogue"""
+    if _suggest_index is None:
+        # Normally already under way since server startup (app.py, wsgi.py); requests never wait for it
+        start_suggest_index_build()
+        return None
+
+    if _suggest_index.generation != current_catalogue_generation():
+        if time.monotonic() - _suggest_last_refresh >= SUGGEST_REFRESH_SECONDS:
+            start_suggest_index_build()
+    return _suggest_index
+
+os.register_at_fork(after_in_child=_forget_suggest_build)
+
+def queue_suggest_change(action, book_id, values=None):
+    """Apply a change to the suggest index once the current transaction commits"""
+    db.session.info.setdefault('suggest_changes', []).append((action, book_id, values))
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_suggest_changes(session):
+    changes = session.info.pop('suggest_changes', [])
+    bumps = session.info.pop('catalogue_bumps', 0)
+    index = _suggest_index
+    if index is None:
+        return
+    for action, book_id, values in changes:
+        if action == 'upsert':
+            index.upsert_book(book_id, values)
+        elif action == 'delete':
+            index.delete_book(book_id)
+        elif action == 'issue':
+            index.add_issue(book_id)
+        elif action == 'clear':
+            index.clear()
+    index.generation += bumps
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_suggest_changes(session):
+    session.info.pop('suggest_changes', None)
+    session.info.pop('catalogue_bumps', None)
+
+# Columnar catalogue snapshot
+# An optional read path for the OPAC (CATALOGUE_SNAPSHOT=true): each worker keeps the books
+# table in memory as columns, with string columns dictionary-encoded (interned values plus
+# int32 codes) and numbers, availability and dates in NumPy arrays. Searches filter with
+# vectorized masks and only the page being returned is turned into row objects. Triggers on
+# books append to book_changes, and each request first applies the changes it hasn't seen.
+SNAPSHOT_STRING_COLUMNS = [
+    'access_no', 'title', 'author_1', 'author_2', 'author_3', 'author_4', 'author',
+    'publisher', 'department', 'category', 'location', 'isbn', 'isbn13', 'edition'
+]
+SNAPSHOT_INT_COLUMNS = ['number_of_copies', 'available_copies']
+SNAPSHOT_FLOAT_COLUMNS = ['pages', 'price']  # nullable, NaN for NULL
+SNAPSHOT_SUBSTRING_COLUMNS = ['category', 'department', 'isbn']  # filtered with ILIKE '%x%'
+SNAPSHOT_CHANGE_RETENTION = timedelta(hours=1)
+
+def _lowered(value):
+    # Reuse the original string when it is already lowercase (ISBNs, most access numbers)
+    lowered = value.lower()
+    return value if lowered == value else lowered
+
+class SnapshotBook:
+    """Read-only stand-in for a Book row, with the attributes the OPAC serializers use"""
+    __slots__ = ['id', 'created_at'] + SNAPSHOT_STRING_COLUMNS + SNAPSHOT_INT_COLUMNS + SNAPSHOT_FLOAT_COLUMNS
+
+class CatalogueSnapshot:
+    """Columnar in-memory copy of the books table"""
+
+    def __init__(self):
+        self.last_change_id = 0
+        self.size = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self.row_index = np.full(1, -1, dtype=np.int64)  # book id -> row
+        self.codes = {column: np.empty(0, dtype=np.int32) for column in SNAPSHOT_STRING_COLUMNS}
+        self.vocab = {column: [] for column in SNAPSHOT_STRING_COLUMNS}
+        self.vocab_lower = {column: [] for column in SNAPSHOT_SUBSTRING_COLUMNS}
+        self.vocab_index = {column: {} for column in SNAPSHOT_STRING_COLUMNS}
+        self.ints = {column: np.empty(0, dtype=np.int32) for column in SNAPSHOT_INT_COLUMNS}
+        self.floats = {column: np.empty(0, dtype=np.float64) for column in SNAPSHOT_FLOAT_COLUMNS}
+        self.created_at = np.empty(0, dtype='datetime64[us]')
+        self._title_order = None
+        self._title_position = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def columns():
+        return [Book.id, Book.created_at] + [getattr(Book, column) for column in
+                SNAPSHOT_STRING_COLUMNS + SNAPSHOT_INT_COLUMNS + SNAPSHOT_FLOAT_COLUMNS]
+
+    def _code(self, column, value):
+        if value is None:
+            return -1
+        index = self.vocab_index[column]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self.vocab[column])
+            self.vocab[column].append(sys.intern(value))
+            if column in self.vocab_lower:
+                self.vocab_lower[column].append(_lowered(value))
+        return code
+
+    def _grow(self, capacity):
+        """Make room for `capacity` rows, doubling so repeated appends stay cheap"""
+        if capacity <= len(self.ids):
+            return
+        capacity = max(capacity, 2 * len(self.ids), 1024)
+
+        def resized(array, fill):
+            grown = np.full(capacity, fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self.ids = resized(self.ids, 0)
+        self.alive = resized(self.alive, False)
+        self.created_at = resized(self.created_at, np.datetime64('NaT'))
+        for column in SNAPSHOT_STRING_COLUMNS:
+            self.codes[column] = resized(self.codes[column], -1)
+        for column in SNAPSHOT_INT_COLUMNS:
+            self.ints[column] = resized(self.ints[column], 0)
+        for column in SNAPSHOT_FLOAT_COLUMNS:
+            self.floats[column] = resized(self.floats[column], np.nan)
+
+    def _index_rows(self, book_ids, rows):
+        if len(book_ids) and book_ids.max() >= len(self.row_index):
+            grown = np.full(max(int(book_ids.max()) + 1, 2 * len(self.row_index)), -1, dtype=np.int64)
+            grown[:len(self.row_index)] = self.row_index
+            self.row_index = grown
+        self.row_index[book_ids] = rows
+
+    def _write_row(self, row, book):
+        self.ids[row] = book.id
+        self.alive[row] = True
+        self.created_at[row] = np.datetime64(book.created_at, 'us') if book.created_at else np.datetime64('NaT')
+        for column in SNAPSHOT_STRING_COLUMNS:
+            self.codes[column][row] = self._code(column, getattr(book, column))
+        for column in SNAPSHOT_INT_COLUMNS:
+            self.ints[column][row] = getattr(book, column) or 0
+        for column in SNAPSHOT_FLOAT_COLUMNS:
+            value = getattr(book, column)
+            self.floats[column][row] = np.nan if value is None else float(value)
+
+    def load(self, last_change_id=0):
+        """Fill the snapshot from the whole books table, a column at a time"""
+        with self._lock:
+            self.last_change_id = last_change_id
+            names = ['id', 'created_at'] + SNAPSHOT_STRING_COLUMNS + SNAPSHOT_INT_COLUMNS + SNAPSHOT_FLOAT_COLUMNS
+            rows = db.session.query(*self.columns()).order_by(Book.id).all()
+            values = dict(zip(names, zip(*rows))) if rows else {name: () for name in names}
+            del rows
+            self.size = len(values['id'])
+            self._grow(self.size)
+
+            self.ids[:self.size] = np.array(values['id'], dtype=np.int64)
+            self.alive[:self.size] = True
+            self.created_at[:self.size] = np.array(values['created_at'], dtype='datetime64[us]')
+            for column in SNAPSHOT_STRING_COLUMNS:
+                # Dictionary-encode: int32 codes (-1 for NULL) into a list of distinct values
+                codes, uniques = pd.factorize(np.array(values[column], dtype=object))
+                self.codes[column][:self.size] = codes
+                self.vocab[column] = [sys.intern(value) for value in uniques]
+                self.vocab_index[column] = {value: code for code, value in enumerate(self.vocab[column])}
+                if column in self.vocab_lower:
+                    self.vocab_lower[column] = [_lowered(value) for value in self.vocab[column]]
+            for column in SNAPSHOT_INT_COLUMNS:
+                self.ints[column][:self.size] = np.array([value or 0 for value in values[column]], dtype=np.int32)
+            for column in SNAPSHOT_FLOAT_COLUMNS:
+                self.floats[column][:self.size] = np.array(values[column], dtype=np.float64)
+
+            self._index_rows(self.ids[:self.size], np.arange(self.size))
+            self._title_order = None
+            self._title_position = None
+
+    def apply_changes(self, book_ids):
+        """Re-read the given books from the database; rows that no longer exist are dropped"""
+        with self._lock:
+            found = set()
+            title_changed = False
+            for start in range(0, len(book_ids), 500):
+                chunk = book_ids[start:start + 500]
+                for book in db.session.query(*self.columns()).filter(Book.id.in_(chunk)):
+                    found.add(book.id)
+                    row = self.row_index[book.id] if book.id < len(self.row_index) else -1
+                    if row < 0:
+                        self._grow(self.size + 1)
+                        row = self.size
+                        self.size += 1
+                        self._index_rows(np.array([book.id]), np.array([row]))
+                        title_changed = True
+                    elif self.vocab['title'][self.codes['title'][row]] != book.title:
+                        title_changed = True
+                    self._write_row(row, book)
+            for book_id in book_ids:
+                if book_id not in found and book_id < len(self.row_index) and self.row_index[book_id] >= 0:
+                    self.alive[self.row_index[book_id]] = False
+                    self.row_index[book_id] = -1
+            if title_changed:
+                self._title_order = None
+                self._title_position = None
+
+    def title_order(self):
+        """Rows in (title, id) order, the OPAC's default sort"""
+        if self._title_order is None:
+            vocab = self.vocab['title']
+            vocab_rank = np.empty(len(vocab) + 1, dtype=np.int64)
+            vocab_rank[np.array(sorted(range(len(vocab)), key=vocab.__getitem__), dtype=np.int64)] = np.arange(len(vocab))
+            vocab_rank[-1] = -1  # NULL titles (code -1) sort first, as in SQLite
+            title_rank = vocab_rank[self.codes['title'][:self.size]]
+            self._title_order = np.lexsort((self.ids[:self.size], title_rank))
+        return self._title_order
+
+    def title_position(self):
+        """Each row's position in title_order(), for breaking ties between search matches"""
+        if self._title_position is None:
+            order = self.title_order()
+            self._title_position = np.empty(len(order), dtype=np.int64)
+            self._title_position[order] = np.arange(len(order))
+        return self._title_position
+
+    def _contains(self, column, needle):
+        """Row mask for a case-insensitive substring match, evaluated once per distinct value"""
+        needle = needle.lower()
+        matching = [code for code, value in enumerate(self.vocab_lower[column]) if needle in value]
+        return np.isin(self.codes[column][:self.size], np.array(matching, dtype=np.int32))
+
+    def _rows_mask(self, book_ids):
+        """Row mask selecting the live rows of `book_ids`"""
+        ids = np.asarray(book_ids, dtype=np.int64)
+        rows = self.row_index[ids[ids < len(self.row_index)]]
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows[rows >= 0]] = True
+        return mask
+
+    def search(self, match_ids=None, match_scores=None, category='', author_ids=None, isbn='', department='',
+               availability='all', page=1, per_page=20):
+        """Filter, order and paginate like public_books_search.
+
+        match_ids restricts the rows to search matches, ordered by match_scores (lower is
+        better, then title and id) or, without scores, in the order given. author_ids, when
+        given, restricts them to the books an author filter matched (see author_book_ids).
+        """
+        with self._lock:
+            mask = self.alive[:self.size].copy()
+            if category:
+                mask &= self._contains('category', category)
+            if author_ids is not None:
+                mask &= self._rows_mask(author_ids)
+            if department:
+                mask &= self._contains('department', department)
+            if isbn:
+                isbn13 = normalize_isbn(isbn)
+                if isbn13:
+                    mask &= self.codes['isbn13'][:self.size] == self.vocab_index['isbn13'].get(isbn13, -2)
+                else:
+                    mask &= self._contains('isbn', isbn)
+            available = self.ints['available_copies'][:self.size]
+            if availability == 'available':
+                mask &= available > 0
+            elif availability == 'unavailable':
+                mask &= available == 0
+
+            if match_ids is not None:
+                ids = np.asarray(match_ids, dtype=np.int64)
+                scores = np.arange(len(ids)) if match_scores is None else np.asarray(match_scores, dtype=np.float64)
+                known = ids < len(self.row_index)
+                rows = self.row_index[ids[known]]
+                scores = scores[known]
+                keep = rows >= 0
+                rows, scores = rows[keep], scores[keep]
+                keep = mask[rows]
+                rows, scores = rows[keep], scores[keep]
+                rows = rows[np.lexsort((self.title_position()[rows], scores))]
+            else:
+                order = self.title_order()
+                rows = order[mask[order]]
+
+            total = len(rows)
+            page_rows = rows[(page - 1) * per_page:page * per_page]
+            return [self.book_at(row) for row in page_rows], total
+
+    def book_at(self, row):
+        book = SnapshotBook()
+        book.id = int(self.ids[row])
+        created_at = self.created_at[row]
+        book.created_at = None if np.isnat(created_at) else created_at.item()
+        for column in SNAPSHOT_STRING_COLUMNS:
+            code = self.codes[column][row]
+            setattr(book, column, self.vocab[column][code] if code >= 0 else None)
+        for column in SNAPSHOT_INT_COLUMNS:
+            setattr(book, column, int(self.ints[column][row]))
+        book.pages = None if np.isnan(self.floats['pages'][row]) else int(self.floats['pages'][row])
+        book.price = None if np.isnan(self.floats['price'][row]) else float(self.floats['price'][row])
+        return book
+
+    def memory_report(self):
+        """Approximate bytes held per column (arrays, plus interned values and their lookup dicts)"""
+        with self._lock:
+            columns = {}
+            counted = set()  # interned values shared between columns (author, author_1) count once
+            for column in SNAPSHOT_STRING_COLUMNS:
+                vocab = self.vocab[column]
+                lower = self.vocab_lower.get(column, [])
+                strings = 0
+                for value in vocab + lower:
+                    if id(value) not in counted:
+                        counted.add(id(value))
+                        strings += sys.getsizeof(value)
+                lookups = sys.getsizeof(vocab) + sys.getsizeof(lower) + sys.getsizeof(self.vocab_index[column])
+                columns[column] = {
+                    'distinct_values': len(vocab),
+                    'bytes': int(self.codes[column].nbytes + strings + lookups)
+                }
+            for column in SNAPSHOT_INT_COLUMNS:
+                columns[column] = {'bytes': int(self.ints[column].nbytes)}
+            for column in SNAPSHOT_FLOAT_COLUMNS:
+                columns[column] = {'bytes': int(self.floats[column].nbytes)}
+            columns['created_at'] = {'bytes': int(self.created_at.nbytes)}
+            overhead = self.ids.nbytes + self.alive.nbytes + self.row_index.nbytes
+            for order in (self._title_order, self._title_position):
+                if order is not None:
+                    overhead += order.nbytes
+            total = overhead + sum(info['bytes'] for info in columns.values())
+            return {
+                'rows': int(self.alive[:self.size].sum()),
+                'capacity': len(self.ids),
+                'last_change_id': self.last_change_id,
+                'total_bytes': int(total),
+                'total_mib': round(total / 2 ** 20, 1),
+                'index_bytes': int(overhead),
+                'columns': columns
+            }
+
+_catalogue_snapshot = None
+_catalogue_snapshot_lock = threading.Lock()
+_book_changes_pruned_at = 0.0
+
+def catalogue_snapshot_enabled():
+    """Whether CATALOGUE_SNAPSHOT applies on this backend. Snapshots advance past the highest
+    book_changes id they have applied, which is only safe while ids are handed out in commit
+    order: SQLite has one writer at a time, but PostgreSQL draws ids from a sequence, so a
+    transaction holding id N can commit after one holding N+1 and change N would never be seen."""
+    return app.config['CATALOGUE_SNAPSHOT'] and db.engine.dialect.name == 'sqlite'
+
+def setup_book_change_log():
+    """Create (or, with the snapshot disabled, drop) the triggers that feed book_changes"""
+    dialect = db.engine.dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        return False
+
+    enabled = catalogue_snapshot_enabled()
+    events = [('ai', 'INSERT', 'new'), ('au', 'UPDATE', 'new'), ('ad', 'DELETE', 'old')]
+    try:
+        if dialect == 'postgresql':
+            # Left behind by earlier versions that fed the snapshot on PostgreSQL too
+            for suffix, _, _ in events:
+                db.session.execute(text(f"DROP TRIGGER IF EXISTS book_changes_{suffix} ON books"))
+            db.session.execute(text("DROP FUNCTION IF EXISTS log_book_change()"))
+        else:
+            for suffix, operation, row in events:
+                if enabled:
+                    db.session.execute(text(f"""
+                        CREATE TRIGGER IF NOT EXISTS book_changes_{suffix} AFTER {operation} ON books BEGIN
+                            INSERT INTO book_changes(book_id, changed_at) VALUES ({row}.id, CURRENT_TIMESTAMP);
+                        END
+                    """))
+                else:
+                    # Nothing reads the log, so don't let it grow
+                    db.session.execute(text(f"DROP TRIGGER IF EXISTS book_changes_{suffix}"))
+        if not enabled:
+            BookChange.query.delete()
+        db.session.commit()
+        return enabled
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️  Book change log unavailable, catalogue snapshots will reload in full: {e}")
+        return False
+
+def prune_book_changes():
+    """Drop old change-log entries, always keeping the newest so snapshots can detect a gap"""
+    newest = db.session.query(db.func.max(BookChange.id)).scalar()
+    if newest is None:
+        return
+    BookChange.query.filter(
+        BookChange.changed_at < datetime.utcnow() - SNAPSHOT_CHANGE_RETENTION,
+        BookChange.id < newest
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+def get_catalogue_snapshot():
+    """This worker's catalogue snapshot brought up to date, or None when the option is off"""
+    global _catalogue_snapshot, _book_changes_pruned_at
+    if not catalogue_snapshot_enabled():
+        return None
+
+    with _catalogue_snapshot_lock:
+        newest, oldest = db.session.query(db.func.max(BookChange.id), db.func.min(BookChange.id)).one()
+        snapshot = _catalogue_snapshot
+        if snapshot is not None and (newest or 0) == snapshot.last_change_id:
+            return snapshot
+
+        if snapshot is None or oldest is None or snapshot.last_change_id < oldest - 1:
+            # First use, or the log was pruned past what this worker has seen
+            snapshot = CatalogueSnapshot()
+            snapshot.load(newest or 0)
+            _catalogue_snapshot = snapshot
+        else:
+            changed = [book_id for (book_id,) in db.session.query(BookChange.book_id).filter(
+                BookChange.id > snapshot.last_change_id,
+                BookChange.id <= newest
+            ).distinct()]
+            snapshot.apply_changes(changed)
+            snapshot.last_change_id = newest
+
+        if time.monotonic() - _book_changes_pruned_at >= SNAPSHOT_CHANGE_RETENTION.total_seconds() / 4:
+            _book_changes_pruned_at = time.monotonic()
+            prune_book_changes()
+        return snapshot
+
+def book_search_matches(search):
+    """(ids, scores) of the books matching the OPAC search text, lower scores first.
+    Scores are None when the ids are already in result order."""
+    fts_query = build_fts_query(search)
+    if fts_query and books_fts_available():
+        # Unordered: the snapshot sorts by score, title and id itself
+        weights = ', '.join(str(weight) for weight in BOOKS_FTS_WEIGHTS)
+        rows = db.session.execute(
+            text(f"SELECT rowid, bm25(books_fts, {weights}) FROM books_fts WHERE books_fts MATCH :fts_query"),
+            {'fts_query': fts_query}
+        ).all()
+        return [row[0] for row in rows], [row[1] for row in rows]
+    query = apply_books_like_search(db.session.query(Book.id), search).order_by(Book.title, Book.id)
+    return [book_id for (book_id,) in query], None
+
+# Public OPAC API Routes (No Authentication Required)
+@app.route('/api/books/search', methods=['GET'])
+def public_books_search():
+    """Public endpoint for OPAC book search"""
+    try:
+        cache_key = ResponseCache.make_key('books_search', request.args, {'page': '1', 'per_page': '20', 'availability': 'all'})
+        generation = current_catalogue_generation()
+        cached = catalogue_cache.get(cache_key, generation)
+        if cached is not None:
+            return jsonify(cached), 200
+
+        search = request.args.get('search', '')
+        category = request.args.get('category', '')
+        author = request.args.get('author', '')
+        isbn = request.args.get('isbn', '')
+        department = request.args.get('department', '')
+        availability = request.args.get('availability', 'all')
+        page = int(request.args.get('page', 1))
+        per_page = min(int(request.args.get('per_page', 20)), 100)  # Limit to 100 per page
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
+        include_facets = request.args.get('facets', 'false').lower() == 'true'
+        fuzzy = request.args.get('fuzzy', 'false').lower() == 'true'
+        fields, unknown = parse_fields_param(request.args.get('fields'), PUBLIC_BOOK_FIELDS)
+        if unknown:
+            return unknown_fields_error(unknown, PUBLIC_BOOK_FIELDS)
+
+        snapshot = get_catalogue_snapshot() if cursor is None else None
+        if snapshot is not None:
+            # Columnar in-memory read path; the database only supplies search matches
+            match_ids, match_scores = None, None
+            if search and fuzzy:
+                match_ids = fuzzy_book_search(search)
+            elif search:
+                match_ids, match_scores = book_search_matches(search)
+            author_ids = [book_id for (book_id,) in db.session.execute(author_book_ids(author))] if author else None
+            items, total = snapshot.search(
+                match_ids, match_scores, category=category, author_ids=author_ids, isbn=isbn, department=department,
+                availability=availability, page=page, per_page=per_page
+            )
+            pages = (total + per_page - 1) // per_page
+            page_info = {
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'pages': pages,
+                'has_next': page < pages,
+                'has_prev': page > 1
+            }
+        else:
+            # Build query
+            query = Book.query
+            order_by = [Book.title, Book.id]
+
+            # Apply filters
+            if search and fuzzy:
+                # Typo-tolerant match through the trigram index, most similar first
+                ranked_ids = fuzzy_book_search(search)
+                query = query.filter(Book.id.in_(ranked_ids))
+                if ranked_ids:
+                    order_by = [ranked_ids_order(Book.id, ranked_ids), Book.title, Book.id]
+            elif search:
+                fts_match = books_fts_subquery(search)
+                if fts_match is not None:
+                    # Full-text index lookup, best BM25 matches first
+                    query = query.join(fts_match, fts_match.c.book_id == Book.id)
+                    order_by = [fts_match.c.rank, Book.title, Book.id]
+                else:
+                    query = apply_books_like_search(query, search)
+
+            if category:
+                query = query.filter(Book.category.ilike(f"%{category}%"))
+
+            if author:
+                query = query.filter(Book.id.in_(author_book_ids(author)))
+
+            if isbn:
+                isbn13 = normalize_isbn(isbn)
+                if isbn13:
+                    # Indexed exact match on the canonical ISBN-13
+                    query = query.filter(Book.isbn13 == isbn13)
+                else:
+                    query = query.filter(Book.isbn.ilike(f"%{isbn}%"))
+
+            if department:
+                query = query.filter(Book.department.ilike(f"%{department}%"))
+
+            if availability == 'available':
+                query = query.filter(Book.available_copies > 0)
+            elif availability == 'unavailable':
+                query = query.filter(Book.available_copies == 0)
+
+            if fields:
+                # Sparse fieldset: select only the requested columns (plus the keyset sort keys)
+                query = select_fields(query, PUBLIC_BOOK_FIELDS, fields, [Book.title, Book.id])
+
+            if cursor is not None:
+                # Keyset pagination always walks the catalogue in (title, id) order
+                sort_keys = [(Book.title, False), (Book.id, False)]
+                cursor_values = decode_cursor(cursor, sort_keys)
+                if cursor_values is None:
+                    return jsonify({'error': 'Invalid cursor'}), 400
+                items, page_info = keyset_paginate(
+                    query, sort_keys, cursor_values, per_page,
+                    lambda book: (book.title, book.id), include_total
+                )
+            else:
+                # Order by relevance when searching, otherwise by title
+                query = query.order_by(*order_by)
+
+                # Paginate
+                pagination = query.paginate(
+                    page=page,
+                    per_page=per_page,
+                    error_out=False
+                )
+                items = pagination.items
+                page_info = {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': pagination.total,
+                    'pages': pagination.pages,
+                    'has_next': pagination.has_next,
+                    'has_prev': pagination.has_prev
+                }
+
+        if fields:
+            books = serialize_fields(items, PUBLIC_BOOK_FIELDS, fields)
+        else:
+            books = []
+            for book in items:
+                # Create authors list for display
+                authors = [book.author_1] if book.author_1 else []
+                if book.author_2:
+                    authors.append(book.author_2)
+                if book.author_3:
+                    authors.append(book.author_3)
+                if book.author_4:
+                    authors.append(book.author_4)
+
+                books.append({
+                    'id': book.id,
+                    'title': book.title,
+                    # Multiple authors
+                    'author_1': book.author_1,
+                    'author_2': book.author_2,
+                    'author_3': book.author_3,
+                    'author_4': book.author_4,
+                    'authors': authors,  # Combined authors list for easy display
+                    # Legacy author field for backward compatibility
+                    'author': book.author or book.author_1,
+                    'publisher': book.publisher,
+                    'category': book.category,
+                    'department': book.department,
+                    'location': book.location,
+                    'access_no': book.access_no,
+                    'isbn': book.isbn,
+                    'number_of_copies': book.number_of_copies,
+                    'available_copies': book.available_copies,
+                    # New fields
+                    'pages': book.pages,
+                    'price': float(book.price) if book.price else None,
+                    'edition': book.edition,
+                    'created_at': book.created_at.isoformat() if book.created_at else None
+                })
+
+        response = {
+            'books': books,
+            'pagination': page_info
+        }
+        if include_facets:
+            # Catalogue-wide counts from the precomputed facet table
+            response['facets'] = get_book_facets()
+
+        catalogue_cache.set(cache_key, generation, response)
+        return jsonify(response), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Recount OPAC facets from scratch (e.g. after editing books outside the app)
+@app.route('/api/admin/books/facets/rebuild', methods=['POST'])
+@jwt_required()
+def rebuild_book_facets_endpoint():
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+
+        rebuild_book_facets()
+        bump_catalogue_generation()
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Facet counts rebuilt successfully',
+            'facets': get_book_facets()
         }), 200
-
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/admin/categories/<int:category_id>', methods=['DELETE'])
+# Recount the per-book circulation counters from the loan history
+@app.route('/api/admin/books/circulation-counters/reconcile', methods=['POST'])
 @jwt_required()
-def delete_category(category_id):
+def reconcile_book_circulation_counters_endpoint():
     try:
-        category = Category.query.get_or_404(category_id)
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
 
-        # Check if category is being used by any books
-        books_using_category = Book.query.filter_by(category=category.name).count()
-        ebooks_using_category = Ebook.query.filter_by(category=category.name).count()
+        updated = reconcile_book_circulation_counters()
+        db.session.commit()
 
-        if books_using_category > 0 or ebooks_using_category > 0:
-            return jsonify({
-                'error': f'Cannot delete category "{category.name}" as it is being used by {books_using_category + ebooks_using_category} book(s)'
-            }), 400
+        return jsonify({
+            'message': 'Circulation counters reconciled successfully',
+            'books_updated': updated
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
-        db.session.delete(category)
-        db.session.commit()
+# Rebuild the daily circulation rollup from the loan history
+@app.route('/api/admin/circulation/daily-stats/rebuild', methods=['POST'])
+@jwt_required()
+def rebuild_circulation_daily_stats_endpoint():
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
 
-        return jsonify({'message': 'Category deleted successfully'}), 200
+        rows = rebuild_circulation_daily_stats()
+        db.session.commit()
 
+        return jsonify({
+            'message': 'Daily circulation statistics rebuilt successfully',
+            'rows': rows
+        }), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-# Public OPAC API Routes (No Authentication Required)
-@app.route('/api/books/search', methods=['GET'])
-def public_books_search():
-    """Public endpoint for OPAC book search"""
+@app.cli.command('backfill-circulation-stats')
+def backfill_circulation_stats_command():
+    """Rebuild circulation_daily_stats from the circulations table"""
+    rows = rebuild_circulation_daily_stats()
+    db.session.commit()
+    print(f"✅ Daily circulation statistics rebuilt ({rows} rows)")
+
+@app.cli.command('reconcile-book-counters')
+def reconcile_book_counters_command():
+    """Recount issue_count and age issue_count_30d for every book (the nightly 02:00 job)"""
+    updated = reconcile_book_circulation_counters()
+    db.session.commit()
+    print(f"✅ Circulation counters reconciled ({updated} books updated)")
+
+@app.cli.command('rebuild-author-index')
+def rebuild_author_index_command():
+    """Rebuild authors, book_authors and author_name_keys from the books table"""
+    author_count = rebuild_book_authors()
+    print(f"✅ Author index rebuilt ({author_count} authors)")
+
+# Move closed loans and old gate logs to the archive tables now instead of waiting for the nightly run
+@app.route('/api/admin/archive/run', methods=['POST'])
+@jwt_required()
+def run_archive_endpoint():
     try:
-        search = request.args.get('search', '')
-        category = request.args.get('category', '')
-        author = request.args.get('author', '')
-        isbn = request.args.get('isbn', '')
-        department = request.args.get('department', '')
-        availability = request.args.get('availability', 'all')
-        page = int(request.args.get('page', 1))
-        per_page = min(int(request.args.get('per_page', 20)), 100)  # Limit to 100 per page
-
-        # Build query
-        query = Book.query
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
 
-        # Apply filters
-        if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    Book.title.ilike(search_filter),
-                    Book.author.ilike(search_filter),
-                    Book.access_no.ilike(search_filter),
-                    Book.isbn.ilike(search_filter) if Book.isbn else False
-                )
-            )
+        moved = archive_history()
 
-        if category:
-            query = query.filter(Book.category.ilike(f"%{category}%"))
+        return jsonify({
+            'message': 'Archival completed successfully',
+            'archived': moved
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
-        if author:
-            query = query.filter(Book.author.ilike(f"%{author}%"))
+@app.cli.command('archive-history')
+def archive_history_command():
+    """Move returned loans and gate logs past their horizons to the archive tables"""
+    moved = archive_history()
+    print(f"✅ Archived {moved['circulations']} circulations and {moved['gate_entry_logs']} gate logs")
 
-        if isbn:
-            query = query.filter(Book.isbn.ilike(f"%{isbn}%"))
+# Catalogue response cache statistics
+@app.route('/api/admin/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        if not user or user.role not in ['admin', 'librarian']:
+            return jsonify({'error': 'Admin/Librarian access required'}), 403
 
-        if department:
-            query = query.filter(Book.department.ilike(f"%{department}%"))
+        return jsonify({
+            'catalogue_cache': catalogue_cache.stats(),
+            'catalogue_generation': current_catalogue_generation(),
+            'suggest_index': _suggest_index.stats() if _suggest_index is not None else None,
+            'catalogue_snapshot': _catalogue_snapshot.memory_report() if _catalogue_snapshot is not None else None
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        if availability == 'available':
-            query = query.filter(Book.available_copies > 0)
-        elif availability == 'unavailable':
-            query = query.filter(Book.available_copies == 0)
+# Unified search across every public collection
+@app.route('/api/discover', methods=['GET'])
+def discover():
+    """Public endpoint: merged, ranked search over books, e-resources, journals, theses, news clippings and question banks"""
+    try:
+        search = request.args.get('search', request.args.get('q', '')).strip()
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(int(request.args.get('per_page', 20)), 100)
+        types_param = request.args.get('types', '')
+
+        if types_param:
+            types = [t.strip() for t in types_param.split(',') if t.strip()]
+            unknown = [t for t in types if t not in DISCOVER_TYPES]
+            if unknown:
+                return jsonify({
+                    'error': f"Unknown type(s): {', '.join(unknown)}",
+                    'available_types': list(DISCOVER_TYPES)
+                }), 400
+        else:
+            types = list(DISCOVER_TYPES)
 
-        # Order by title
-        query = query.order_by(Book.title)
+        if not search:
+            return jsonify({'error': 'Search text is required'}), 400
 
-        # Paginate
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        offset = (page - 1) * per_page
+        fts_query = build_fts_query(search)
+        if fts_query and discover_fts_available():
+            hits, counts = discover_search_fts(fts_query, types, offset, per_page)
+        else:
+            hits, counts = discover_search_like(search, types, offset, per_page)
+        counts = {item_type: counts.get(item_type, 0) for item_type in DISCOVER_TYPES}
+
+        # Load each collection's hits with one query
+        ids_by_type = {}
+        for item_type, item_id, _ in hits:
+            ids_by_type.setdefault(item_type, []).append(item_id)
+        items_by_key = {}
+        for item_type, ids in ids_by_type.items():
+            model = DISCOVER_TYPES[item_type]['model']
+            for item in model.query.filter(model.id.in_(ids)).all():
+                items_by_key[(item_type, item.id)] = item
 
-        books = []
-        for book in pagination.items:
-            # Create authors list for display
-            authors = [book.author_1] if book.author_1 else []
-            if book.author_2:
-                authors.append(book.author_2)
-            if book.author_3:
-                authors.append(book.author_3)
-            if book.author_4:
-                authors.append(book.author_4)
-
-            books.append({
-                'id': book.id,
-                'title': book.title,
-                # Multiple authors
-                'author_1': book.author_1,
-                'author_2': book.author_2,
-                'author_3': book.author_3,
-                'author_4': book.author_4,
-                'authors': authors,  # Combined authors list for easy display
-                # Legacy author field for backward compatibility
-                'author': book.author or book.author_1,
-                'publisher': book.publisher,
-                'category': book.category,
-                'department': book.department,
-                'location': book.location,
-                'access_no': book.access_no,
-                'isbn': book.isbn,
-                'number_of_copies': book.number_of_copies,
-                'available_copies': book.available_copies,
-                # New fields
-                'pages': book.pages,
-                'price': float(book.price) if book.price else None,
-                'edition': book.edition,
-                'created_at': book.created_at.isoformat() if book.created_at else None
+        results = []
+        for item_type, item_id, score in hits:
+            item = items_by_key.get((item_type, item_id))
+            if item is None:
+                continue
+            results.append({
+                'type': item_type,
+                'id': item_id,
+                'score': score,
+                **discover_summary(item_type, item)
             })
 
+        total = sum(counts[item_type] for item_type in types)
+        pages = (total + per_page - 1) // per_page
         return jsonify({
-            'books': books,
+            'results': results,
+            'counts': counts,
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
+                'total': total,
+                'pages': pages,
+                'has_next': page < pages,
+                'has_prev': page > 1
             }
         }), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Search-box autocomplete
+@app.route('/api/books/suggest', methods=['GET'])
+def suggest_books():
+    """Public endpoint: top prefix matches over titles, authors, publishers and subjects"""
+    try:
+        prefix = request.args.get('q', request.args.get('search', ''))
+        limit = max(1, min(int(request.args.get('limit', 10)), 20))
+        types_param = request.args.get('types', '')
+        kinds = {t.strip() for t in types_param.split(',') if t.strip()} or None
+
+        index = get_suggest_index()
+        if index is None:
+            # Still loading after a (re)start; the search box just shows nothing meanwhile
+            return jsonify({'suggestions': [], 'warming': True}), 200
+        suggestions = index.lookup(prefix, limit, kinds)
+        return jsonify({'suggestions': suggestions}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/categories/public', methods=['GET'])
 def public_categories():
     """Public endpoint for OPAC categories"""
@@ -2400,6 +5786,9 @@ def get_users():
         per_page = int(request.args.get('per_page', 10))
         search = request.args.get('search', '')
         include_expired = request.args.get('include_expired', 'false').lower() == 'true'
+        fields, unknown = parse_fields_param(request.args.get('fields'), USER_LIST_FIELDS)
+        if unknown:
+            return unknown_fields_error(unknown, USER_LIST_FIELDS)
 
         # Start with base query
         if include_expired:
@@ -2423,8 +5812,41 @@ def get_users():
                 User.email.contains(search) |
                 User.user_id.contains(search)
             )
+        if fields:
+            # Sparse fieldset: select only the requested columns (plus the keyset sort keys)
+            if 'college' in fields:
+                query = query.outerjoin(College, User.college_id == College.id)
+            if 'department' in fields:
+                query = query.outerjoin(Department, User.department_id == Department.id)
+            query = select_fields(query, USER_LIST_FIELDS, fields, [User.created_at, User.id])
+
+        cursor = request.args.get('cursor')
+        if cursor is not None:
+            # Keyset pagination on (created_at, id), total only on request
+            include_total = request.args.get('include_total', 'false').lower() == 'true'
+            sort_keys = [(User.created_at, False), (User.id, False)]
+            cursor_values = decode_cursor(cursor, sort_keys)
+            if cursor_values is None:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            items, pagination = keyset_paginate(
+                query, sort_keys, cursor_values, per_page,
+                lambda user: (user.created_at, user.id), include_total
+            )
+        else:
+            users = query.paginate(page=page, per_page=per_page, error_out=False)
+            items = users.items
+            pagination = {
+                'page': users.page,
+                'pages': users.pages,
+                'per_page': users.per_page,
+                'total': users.total
+            }
 
-        users = query.paginate(page=page, per_page=per_page, error_out=False)
+        if fields:
+            return jsonify({
+                'users': serialize_fields(items, USER_LIST_FIELDS, fields),
+                'pagination': pagination
+            }), 200
 
         return jsonify({
             'users': [{
@@ -2448,13 +5870,8 @@ def get_users():
                 'expiration_status': user.get_expiration_status(),
                 'is_expired': user.is_expired(),
                 'is_account_active': user.is_account_active()
-            } for user in users.items],
-            'pagination': {
-                'page': users.page,
-                'pages': users.pages,
-                'per_page': users.per_page,
-                'total': users.total
-            }
+            } for user in items],
+            'pagination': pagination
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -2572,6 +5989,74 @@ def create_user():
         return jsonify({'error': str(e)}), 500
 
 # Bulk User Upload
+_password_hash_pool = None
+_password_hash_pool_lock = threading.Lock()
+
+def hash_passwords(passwords):
+    """generate_password_hash for each password, spread over PASSWORD_HASH_WORKERS processes.
+    Key derivation is CPU-bound and holds the GIL, so threads wouldn't help."""
+    global _password_hash_pool
+    workers = app.config['PASSWORD_HASH_WORKERS']
+    if workers > 1 and len(passwords) >= workers:
+        with _password_hash_pool_lock:
+            if _password_hash_pool is None or _password_hash_pool._max_workers != workers:
+                if _password_hash_pool is not None:
+                    _password_hash_pool.shutdown(wait=False)
+                _password_hash_pool = ProcessPoolExecutor(workers)
+            pool = _password_hash_pool
+        try:
+            return list(pool.map(generate_password_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+        except BrokenProcessPool:
+            app.logger.warning('Password hashing pool died; hashing in this process')
+            with _password_hash_pool_lock:
+                if _password_hash_pool is pool:
+                    _password_hash_pool = None
+    return [generate_password_hash(password) for password in passwords]
+
+def user_sheet_columns(values, college_id, department_id, user_role):
+    return {
+        'username': values['email'],  # the email doubles as the username, and both are unique
+        'role': 'student',
+        'designation': user_role,
+        # Librarians don't need to change password on first login; everyone else does
+        'first_login_completed': user_role == 'librarian',
+    }
+
+# Member sheets; college, department and role come from the upload form. Passwords
+# (User.generate_password) are hashed by import_user_sheet.
+USER_SHEET = SheetSchema(User, [
+    SheetField('user_id', 'User ID', required=True),
+    SheetField('name', required=True),
+    SheetField('email', required=True),
+    SheetField('validity_date', type='date', required=True),
+    SheetField('dob', 'Date of birth', type='date', required=True),
+    SheetField('batch_from', type='year'),
+    SheetField('batch_to', type='year'),
+], unique=[('user_id', 'User ID', [User.user_id]), ('email', 'Email', [User.email, User.username])],
+   derive=user_sheet_columns)
+
+def import_user_sheet(df, college_id, department_id, user_role, timings=None):
+    """Validate, hash and insert a member sheet; adds seconds per stage to `timings` if given"""
+    timings = Counter() if timings is None else timings
+    start = time.perf_counter()
+    rows, row_numbers, errors = validate_sheet(USER_SHEET, df, college_id=college_id, department_id=department_id,
+                                              user_role=user_role)
+    timings['validate'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    password_hashes = hash_passwords([User.generate_password(row['user_id']) for row in rows])
+    for row, password_hash in zip(rows, password_hashes):
+        row['password_hash'] = password_hash
+    timings['hash'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    inserted, insert_errors = insert_import_rows(User, rows, row_numbers)
+    errors.update(insert_errors)
+    timings['insert'] += time.perf_counter() - start
+    return inserted, errors
+
+IMPORT_JOB_KINDS['users'] = (USER_SHEET.required_columns, import_user_sheet)
+
 @app.route('/api/admin/users/bulk', methods=['POST'])
 @jwt_required()
 def bulk_create_users():
@@ -2592,92 +6077,59 @@ def bulk_create_users():
         if not college_id or not department_id:
             return jsonify({'error': 'College and department are required'}), 400
 
+        # Seconds spent reading, validating, hashing and inserting, reported with the result
+        timings = Counter()
+
+        def import_chunk(df):
+            return import_user_sheet(df, int(college_id), int(department_id), user_role, timings)
+
+        def rounded_timings():
+            return {stage: round(seconds, 3) for stage, seconds in timings.items()}
+
+        params = {'college_id': int(college_id), 'department_id': int(department_id), 'user_role': user_role}
+        checkpoint_key = upload_checkpoint_key('users', params, file.stream)
+        if wants_background_import():
+            # Passwords follow User.generate_password, so credentials can be issued from the sheet
+            return start_import_job('users', file, params, user_id_jwt, checkpoint_key)
+        if wants_streaming_import():
+            if not file.filename.lower().endswith('.csv'):
+                return jsonify({'error': 'Streaming imports need a CSV file'}), 400
+            summary, error = stream_csv_import(file, USER_SHEET.required_columns, import_chunk, checkpoint_key)
+            if error:
+                return jsonify({'error': error}), 400
+            # Reading is interleaved with the other stages when streaming
+            summary['timings'] = rounded_timings()
+            return streaming_import_response(summary, 'users')
+
         # Read Excel file
-        import pandas as pd
-        df = pd.read_excel(file)
+        start = time.perf_counter()
+        df = pd.read_excel(file, dtype=str)
+        timings['read'] += time.perf_counter() - start
 
         # Validate required columns
-        required_columns = ['user_id', 'name', 'email', 'validity_date', 'dob']
-        if not all(col in df.columns for col in required_columns):
-            return jsonify({'error': f'Excel file must contain columns: {required_columns}'}), 400
-
-        created_users = []
-        errors = []
-
-        for index, row in df.iterrows():
-            try:
-                user_id = str(row['user_id'])
-                name = row['name']
-                email = row['email']
-                dob = pd.to_datetime(row['dob']).date()
-                validity_date = pd.to_datetime(row['validity_date']).date()
-
-                # Handle optional batch fields
-                batch_from = None
-                batch_to = None
-                if 'batch_from' in df.columns and pd.notna(row['batch_from']):
-                    batch_from = int(row['batch_from'])
-                if 'batch_to' in df.columns and pd.notna(row['batch_to']):
-                    batch_to = int(row['batch_to'])
-
-                # Check if user already exists
-                existing = User.query.filter_by(user_id=user_id).first()
-                if existing:
-                    errors.append(f"Row {index + 1}: User ID {user_id} already exists")
-                    continue
-
-                # Generate username and password according to requirements
-                # Username should be the email address
-                username = email
-                # Password should be userid+userid format
-                password = User.generate_password(user_id)
-
-                user = User(
-                    user_id=user_id,
-                    username=username,
-                    name=name,
-                    email=email,
-                    role='student',
-                    user_role=user_role,
-                    designation=user_role,
-                    dob=dob,
-                    validity_date=validity_date,
-                    college_id=college_id,
-                    department_id=department_id,
-                    batch_from=batch_from,
-                    batch_to=batch_to
-                )
-                user.set_password(password)
-                # Set first_login_completed based on role
-                # Librarians don't need to change password on first login
-                if role == 'librarian':
-                    user.first_login_completed = True
-                else:
-                    # Enforce first login password change for all non-librarian users created via bulk
-                    user.first_login_completed = False
+        if not all(col in df.columns for col in USER_SHEET.required_columns):
+            return jsonify({'error': f'Excel file must contain columns: {USER_SHEET.required_columns}'}), 400
 
+        inserted, errors, resumed_rows = import_whole_sheet(df, import_chunk, checkpoint_key)
 
-                db.session.add(user)
-                created_users.append({
-                    'user_id': user_id,
-                    'username': username,
-                    'password': password,
-                    'name': name,
-                    'email': email
-                })
-
-            except Exception as e:
-                errors.append(f"Row {index + 1}: {str(e)}")
-
-        db.session.commit()
+        created_users = [{
+            'user_id': row['user_id'],
+            'username': row['username'],
+            'password': User.generate_password(row['user_id']),
+            'name': row['name'],
+            'email': row['email']
+        } for row in inserted]
 
         return jsonify({
             'message': f'Successfully created {len(created_users)} users',
             'created_users': created_users,
-            'errors': errors
+            'errors': import_error_report(errors),
+            'resumed_rows': resumed_rows,
+            'timings': rounded_timings()
         }), 201
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 # Download Credentials
@@ -2785,11 +6237,12 @@ def get_user_circulation_info(user_id):
             Circulation.status.in_(['issued', 'overdue'])
         ).all()
 
-        # Get borrowing history
-        history = db.session.query(Circulation, Book).join(Book).filter(
-            Circulation.user_id == user.id,
-            Circulation.status.in_(['returned', 'overdue'])
-        ).order_by(Circulation.issue_date.desc()).limit(10).all()
+        # Get borrowing history, archived loans included
+        Loan = circulation_history()
+        history = db.session.query(Loan, Book).join(Book, Loan.book_id == Book.id).filter(
+            Loan.user_id == user.id,
+            Loan.status.in_(['returned', 'overdue'])
+        ).order_by(Loan.issue_date.desc()).limit(10).all()
 
         # Calculate current fine amount
         total_fine = db.session.query(db.func.sum(Fine.amount)).filter(
@@ -2858,6 +6311,44 @@ def get_user_circulation_info(user_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def normalize_isbn(value):
+    """Canonical ISBN-13 for ISBN-10 or ISBN-13 input (hyphens and spaces allowed), else None"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    # Spreadsheet imports can turn an ISBN-13 into a float like 9780123456789.0
+    if value.endswith('.0'):
+        value = value[:-2]
+    digits = re.sub(r'[^0-9Xx]', '', value).upper()
+
+    if len(digits) == 13 and digits.isdigit():
+        return digits
+    if len(digits) == 10 and digits[:9].isdigit() and (digits[9].isdigit() or digits[9] == 'X'):
+        core = '978' + digits[:9]
+        checksum = sum(int(digit) * (1 if i % 2 == 0 else 3) for i, digit in enumerate(core))
+        return core + str((10 - checksum % 10) % 10)
+    return None
+
+def find_issued_books_by_code(code, statuses):
+    """(Circulation, Book, User) rows for a scanned ISBN or access number.
+    Exact matches on the indexed isbn13 and access_no columns are tried first;
+    the old substring match on isbn is only a fallback."""
+    base_query = db.session.query(Circulation, Book, User).join(Book).join(User).filter(
+        Circulation.status.in_(statuses)
+    )
+
+    isbn13 = normalize_isbn(code)
+    if isbn13:
+        results = base_query.filter(Book.isbn13 == isbn13).all()
+        if results:
+            return results
+
+    results = base_query.filter(Book.access_no == code).all()
+    if results:
+        return results
+
+    return base_query.filter(Book.isbn.ilike(f'%{code}%')).all()
+
 # Search Issued Books by ISBN
 @app.route('/api/admin/circulation/search/isbn/<isbn>', methods=['GET'])
 @jwt_required()
@@ -2871,11 +6362,8 @@ def search_issued_books_by_isbn(isbn):
         if not isbn.strip():
             return jsonify({'error': 'ISBN is required'}), 400
 
-        # Search for issued books with the given ISBN (including overdue books)
-        issued_books = db.session.query(Circulation, Book, User).join(Book).join(User).filter(
-            Book.isbn.ilike(f'%{isbn.strip()}%'),
-            Circulation.status.in_(['issued', 'overdue'])
-        ).all()
+        # Search for issued books with the given ISBN or access number (including overdue books)
+        issued_books = find_issued_books_by_code(isbn.strip(), ['issued', 'overdue'])
 
         # Calculate overdue status and fines
         from datetime import date
@@ -2924,6 +6412,7 @@ def search_issued_books_by_isbn(isbn):
 # Issue Book
 @app.route('/api/admin/circulation/issue', methods=['POST'])
 @jwt_required()
+@retry_on_busy
 def issue_book():
     try:
         current_user_id = int(get_jwt_identity())
@@ -3045,7 +6534,11 @@ def issue_book():
         )
 
         # Update book availability
+        facets_before = book_facet_values(book)
         book.available_copies -= 1
+        record_catalogue_write(book_facet_changes(before=facets_before, after=book_facet_values(book)))
+        record_book_issue(book)
+        record_circulation_issue(user)
 
         db.session.add(circulation)
         db.session.commit()
@@ -3061,12 +6554,17 @@ def issue_book():
             }
         }), 201
 
+    except OperationalError as e:
+        if is_database_busy(e):
+            raise  # retried by @retry_on_busy
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Return Book
 @app.route('/api/admin/circulation/return', methods=['POST'])
 @jwt_required()
+@retry_on_busy
 def return_book():
     try:
         current_user_id = int(get_jwt_identity())
@@ -3083,6 +6581,7 @@ def return_book():
         returned_books = []
         total_fine = 0
         daily_fine_rate = 1.0  # ₹1 per day
+        facet_changes = Counter()
 
         for circulation_id in circulation_ids:
             circulation = Circulation.query.get(circulation_id)
@@ -3105,11 +6604,14 @@ def return_book():
             circulation.return_date = datetime.utcnow()
             circulation.status = 'returned'
             circulation.fine_amount = fine_amount
+            record_circulation_return(circulation)
 
             # Update book availability
             book = Book.query.get(circulation.book_id)
             if book:
+                facets_before = book_facet_values(book)
                 book.available_copies += 1
+                book_facet_changes(before=facets_before, after=book_facet_values(book), changes=facet_changes)
 
             # Create fine record if applicable
             if fine_amount > 0:
@@ -3130,6 +6632,7 @@ def return_book():
             })
             total_fine += fine_amount
 
+        record_catalogue_write(facet_changes)
         db.session.commit()
 
         return jsonify({
@@ -3138,6 +6641,10 @@ def return_book():
             'total_fine': total_fine
         }), 200
 
+    except OperationalError as e:
+        if is_database_busy(e):
+            raise  # retried by @retry_on_busy
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -3152,18 +6659,27 @@ def search_books_for_issue():
             return jsonify({'error': 'Admin/Librarian access required'}), 403
 
         search = request.args.get('search', '')
+        fuzzy = request.args.get('fuzzy', 'false').lower() == 'true'
         if len(search) < 2:
             return jsonify({'books': []}), 200
 
-        books = Book.query.filter(
-            db.or_(
-                Book.title.contains(search),
-                Book.author.contains(search),
-                Book.access_no.contains(search),
-                Book.isbn.contains(search) if Book.isbn else False
-            ),
-            Book.available_copies > 0
-        ).limit(10).all()
+        if fuzzy:
+            # Typo-tolerant title/author match, most similar first
+            ranked_ids = fuzzy_book_search(search)
+            books = Book.query.filter(
+                Book.id.in_(ranked_ids),
+                Book.available_copies > 0
+            ).order_by(ranked_ids_order(Book.id, ranked_ids)).limit(10).all() if ranked_ids else []
+        else:
+            books = Book.query.filter(
+                db.or_(
+                    Book.title.contains(search),
+                    Book.id.in_(author_book_ids(search)),
+                    Book.access_no.contains(search),
+                    Book.isbn.contains(search) if Book.isbn else False
+                ),
+                Book.available_copies > 0
+            ).limit(10).all()
 
         return jsonify({
             'books': [{
@@ -3273,11 +6789,16 @@ def create_sample_books():
         ]
 
         created_books = []
+        new_books = []
+        facet_changes = Counter()
         for book_data in sample_books:
             book = Book(**book_data)
             db.session.add(book)
+            new_books.append(book)
+            book_facet_changes(after=book_facet_values(book), changes=facet_changes)
             created_books.append(book_data['title'])
 
+        record_catalogue_write(facet_changes, new_books)
         db.session.commit()
 
         return jsonify({
@@ -3510,6 +7031,7 @@ def renew_book():
 # Circulation History Routes
 @app.route('/api/admin/circulation/history', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_circulation_history():
     try:
         current_user_id = int(get_jwt_identity())
@@ -3531,31 +7053,37 @@ def get_circulation_history():
         college_id = request.args.get('college_id', 'all')
         department_id = request.args.get('department_id', 'all')
 
+        # Archived loans are all returned, so only those reports need to read the archive
+        if status in ('all', 'returned'):
+            Loan = circulation_history(datetime.strptime(from_date, '%Y-%m-%d') if from_date else None)
+        else:
+            Loan = Circulation
+
         # Build query
-        query = db.session.query(Circulation, Book, User).join(
-            Book, Circulation.book_id == Book.id
+        query = db.session.query(Loan, Book, User).join(
+            Book, Loan.book_id == Book.id
         ).join(
-            User, Circulation.user_id == User.id
+            User, Loan.user_id == User.id
         )
 
         # Apply filters
         if from_date:
-            query = query.filter(Circulation.issue_date >= datetime.strptime(from_date, '%Y-%m-%d'))
+            query = query.filter(Loan.issue_date >= datetime.strptime(from_date, '%Y-%m-%d'))
         if to_date:
-            query = query.filter(Circulation.issue_date <= datetime.strptime(to_date, '%Y-%m-%d'))
+            query = query.filter(Loan.issue_date <= datetime.strptime(to_date, '%Y-%m-%d'))
         if status != 'all':
             if status == 'overdue':
                 query = query.filter(
                     db.or_(
-                        Circulation.status == 'overdue',
+                        Loan.status == 'overdue',
                         db.and_(
-                            Circulation.status == 'issued',
-                            Circulation.due_date < datetime.now()
+                            Loan.status == 'issued',
+                            Loan.due_date < datetime.now()
                         )
                     )
                 )
             else:
-                query = query.filter(Circulation.status == status)
+                query = query.filter(Loan.status == status)
         if user_type != 'all':
             query = query.filter(User.role == user_type)
         if college_id != 'all':
@@ -3563,32 +7091,52 @@ def get_circulation_history():
         if department_id != 'all':
             query = query.filter(User.department_id == int(department_id))
 
+        cursor = request.args.get('cursor')
+        if cursor is not None:
+            # Keyset pagination only seeks on indexed date keys
+            if sort_field not in ('issue_date', 'due_date'):
+                return jsonify({'error': 'Cursor pagination supports sort_field issue_date or due_date'}), 400
+            include_total = request.args.get('include_total', 'false').lower() == 'true'
+            descending = sort_direction == 'desc'
+            sort_column = Loan.issue_date if sort_field == 'issue_date' else Loan.due_date
+            sort_keys = [(sort_column, descending), (Loan.id, descending)]
+            cursor_values = decode_cursor(cursor, sort_keys)
+            if cursor_values is None:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            results, pagination = keyset_paginate(
+                query, sort_keys, cursor_values, limit,
+                lambda row: (getattr(row[0], sort_field), row[0].id), include_total
+            )
+        else:
+            pagination = None
+
         # Apply sorting
         if sort_field == 'user_name':
             sort_column = User.name
         elif sort_field == 'book_title':
             sort_column = Book.title
         elif sort_field == 'issue_date':
-            sort_column = Circulation.issue_date
+            sort_column = Loan.issue_date
         elif sort_field == 'due_date':
-            sort_column = Circulation.due_date
+            sort_column = Loan.due_date
         elif sort_field == 'return_date':
-            sort_column = Circulation.return_date
+            sort_column = Loan.return_date
         elif sort_field == 'status':
-            sort_column = Circulation.status
+            sort_column = Loan.status
         elif sort_field == 'fine_amount':
-            sort_column = Circulation.fine_amount
+            sort_column = Loan.fine_amount
         else:
-            sort_column = Circulation.issue_date
+            sort_column = Loan.issue_date
 
         if sort_direction == 'desc':
             sort_column = sort_column.desc()
 
-        query = query.order_by(sort_column)
+        if pagination is None:
+            query = query.order_by(sort_column)
 
-        # Get paginated results
-        total = query.count()
-        results = query.offset((page - 1) * limit).limit(limit).all()
+            # Get paginated results
+            total = query.count()
+            results = query.offset((page - 1) * limit).limit(limit).all()
 
         # Format response data
         history_data = []
@@ -3620,6 +7168,13 @@ def get_circulation_history():
                 'fine_amount': fine_amount
             })
 
+        if pagination is not None:
+            return jsonify({
+                'data': history_data,
+                'limit': limit,
+                **pagination
+            }), 200
+
         return jsonify({
             'data': history_data,
             'total': total,
@@ -3634,6 +7189,7 @@ def get_circulation_history():
 
 @app.route('/api/admin/circulation/statistics', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_circulation_statistics():
     try:
         current_user_id = int(get_jwt_identity())
@@ -3642,7 +7198,7 @@ def get_circulation_statistics():
             return jsonify({'error': 'Unauthorized'}), 403
 
         # Get total transactions
-        total_transactions = Circulation.query.count()
+        total_transactions = circulation_stat_total(CirculationDailyStat.issued)
 
         # Get active loans
         active_loans = Circulation.query.filter_by(status='issued').count()
@@ -3654,7 +7210,7 @@ def get_circulation_statistics():
         ).count()
 
         # Get total fines
-        total_fines = db.session.query(db.func.sum(Circulation.fine_amount)).scalar() or 0
+        total_fines = circulation_stat_total(CirculationDailyStat.fine_total)
 
         # Get active users (users with current loans)
         active_users = db.session.query(Circulation.user_id).filter_by(status='issued').distinct().count()
@@ -3662,13 +7218,9 @@ def get_circulation_statistics():
         # Get popular books
         popular_books = db.session.query(
             Book.title,
-            db.func.count(Circulation.id).label('count')
-        ).join(
-            Circulation, Book.id == Circulation.book_id
-        ).group_by(
-            Book.id, Book.title
-        ).order_by(
-            db.func.count(Circulation.id).desc()
+            Book.issue_count.label('count')
+        ).filter(Book.issue_count > 0).order_by(
+            Book.issue_count.desc(), Book.id.desc()
         ).limit(5).all()
 
         return jsonify({
@@ -3686,6 +7238,7 @@ def get_circulation_statistics():
 
 @app.route('/api/admin/circulation/export/excel', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def export_circulation_excel():
     try:
         current_user_id = int(get_jwt_identity())
@@ -3701,26 +7254,32 @@ def export_circulation_excel():
         college_id = request.args.get('college_id', 'all')
         department_id = request.args.get('department_id', 'all')
 
+        # Archived loans are all returned, so only those reports need to read the archive
+        if status in ('all', 'returned'):
+            Loan = circulation_history(datetime.strptime(from_date, '%Y-%m-%d') if from_date else None)
+        else:
+            Loan = Circulation
+
         # Build query (same as history endpoint)
-        query = db.session.query(Circulation, Book, User).join(
-            Book, Circulation.book_id == Book.id
+        query = db.session.query(Loan, Book, User).join(
+            Book, Loan.book_id == Book.id
         ).join(
-            User, Circulation.user_id == User.id
+            User, Loan.user_id == User.id
         )
 
         # Apply filters
         if from_date:
-            query = query.filter(Circulation.issue_date >= datetime.strptime(from_date, '%Y-%m-%d'))
+            query = query.filter(Loan.issue_date >= datetime.strptime(from_date, '%Y-%m-%d'))
         if to_date:
-            query = query.filter(Circulation.issue_date <= datetime.strptime(to_date, '%Y-%m-%d'))
+            query = query.filter(Loan.issue_date <= datetime.strptime(to_date, '%Y-%m-%d'))
         if status != 'all':
             if status == 'overdue':
                 query = query.filter(
-                    Circulation.status == 'issued',
-                    Circulation.due_date < datetime.now()
+                    Loan.status == 'issued',
+                    Loan.due_date < datetime.now()
                 )
             else:
-                query = query.filter(Circulation.status == status)
+                query = query.filter(Loan.status == status)
         if user_type != 'all':
             query = query.filter(User.role == user_type)
         if college_id != 'all':
@@ -3778,6 +7337,7 @@ def export_circulation_excel():
 
 @app.route('/api/admin/circulation/export/pdf', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def export_circulation_pdf():
     try:
         # For now, return the same CSV format with PDF headers
@@ -4423,6 +7983,82 @@ def add_holiday():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Holiday calendars; created_by is the uploading user. Dates are YYYY-MM-DD or MM/DD/YYYY.
+HOLIDAY_SHEET = SheetSchema(Holiday, [
+    SheetField('name', 'Holiday name', required=True, strip=True),
+    SheetField('date', type='date', required=True),
+    SheetField('description'),
+    SheetField('is_recurring', 'Is recurring', type='boolean', default=False),
+], unique=[('date', 'A holiday on', [Holiday.date])])
+
+IMPORT_JOB_KINDS['holidays'] = (HOLIDAY_SHEET.required_columns, partial(ingest_sheet, HOLIDAY_SHEET))
+
+# Bulk import holidays
+@app.route('/api/admin/holidays/bulk', methods=['POST'])
+@jwt_required()
+def bulk_import_holidays():
+    try:
+        current_user_id = int(get_jwt_identity())
+        current_user = User.query.get(current_user_id)
+        if not current_user or current_user.role not in ['admin', 'librarian']:
+            return jsonify({'error': 'Admin/Librarian access required'}), 403
+
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file uploaded'}), 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+
+        filename = file.filename.lower()
+        if not filename.endswith(('.csv', '.xlsx', '.xls')):
+            return jsonify({'error': 'Unsupported file format. Use CSV or Excel files.'}), 400
+
+        required_columns = HOLIDAY_SHEET.required_columns
+        checkpoint_key = upload_checkpoint_key('holidays', {}, file.stream)
+        if wants_background_import():
+            return start_import_job('holidays', file, {'created_by': current_user_id}, current_user_id, checkpoint_key)
+        if wants_streaming_import():
+            if not filename.endswith('.csv'):
+                return jsonify({'error': 'Streaming imports need a CSV file'}), 400
+            summary, error = stream_csv_import(file, required_columns,
+                                               lambda df: ingest_sheet(HOLIDAY_SHEET, df, created_by=current_user_id),
+                                               checkpoint_key)
+            if error:
+                return jsonify({'error': error}), 400
+            return streaming_import_response(summary, 'holidays')
+
+        df = pd.read_csv(file, dtype=str) if filename.endswith('.csv') else pd.read_excel(file, dtype=str)
+
+        if not all(col in df.columns for col in required_columns):
+            return jsonify({'error': f'File must contain columns: {required_columns}'}), 400
+
+        inserted, errors, resumed_rows = import_whole_sheet(
+            df, lambda df: ingest_sheet(HOLIDAY_SHEET, df, created_by=current_user_id), checkpoint_key)
+
+        created_holidays = [{
+            'name': row['name'],
+            'date': row['date'].isoformat(),
+            'description': row['description'],
+            'is_recurring': row['is_recurring']
+        } for row in inserted]
+
+        return jsonify({
+            'message': f'Bulk import completed. Created {len(created_holidays)} holidays.',
+            'created_holidays': created_holidays,
+            'errors': import_error_report(errors),
+            'resumed_rows': resumed_rows,
+            'summary': {
+                'total_rows': len(df),
+                'created': len(created_holidays),
+                'errors': len(errors)
+            }
+        }), 200 if created_holidays or resumed_rows else 400
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 # Update holiday
 @app.route('/api/admin/holidays/<int:holiday_id>', methods=['PUT'])
 @jwt_required()
@@ -4873,6 +8509,7 @@ def create_default_gate_credential():
 # Process barcode scan
 @app.route('/api/gate/scan', methods=['POST'])
 @jwt_required()
+@retry_on_busy
 def process_barcode_scan():
     try:
         # Verify this is a gate entry token
@@ -4975,6 +8612,11 @@ def process_barcode_scan():
 
         return jsonify(response_data), 200
 
+    except OperationalError as e:
+        if is_database_busy(e):
+            raise  # retried by @retry_on_busy
+        print(f"❌ Gate scan error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         print(f"❌ Gate scan error: {str(e)}")
         import traceback
@@ -5050,6 +8692,7 @@ def verify_gate_token():
 # Transaction Statistics for Admin
 @app.route('/api/admin/transaction-statistics', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_admin_transaction_statistics():
     try:
         current_user = get_jwt_identity()
@@ -5066,91 +8709,18 @@ def get_admin_transaction_statistics():
         if not start_date or not end_date:
             return jsonify({'error': 'Start date and end date are required'}), 400
 
-        # Base query for transactions (using Circulation model)
-        query = db.session.query(Circulation).join(User)
-
-        # Apply date filter
-        query = query.filter(Circulation.issue_date >= start_date)
-        query = query.filter(Circulation.issue_date <= end_date)
-
-        # Apply college filter if specified
-        if college_id:
-            query = query.filter(User.college_id == college_id)
-
-        # Apply department filter if specified
-        if department_id:
-            query = query.filter(User.department_id == department_id)
-
-        # Get all transactions in the date range
-        transactions = query.all()
-
-        # Calculate statistics
-        issued_books = len(transactions)
-        returned_books = len([t for t in transactions if t.return_date is not None])
-        outstanding_books = issued_books - returned_books
-
-        # Get detailed statistics by department
-        detailed_stats = []
-        if department_id:
-            # Single department stats
-            dept = Department.query.get(department_id)
-            if dept:
-                dept_transactions = transactions
-                dept_issued = len(dept_transactions)
-                dept_returned = len([t for t in dept_transactions if t.return_date is not None])
-                dept_outstanding = dept_issued - dept_returned
-                return_rate = round((dept_returned / dept_issued * 100) if dept_issued > 0 else 0, 1)
-
-                detailed_stats.append({
-                    'college_name': dept.college.name if dept.college else 'Unknown',
-                    'department_name': dept.name,
-                    'issued_books': dept_issued,
-                    'returned_books': dept_returned,
-                    'outstanding_books': dept_outstanding,
-                    'return_rate': return_rate
-                })
-        else:
-            # All departments stats (filtered by college if specified)
-            departments_query = Department.query
-            if college_id:
-                departments_query = departments_query.filter(Department.college_id == college_id)
-            departments = departments_query.all()
-
-            for dept in departments:
-                dept_query = db.session.query(Circulation).join(User).filter(
-                    User.department_id == dept.id,
-                    Circulation.issue_date >= start_date,
-                    Circulation.issue_date <= end_date
-                )
-                # Add college filter if specified
-                if college_id:
-                    dept_query = dept_query.filter(User.college_id == college_id)
-
-                dept_transactions = dept_query.all()
-                dept_issued = len(dept_transactions)
-                dept_returned = len([t for t in dept_transactions if t.return_date is not None])
-                dept_outstanding = dept_issued - dept_returned
-                return_rate = round((dept_returned / dept_issued * 100) if dept_issued > 0 else 0, 1)
-
-                if dept_issued > 0:  # Only include departments with transactions
-                    detailed_stats.append({
-                        'college_name': dept.college.name if dept.college else 'Unknown',
-                        'department_name': dept.name,
-                        'issued_books': dept_issued,
-                        'returned_books': dept_returned,
-                        'outstanding_books': dept_outstanding,
-                        'return_rate': return_rate
-                    })
+        try:
+            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
-        # Sort detailed stats by college name, then by department name
-        detailed_stats.sort(key=lambda x: (x['college_name'], x['department_name']))
+        # Loans issued in the range (end date inclusive), summed from the daily rollup
+        stats = transaction_statistics(start_date_obj, end_date_obj, college_id, department_id)
 
         return jsonify({
             'success': True,
-            'issued_books': issued_books,
-            'returned_books': returned_books,
-            'outstanding_books': outstanding_books,
-            'detailed_stats': detailed_stats,
+            **stats,
             'date_range': {
                 'start_date': start_date,
                 'end_date': end_date
@@ -5163,6 +8733,7 @@ def get_admin_transaction_statistics():
 # Transaction Statistics for Librarian
 @app.route('/api/librarian/transaction-statistics', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_librarian_transaction_statistics():
     try:
         current_user = get_jwt_identity()
@@ -5179,83 +8750,18 @@ def get_librarian_transaction_statistics():
         if not start_date or not end_date:
             return jsonify({'error': 'Start date and end date are required'}), 400
 
-        # Base query for transactions (using Circulation model)
-        query = db.session.query(Circulation).join(User)
-
-        # Apply date filter
-        query = query.filter(Circulation.issue_date >= start_date)
-        query = query.filter(Circulation.issue_date <= end_date)
-
-        # Apply college filter if specified
-        if college_id:
-            query = query.filter(User.college_id == college_id)
-
-        # Apply department filter if specified
-        if department_id:
-            query = query.filter(User.department_id == department_id)
-
-        # Get all transactions in the date range
-        transactions = query.all()
-
-        # Calculate statistics
-        issued_books = len(transactions)
-        returned_books = len([t for t in transactions if t.return_date is not None])
-        outstanding_books = issued_books - returned_books
-
-        # Get detailed statistics by department
-        detailed_stats = []
-        if department_id:
-            # Single department stats
-            dept = Department.query.get(department_id)
-            if dept:
-                dept_transactions = transactions
-                dept_issued = len(dept_transactions)
-                dept_returned = len([t for t in dept_transactions if t.return_date is not None])
-                dept_outstanding = dept_issued - dept_returned
-                return_rate = round((dept_returned / dept_issued * 100) if dept_issued > 0 else 0, 1)
-
-                detailed_stats.append({
-                    'college_name': dept.college.name if dept.college else 'Unknown',
-                    'department_name': dept.name,
-                    'issued_books': dept_issued,
-                    'returned_books': dept_returned,
-                    'outstanding_books': dept_outstanding,
-                    'return_rate': return_rate
-                })
-        else:
-            # All departments stats
-            departments = Department.query.all()
-            for dept in departments:
-                dept_query = db.session.query(Circulation).join(User).filter(
-                    User.department_id == dept.id,
-                    Circulation.issue_date >= start_date,
-                    Circulation.issue_date <= end_date
-                )
-                dept_transactions = dept_query.all()
-                dept_issued = len(dept_transactions)
-                dept_returned = len([t for t in dept_transactions if t.return_date is not None])
-                dept_outstanding = dept_issued - dept_returned
-                return_rate = round((dept_returned / dept_issued * 100) if dept_issued > 0 else 0, 1)
-
-                if dept_issued > 0:  # Only include departments with transactions
-                    detailed_stats.append({
-                        'college_name': dept.college.name if dept.college else 'Unknown',
-                        'department_name': dept.name,
-                        'issued_books': dept_issued,
-                        'returned_books': dept_returned,
-                        'outstanding_books': dept_outstanding,
-                        'return_rate': return_rate
-                    })
+        try:
+            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
-        # Sort detailed stats by college name, then by department name
-        detailed_stats.sort(key=lambda x: (x['college_name'], x['department_name']))
+        # Loans issued in the range (end date inclusive), summed from the daily rollup
+        stats = transaction_statistics(start_date_obj, end_date_obj, college_id, department_id)
 
         return jsonify({
             'success': True,
-            'issued_books': issued_books,
-            'returned_books': returned_books,
-            'outstanding_books': outstanding_books,
-            'detailed_stats': detailed_stats,
+            **stats,
             'date_range': {
                 'start_date': start_date,
                 'end_date': end_date
@@ -5268,6 +8774,7 @@ def get_librarian_transaction_statistics():
 # Download Transaction Statistics for Admin
 @app.route('/api/admin/transaction-statistics/download', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def download_admin_transaction_statistics():
     try:
         current_user = get_jwt_identity()
@@ -5291,18 +8798,20 @@ def download_admin_transaction_statistics():
         end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
         end_date_obj = end_date_obj.replace(hour=23, minute=59, second=59)
 
+        Loan = circulation_history(start_date_obj)
+
         # Build query with joins for user and book information
-        query = db.session.query(Circulation, User, Book, College, Department).join(
-            User, Circulation.user_id == User.id
+        query = db.session.query(Loan, User, Book, College, Department).join(
+            User, Loan.user_id == User.id
         ).join(
-            Book, Circulation.book_id == Book.id
+            Book, Loan.book_id == Book.id
         ).outerjoin(
             College, User.college_id == College.id
         ).outerjoin(
             Department, User.department_id == Department.id
         ).filter(
-            Circulation.issue_date >= start_date_obj,
-            Circulation.issue_date <= end_date_obj
+            Loan.issue_date >= start_date_obj,
+            Loan.issue_date <= end_date_obj
         )
 
         if college_id and college_id != 'all':
@@ -5311,7 +8820,7 @@ def download_admin_transaction_statistics():
         if department_id and department_id != 'all':
             query = query.filter(User.department_id == int(department_id))
 
-        results = query.order_by(Circulation.issue_date.desc()).all()
+        results = query.order_by(Loan.issue_date.desc()).all()
 
         # Prepare report data
         report_data = []
@@ -5348,6 +8857,7 @@ def download_admin_transaction_statistics():
 # Download Transaction Statistics for Librarian
 @app.route('/api/librarian/transaction-statistics/download', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def download_librarian_transaction_statistics():
     try:
         current_user = get_jwt_identity()
@@ -5371,18 +8881,20 @@ def download_librarian_transaction_statistics():
         end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
         end_date_obj = end_date_obj.replace(hour=23, minute=59, second=59)
 
+        Loan = circulation_history(start_date_obj)
+
         # Build query with joins for user and book information
-        query = db.session.query(Circulation, User, Book, College, Department).join(
-            User, Circulation.user_id == User.id
+        query = db.session.query(Loan, User, Book, College, Department).join(
+            User, Loan.user_id == User.id
         ).join(
-            Book, Circulation.book_id == Book.id
+            Book, Loan.book_id == Book.id
         ).outerjoin(
             College, User.college_id == College.id
         ).outerjoin(
             Department, User.department_id == Department.id
         ).filter(
-            Circulation.issue_date >= start_date_obj,
-            Circulation.issue_date <= end_date_obj
+            Loan.issue_date >= start_date_obj,
+            Loan.issue_date <= end_date_obj
         )
 
         if college_id and college_id != 'all':
@@ -5391,7 +8903,7 @@ def download_librarian_transaction_statistics():
         if department_id and department_id != 'all':
             query = query.filter(User.department_id == int(department_id))
 
-        results = query.order_by(Circulation.issue_date.desc()).all()
+        results = query.order_by(Loan.issue_date.desc()).all()
 
         # Prepare report data
         report_data = []
@@ -5487,6 +8999,7 @@ def get_librarian_departments():
 # Get gate entry logs
 @app.route('/api/admin/gate-logs', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_gate_logs():
     try:
         current_user_id = int(get_jwt_identity())
@@ -5504,8 +9017,13 @@ def get_gate_logs():
         status_filter = request.args.get('status')
         export_format = request.args.get('format')
 
-        query = db.session.query(GateEntryLog, User, College, Department).join(
-            User, GateEntryLog.user_id == User.id
+        from datetime import datetime
+        from_date_obj = datetime.strptime(from_date, '%Y-%m-%d') if from_date else None
+        # Archived logs are only read when the range reaches back into them
+        Log = gate_log_history(from_date_obj)
+
+        query = db.session.query(Log, User, College, Department).join(
+            User, Log.user_id == User.id
         ).outerjoin(
             College, User.college_id == College.id
         ).outerjoin(
@@ -5513,16 +9031,14 @@ def get_gate_logs():
         )
 
         # Apply filters
-        if from_date:
-            from datetime import datetime
-            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d')
-            query = query.filter(GateEntryLog.created_date >= from_date_obj)
+        if from_date_obj:
+            query = query.filter(Log.created_date >= from_date_obj)
 
         if to_date:
             from datetime import datetime
             to_date_obj = datetime.strptime(to_date, '%Y-%m-%d')
             to_date_obj = to_date_obj.replace(hour=23, minute=59, second=59)
-            query = query.filter(GateEntryLog.created_date <= to_date_obj)
+            query = query.filter(Log.created_date <= to_date_obj)
 
         if college_id and college_id != 'all':
             query = query.filter(User.college_id == int(college_id))
@@ -5531,11 +9047,11 @@ def get_gate_logs():
             query = query.filter(User.department_id == int(department_id))
 
         if status_filter and status_filter != 'all':
-            query = query.filter(GateEntryLog.status == status_filter)
+            query = query.filter(Log.status == status_filter)
 
         if export_format:
             # For export, get all results without pagination
-            results = query.order_by(GateEntryLog.created_date.desc()).all()
+            results = query.order_by(Log.created_date.desc()).all()
 
             report_data = []
             for log, user, college, department in results:
@@ -5558,10 +9074,30 @@ def get_gate_logs():
                     'Exit Time', 'Status', 'Date'
                 ])
         else:
-            # Regular paginated response
-            logs = query.order_by(GateEntryLog.created_date.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            cursor = request.args.get('cursor')
+            if cursor is not None:
+                # Keyset pagination on (created_date, id) newest first, total only on request
+                include_total = request.args.get('include_total', 'false').lower() == 'true'
+                sort_keys = [(Log.created_date, True), (Log.id, True)]
+                cursor_values = decode_cursor(cursor, sort_keys)
+                if cursor_values is None:
+                    return jsonify({'error': 'Invalid cursor'}), 400
+                items, pagination = keyset_paginate(
+                    query, sort_keys, cursor_values, per_page,
+                    lambda row: (row[0].created_date, row[0].id), include_total
+                )
+            else:
+                # Regular paginated response
+                logs = query.order_by(Log.created_date.desc()).paginate(
+                    page=page, per_page=per_page, error_out=False
+                )
+                items = logs.items
+                pagination = {
+                    'page': logs.page,
+                    'pages': logs.pages,
+                    'per_page': logs.per_page,
+                    'total': logs.total
+                }
 
             return jsonify({
                 'logs': [{
@@ -5574,13 +9110,8 @@ def get_gate_logs():
                     'exit_time': log.exit_time.isoformat() if log.exit_time else None,
                     'status': log.status,
                     'created_date': log.created_date.isoformat()
-                } for log, user, college, department in logs.items],
-                'pagination': {
-                    'page': logs.page,
-                    'pages': logs.pages,
-                    'per_page': logs.per_page,
-                    'total': logs.total
-                }
+                } for log, user, college, department in items],
+                'pagination': pagination
             }), 200
 
     except Exception as e:
@@ -5589,6 +9120,7 @@ def get_gate_logs():
 # Get gate entry logs (without /api prefix for frontend compatibility)
 @app.route('/admin/gate-logs', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_gate_logs_admin():
     try:
         current_user_id = int(get_jwt_identity())
@@ -5606,8 +9138,13 @@ def get_gate_logs_admin():
         status_filter = request.args.get('status')
         export_format = request.args.get('format')
 
-        query = db.session.query(GateEntryLog, User, College, Department).join(
-            User, GateEntryLog.user_id == User.id
+        from datetime import datetime
+        from_date_obj = datetime.strptime(from_date, '%Y-%m-%d') if from_date else None
+        # Archived logs are only read when the range reaches back into them
+        Log = gate_log_history(from_date_obj)
+
+        query = db.session.query(Log, User, College, Department).join(
+            User, Log.user_id == User.id
         ).outerjoin(
             College, User.college_id == College.id
         ).outerjoin(
@@ -5615,16 +9152,14 @@ def get_gate_logs_admin():
         )
 
         # Apply filters
-        if from_date:
-            from datetime import datetime
-            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d')
-            query = query.filter(GateEntryLog.created_date >= from_date_obj)
+        if from_date_obj:
+            query = query.filter(Log.created_date >= from_date_obj)
 
         if to_date:
             from datetime import datetime
             to_date_obj = datetime.strptime(to_date, '%Y-%m-%d')
             to_date_obj = to_date_obj.replace(hour=23, minute=59, second=59)
-            query = query.filter(GateEntryLog.created_date <= to_date_obj)
+            query = query.filter(Log.created_date <= to_date_obj)
 
         if college_id and college_id != 'all':
             query = query.filter(User.college_id == int(college_id))
@@ -5633,11 +9168,11 @@ def get_gate_logs_admin():
             query = query.filter(User.department_id == int(department_id))
 
         if status_filter and status_filter != 'all':
-            query = query.filter(GateEntryLog.status == status_filter)
+            query = query.filter(Log.status == status_filter)
 
         if export_format:
             # For export, get all results without pagination
-            results = query.order_by(GateEntryLog.created_date.desc()).all()
+            results = query.order_by(Log.created_date.desc()).all()
 
             report_data = []
             for log, user, college, department in results:
@@ -5660,10 +9195,30 @@ def get_gate_logs_admin():
                     'Exit Time', 'Status', 'Date'
                 ])
         else:
-            # Regular paginated response
-            logs = query.order_by(GateEntryLog.created_date.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            cursor = request.args.get('cursor')
+            if cursor is not None:
+                # Keyset pagination on (created_date, id) newest first, total only on request
+                include_total = request.args.get('include_total', 'false').lower() == 'true'
+                sort_keys = [(Log.created_date, True), (Log.id, True)]
+                cursor_values = decode_cursor(cursor, sort_keys)
+                if cursor_values is None:
+                    return jsonify({'error': 'Invalid cursor'}), 400
+                items, pagination = keyset_paginate(
+                    query, sort_keys, cursor_values, per_page,
+                    lambda row: (row[0].created_date, row[0].id), include_total
+                )
+            else:
+                # Regular paginated response
+                logs = query.order_by(Log.created_date.desc()).paginate(
+                    page=page, per_page=per_page, error_out=False
+                )
+                items = logs.items
+                pagination = {
+                    'page': logs.page,
+                    'pages': logs.pages,
+                    'per_page': logs.per_page,
+                    'total': logs.total
+                }
 
             return jsonify({
                 'logs': [{
@@ -5676,13 +9231,8 @@ def get_gate_logs_admin():
                     'exit_time': log.exit_time.isoformat() if log.exit_time else None,
                     'status': log.status,
                     'created_date': log.created_date.isoformat()
-                } for log, user, college, department in logs.items],
-                'pagination': {
-                    'page': logs.page,
-                    'pages': logs.pages,
-                    'per_page': logs.per_page,
-                    'total': logs.total
-                }
+                } for log, user, college, department in items],
+                'pagination': pagination
             }), 200
 
     except Exception as e:
@@ -5691,6 +9241,7 @@ def get_gate_logs_admin():
 # Dashboard Stats API
 @app.route('/api/admin/dashboard-stats', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_dashboard_stats():
     try:
         current_user_id = int(get_jwt_identity())
@@ -5743,6 +9294,7 @@ def get_dashboard_stats():
 # Comprehensive Overall Report API
 @app.route('/api/admin/overall-report', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_overall_report():
     try:
         current_user_id = int(get_jwt_identity())
@@ -5840,6 +9392,7 @@ def get_overall_report():
 # Overall Report API with College and Department Breakdown
 @app.route('/api/admin/overall-report-detailed', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_overall_report_detailed():
     try:
         current_user_id = int(get_jwt_identity())
@@ -5940,6 +9493,7 @@ def get_overall_report_detailed():
 # Overall Report PDF Generation
 @app.route('/api/admin/overall-report-pdf', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def generate_overall_report_pdf():
     try:
         current_user_id = int(get_jwt_identity())
@@ -6236,11 +9790,226 @@ def generate_pdf_report(data, title, columns):
     except Exception as e:
         return jsonify({'error': f'Failed to generate PDF report: {str(e)}'}), 500
 
+# Catalogue export
+
+class ExportBuffer:
+    """Write-only file object the catalogue export writers write into; the response drains it
+    after every batch, so only one batch's output is held at a time"""
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        data = bytes(data)
+        self.chunks.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def catalogue_batches(batch_size):
+    """The books table as lists of rows in id order, read on the reporting engine with one short
+    keyset query per batch. Nothing stays open between batches however slowly the client reads,
+    so there is no cursor for the statement timeout to cut off and no read snapshot holding the
+    WAL back; a book changed mid-download is exported as it stood when its batch was read."""
+    columns = Book.__table__.columns
+    last_id = 0
+    while True:
+        with db.engines['reporting'].connect() as connection:
+            rows = connection.execute(
+                db.select(*columns).where(Book.id > last_id).order_by(Book.id).limit(batch_size)
+            ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def csv_export(columns, batches):
+    buffer = ExportBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in columns])
+    yield buffer.drain()
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.drain()
+
+
+XLSX_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+XLSX_RELATIONSHIPS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+# Everything in the workbook except the sheet itself
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'<Relationship Id="rId1" Type="{XLSX_RELATIONSHIPS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<workbook xmlns="{XLSX_MAIN}" xmlns:r="{XLSX_RELATIONSHIPS}">'
+        '<sheets><sheet name="Catalogue" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'<Relationship Id="rId1" Type="{XLSX_RELATIONSHIPS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{XLSX_RELATIONSHIPS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<styleSheet xmlns="{XLSX_MAIN}">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+# Control characters XML 1.0 can't carry
+XLSX_ILLEGAL_CHARACTERS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def xlsx_cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    text = xml_escape(XLSX_ILLEGAL_CHARACTERS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_rows(rows):
+    return ''.join('<row>' + ''.join(map(xlsx_cell, row)) + '</row>' for row in rows).encode('utf-8')
+
+
+def xlsx_export(columns, batches):
+    """A one-sheet workbook written straight into a streamed zip: openpyxl's write-only mode and
+    xlsxwriter's constant_memory mode both spool the sheet and only zip it on close, so nothing
+    could be sent before the last row was read"""
+    buffer = ExportBuffer()
+    # An unseekable file makes zipfile write each part's sizes after its data
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        for name, part in XLSX_PARTS.items():
+            workbook.writestr(name, part)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><worksheet xmlns="{XLSX_MAIN}">'
+                        '<sheetData>'.encode('utf-8'))
+            sheet.write(xlsx_rows([[column.name for column in columns]]))
+            yield buffer.drain()
+            for rows in batches:
+                sheet.write(xlsx_rows(rows))
+                yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
+
+
+def parquet_type(pa, column_type):
+    """The Arrow type for a SQLAlchemy column type"""
+    if isinstance(column_type, db.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, db.Integer):
+        return pa.int64()
+    if isinstance(column_type, db.Numeric):
+        if isinstance(column_type, db.Float) or column_type.precision is None:
+            return pa.float64()
+        return pa.decimal128(column_type.precision, column_type.scale or 0)
+    if isinstance(column_type, db.DateTime):
+        return pa.timestamp('us')
+    if isinstance(column_type, db.Date):
+        return pa.date32()
+    return pa.string()
+
+
+def parquet_export(columns, batches):
+    """One Parquet row group per batch"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([pa.field(column.name, parquet_type(pa, column.type)) for column in columns])
+    buffer = ExportBuffer()
+    with pq.ParquetWriter(buffer, schema) as writer:
+        yield buffer.drain()
+        for rows in batches:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+# format -> (writer, mimetype)
+CATALOGUE_EXPORT_FORMATS = {
+    'csv': (csv_export, 'text/csv'),
+    'xlsx': (xlsx_export, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': (parquet_export, 'application/vnd.apache.parquet'),
+}
+
+
+@app.route('/api/admin/books/export', methods=['GET'])
+@jwt_required()
+@reporting_endpoint
+def export_catalogue():
+    """The whole books table as CSV, XLSX or Parquet (?format=), sent batch by batch as it is read"""
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        if not user or user.role not in ['admin', 'librarian']:
+            return jsonify({'error': 'Admin/Librarian access required'}), 403
+
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in CATALOGUE_EXPORT_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(CATALOGUE_EXPORT_FORMATS)}"}), 400
+        if export_format == 'parquet':
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                return jsonify({'error': 'Parquet export needs the pyarrow package installed'}), 400
+
+        writer, mimetype = CATALOGUE_EXPORT_FORMATS[export_format]
+        # The body is generated after this view returns, so the batches read the reporting
+        # engine themselves rather than relying on reporting_endpoint
+        batches = catalogue_batches(app.config['CATALOGUE_EXPORT_BATCH_SIZE'])
+        filename = f'catalogue_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+        return Response(stream_with_context(writer(Book.__table__.columns, batches)), mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Reporting System Routes
 
 # Fine Reports
 @app.route('/api/admin/reports/fines', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_fine_reports():
     try:
         current_user_id = int(get_jwt_identity())
@@ -6325,6 +10094,7 @@ def get_fine_reports():
 # Counter Reports
 @app.route('/api/admin/reports/counter', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_counter_reports():
     try:
         current_user_id = int(get_jwt_identity())
@@ -6340,11 +10110,16 @@ def get_counter_reports():
         department_id = request.args.get('department_id')
         export_format = request.args.get('format')  # pdf, excel
 
+        # Parse the date range first: it decides whether archived loans are needed
+        from datetime import datetime
+        from_date_obj = datetime.strptime(from_date, '%Y-%m-%d') if from_date else None
+        Loan = circulation_history(from_date_obj, by='return_date' if report_type == 'return' else 'issue_date')
+
         # Build query
-        query = db.session.query(Circulation, User, Book, College, Department).join(
-            User, Circulation.user_id == User.id
+        query = db.session.query(Loan, User, Book, College, Department).join(
+            User, Loan.user_id == User.id
         ).join(
-            Book, Circulation.book_id == Book.id
+            Book, Loan.book_id == Book.id
         ).outerjoin(
             College, User.college_id == College.id
         ).outerjoin(
@@ -6353,27 +10128,25 @@ def get_counter_reports():
 
         # Apply report type filter
         if report_type == 'return':
-            query = query.filter(Circulation.status == 'returned')
+            query = query.filter(Loan.status == 'returned')
         else:  # issue
-            query = query.filter(Circulation.status.in_(['issued', 'returned']))
+            query = query.filter(Loan.status.in_(['issued', 'returned']))
 
         # Apply date filters
-        if from_date:
-            from datetime import datetime
-            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d')
+        if from_date_obj:
             if report_type == 'return':
-                query = query.filter(Circulation.return_date >= from_date_obj)
+                query = query.filter(Loan.return_date >= from_date_obj)
             else:
-                query = query.filter(Circulation.issue_date >= from_date_obj)
+                query = query.filter(Loan.issue_date >= from_date_obj)
 
         if to_date:
             from datetime import datetime
             to_date_obj = datetime.strptime(to_date, '%Y-%m-%d')
             to_date_obj = to_date_obj.replace(hour=23, minute=59, second=59)
             if report_type == 'return':
-                query = query.filter(Circulation.return_date <= to_date_obj)
+                query = query.filter(Loan.return_date <= to_date_obj)
             else:
-                query = query.filter(Circulation.issue_date <= to_date_obj)
+                query = query.filter(Loan.issue_date <= to_date_obj)
 
         if college_id and college_id != 'all':
             query = query.filter(User.college_id == int(college_id))
@@ -6381,7 +10154,7 @@ def get_counter_reports():
         if department_id and department_id != 'all':
             query = query.filter(User.department_id == int(department_id))
 
-        results = query.order_by(Circulation.issue_date.desc()).all()
+        results = query.order_by(Loan.issue_date.desc()).all()
 
         # Format data
         report_data = []
@@ -6878,7 +10651,7 @@ def get_student_books():
             query = query.filter(
                 db.or_(
                     Book.title.ilike(f'%{search}%'),
-                    Book.author.ilike(f'%{search}%'),
+                    Book.id.in_(author_book_ids(search)),
                     Book.isbn.ilike(f'%{search}%')
                 )
             )
@@ -7048,22 +10821,25 @@ def get_student_borrowing_history():
         per_page = int(request.args.get('per_page', 10))
         status_filter = request.args.get('status', 'all')
 
-        query = db.session.query(Circulation, Book).join(
-            Book, Circulation.book_id == Book.id
-        ).filter(Circulation.user_id == current_user_id)
+        # Archived loans are all returned, so only those lists need to read the archive
+        Loan = circulation_history() if status_filter in ('all', 'returned') else Circulation
+
+        query = db.session.query(Loan, Book).join(
+            Book, Loan.book_id == Book.id
+        ).filter(Loan.user_id == current_user_id)
 
         # Apply status filter
         if status_filter == 'current':
-            query = query.filter(Circulation.status == 'issued')
+            query = query.filter(Loan.status == 'issued')
         elif status_filter == 'returned':
-            query = query.filter(Circulation.status == 'returned')
+            query = query.filter(Loan.status == 'returned')
         elif status_filter == 'overdue':
             query = query.filter(
-                Circulation.status == 'issued',
-                Circulation.due_date < datetime.utcnow()
+                Loan.status == 'issued',
+                Loan.due_date < datetime.utcnow()
             )
 
-        history = query.order_by(Circulation.issue_date.desc()).paginate(
+        history = query.order_by(Loan.issue_date.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
 
@@ -7298,6 +11074,8 @@ def get_ebooks():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+EBOOK_TYPES = ['E-journal', 'E-book', 'E-journal Portal', 'E-journal Book', 'Database', 'Others']
+
 @app.route('/api/admin/ebooks', methods=['POST'])
 @jwt_required()
 def create_ebook():
@@ -7321,8 +11099,7 @@ def create_ebook():
             return jsonify({'error': 'Access number already exists'}), 400
 
         # Validate type
-        valid_types = ['E-journal', 'E-book', 'E-journal Portal', 'E-journal Book', 'Database', 'Others']
-        if data['type'] not in valid_types:
+        if data['type'] not in EBOOK_TYPES:
             return jsonify({'error': 'Invalid type'}), 400
 
         ebook = Ebook(
@@ -7365,16 +11142,14 @@ def download_ebooks_sample():
         import io
         from flask import send_file
 
-        # Create sample data
+        # Create sample data (web_detail is optional; type is one of EBOOK_TYPES)
         sample_data = {
             'access_no': ['E001', 'E002', 'E003'],
-            'title': ['Digital Signal Processing', 'Machine Learning Basics', 'Web Development Guide'],
-            'author': ['Dr. Smith', 'Prof. Johnson', 'Tech Team'],
-            'publisher': ['Tech Publications', 'Academic Press', 'Online Books'],
-            'department': ['Electronics', 'Computer Science', 'Information Technology'],
-            'category': ['Reference', 'Textbook', 'Guide'],
-            'file_format': ['PDF', 'EPUB', 'PDF'],
-            'file_size': ['15MB', '8MB', '12MB']
+            'website': ['https://ieeexplore.ieee.org', 'https://link.springer.com', 'https://www.sciencedirect.com'],
+            'web_title': ['IEEE Xplore', 'SpringerLink', 'ScienceDirect'],
+            'web_detail': ['IEEE journals and conference proceedings', 'Springer e-books and journals', ''],
+            'subject': ['Electronics', 'Computer Science', 'Engineering'],
+            'type': ['Database', 'E-book', 'E-journal Portal']
         }
 
         df = pd.DataFrame(sample_data)
@@ -7396,6 +11171,18 @@ def download_ebooks_sample():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# E-resource sheets; created_by is the uploading user
+EBOOK_SHEET = SheetSchema(Ebook, [
+    SheetField('access_no', 'Access number', required=True),
+    SheetField('website', required=True),
+    SheetField('web_title', 'Web title', required=True),
+    SheetField('subject', required=True),
+    SheetField('type', required=True, choices=EBOOK_TYPES),
+    SheetField('web_detail', 'Web detail', default=''),
+], unique=[('access_no', 'Access number', [Ebook.access_no])])
+
+IMPORT_JOB_KINDS['ebooks'] = (EBOOK_SHEET.required_columns, partial(ingest_sheet, EBOOK_SHEET))
+
 @app.route('/api/admin/ebooks/bulk', methods=['POST'])
 @jwt_required()
 def bulk_create_ebooks():
@@ -7410,58 +11197,43 @@ def bulk_create_ebooks():
 
         file = request.files['file']
 
-        # Read Excel file
-        import pandas as pd
-        df = pd.read_excel(file)
+        # Whoever uploads it, the same file resumes the same import
+        checkpoint_key = upload_checkpoint_key('ebooks', {}, file.stream)
+        if wants_background_import():
+            return start_import_job('ebooks', file, {'created_by': user_id}, user_id, checkpoint_key)
+        if wants_streaming_import():
+            if not file.filename.lower().endswith('.csv'):
+                return jsonify({'error': 'Streaming imports need a CSV file'}), 400
+            summary, error = stream_csv_import(file, EBOOK_SHEET.required_columns,
+                                               lambda df: ingest_sheet(EBOOK_SHEET, df, created_by=user_id), checkpoint_key)
+            if error:
+                return jsonify({'error': error}), 400
+            return streaming_import_response(summary, 'e-books')
+
+        # Read Excel (or CSV) file
+        df = pd.read_csv(file, dtype=str) if file.filename.lower().endswith('.csv') else pd.read_excel(file, dtype=str)
 
         # Validate required columns
-        required_columns = ['access_no', 'title', 'author', 'publisher', 'department', 'category', 'file_format', 'file_size']
-        if not all(col in df.columns for col in required_columns):
-            return jsonify({'error': f'Excel file must contain columns: {required_columns}'}), 400
-
-        created_ebooks = []
-        errors = []
-
-        for index, row in df.iterrows():
-            try:
-                access_no = str(row['access_no'])
-
-                # Check if ebook already exists
-                existing = Ebook.query.filter_by(access_no=access_no).first()
-                if existing:
-                    errors.append(f"Row {index + 1}: Access number {access_no} already exists")
-                    continue
-
-                ebook = Ebook(
-                    access_no=access_no,
-                    title=row['title'],
-                    author=row['author'],
-                    publisher=row['publisher'],
-                    department=row['department'],
-                    category=row['category'],
-                    file_format=row['file_format'],
-                    file_size=row['file_size']
-                )
+        if not all(col in df.columns for col in EBOOK_SHEET.required_columns):
+            return jsonify({'error': f'File must contain columns: {EBOOK_SHEET.required_columns}'}), 400
 
-                db.session.add(ebook)
-                created_ebooks.append({
-                    'access_no': access_no,
-                    'title': row['title'],
-                    'author': row['author']
-                })
-
-            except Exception as e:
-                errors.append(f"Row {index + 1}: {str(e)}")
-
-        db.session.commit()
+        inserted, errors, resumed_rows = import_whole_sheet(df, lambda df: ingest_sheet(EBOOK_SHEET, df, created_by=user_id),
+                                                            checkpoint_key)
 
         return jsonify({
-            'message': f'Successfully created {len(created_ebooks)} e-books',
-            'created_ebooks': created_ebooks,
-            'errors': errors
+            'message': f'Successfully created {len(inserted)} e-books',
+            'created_ebooks': [{
+                'access_no': row['access_no'],
+                'web_title': row['web_title'],
+                'subject': row['subject'],
+                'type': row['type']
+            } for row in inserted],
+            'errors': import_error_report(errors),
+            'resumed_rows': resumed_rows
         }), 201
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 # Update Ebook
@@ -7693,6 +11465,13 @@ def delete_user(user_id):
 
         for circulation in circulation_records:
             db.session.delete(circulation)
+        archived_book_ids, archived_days = delete_archived_history(user_id)
+        db.session.flush()
+        reconcile_book_circulation_counters(
+            {circulation.book_id for circulation in circulation_records} | archived_book_ids)
+        rebuild_circulation_daily_stats(
+            {circulation.issue_date.date() for circulation in circulation_records if circulation.issue_date}
+            | archived_days)
 
         # Delete all fines for this user
         fines = Fine.query.filter_by(user_id=user_id).all()
@@ -7818,12 +11597,20 @@ def bulk_delete_students():
         total_reservations = 0
         total_gate_entries = 0
 
+        affected_book_ids = set()
+        affected_days = set()
         for student in students_to_delete:
             # Delete all circulation history for this student
             circulation_records = Circulation.query.filter_by(user_id=student.id).all()
             for circulation in circulation_records:
                 db.session.delete(circulation)
             total_circulation_records += len(circulation_records)
+            affected_book_ids.update(circulation.book_id for circulation in circulation_records)
+            affected_days.update(circulation.issue_date.date() for circulation in circulation_records
+                                 if circulation.issue_date)
+            archived_book_ids, archived_days = delete_archived_history(student.id)
+            affected_book_ids.update(archived_book_ids)
+            affected_days.update(archived_days)
 
             # Delete all fines for this student
             fines = Fine.query.filter_by(user_id=student.id).all()
@@ -7847,6 +11634,9 @@ def bulk_delete_students():
             db.session.delete(student)
             deleted_count += 1
 
+        db.session.flush()
+        reconcile_book_circulation_counters(affected_book_ids)
+        rebuild_circulation_daily_stats(affected_days)
         db.session.commit()
 
         return jsonify({
@@ -7911,12 +11701,20 @@ def cleanup_expired_users():
         total_reservations = 0
         total_gate_entries = 0
 
+        affected_book_ids = set()
+        affected_days = set()
         for user in users_to_delete:
             # Delete all circulation history for this user
             circulation_records = Circulation.query.filter_by(user_id=user.id).all()
             for circulation in circulation_records:
                 db.session.delete(circulation)
             total_circulation_records += len(circulation_records)
+            affected_book_ids.update(circulation.book_id for circulation in circulation_records)
+            affected_days.update(circulation.issue_date.date() for circulation in circulation_records
+                                 if circulation.issue_date)
+            archived_book_ids, archived_days = delete_archived_history(user.id)
+            affected_book_ids.update(archived_book_ids)
+            affected_days.update(archived_days)
 
             # Delete all fines for this user
             fines = Fine.query.filter_by(user_id=user.id).all()
@@ -7940,6 +11738,9 @@ def cleanup_expired_users():
             db.session.delete(user)
             deleted_count += 1
 
+        db.session.flush()
+        reconcile_book_circulation_counters(affected_book_ids)
+        rebuild_circulation_daily_stats(affected_days)
         db.session.commit()
 
         response_data = {
@@ -9690,13 +13491,18 @@ def setup_test_data():
         ]
 
         created_books = []
+        new_books = []
+        facet_changes = Counter()
         for book_data in sample_books:
             existing = Book.query.filter_by(access_no=book_data['access_no']).first()
             if not existing:
                 book = Book(**book_data)
                 db.session.add(book)
+                new_books.append(book)
+                book_facet_changes(after=book_facet_values(book), changes=facet_changes)
                 created_books.append(book_data['access_no'])
 
+        record_catalogue_write(facet_changes, new_books)
         db.session.commit()
 
         return jsonify({
@@ -9853,6 +13659,46 @@ def notify_available_reservations():
         print(f"❌ Error notifying reservations: {str(e)}")
         db.session.rollback()
 
+def backfill_book_isbn13(chunk_size=5000):
+    """Fill isbn13 for books that have an ISBN but no canonical form yet"""
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Book.id, Book.isbn).filter(
+            Book.id > last_id,
+            Book.isbn13.is_(None),
+            Book.isbn.isnot(None),
+            Book.isbn != ''
+        ).order_by(Book.id).limit(chunk_size).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        mappings = [{'id': book_id, 'isbn13': normalize_isbn(isbn)} for book_id, isbn in rows]
+        mappings = [mapping for mapping in mappings if mapping['isbn13']]
+        if mappings:
+            db.session.bulk_update_mappings(Book, mappings)
+            updated += len(mappings)
+        db.session.commit()
+
+    if updated:
+        print(f"✅ Backfilled isbn13 for {updated} books")
+    return updated
+
+# Models whose declared indexes existing databases need added by run_migrations()
+INDEXED_MODELS = [Book, User, Circulation, Fine, Reservation, GateEntryLog]
+
+def create_model_indexes(table_names):
+    """Create any index declared on INDEXED_MODELS that an existing table is missing"""
+    for model in INDEXED_MODELS:
+        if model.__tablename__ not in table_names:
+            continue
+        for index in model.__table__.indexes:
+            try:
+                index.create(bind=db.engine, checkfirst=True)
+            except Exception as e:
+                print(f"⚠️  Could not create index {index.name}: {e}")
+
 def run_migrations():
     """Run database migrations to add missing columns"""
     try:
@@ -9910,13 +13756,105 @@ def run_migrations():
             print("Creating gate_entry_logs table...")
             # Table will be created by db.create_all()
 
+        # Canonical ISBN-13 column for indexed ISBN lookups
+        if 'books' in table_names:
+            columns = [col['name'] for col in inspector.get_columns('books')]
+            if 'isbn13' not in columns:
+                print("Adding isbn13 column to books table...")
+                with db.engine.connect() as conn:
+                    conn.execute(db.text("ALTER TABLE books ADD COLUMN isbn13 VARCHAR(13)"))
+                    conn.execute(db.text("CREATE INDEX IF NOT EXISTS ix_books_isbn13 ON books (isbn13)"))
+                    conn.commit()
+                print("✅ isbn13 column added successfully!")
+            backfill_book_isbn13()
+
+            # Per-book circulation counters behind the top-books reports
+            if 'issue_count' not in columns:
+                print("Adding circulation counter columns to books table...")
+                with db.engine.connect() as conn:
+                    conn.execute(db.text("ALTER TABLE books ADD COLUMN issue_count INTEGER NOT NULL DEFAULT 0"))
+                    conn.execute(db.text("ALTER TABLE books ADD COLUMN last_issued_at TIMESTAMP"))
+                    conn.execute(db.text("ALTER TABLE books ADD COLUMN issue_count_30d INTEGER NOT NULL DEFAULT 0"))
+                    conn.commit()
+                reconcile_book_circulation_counters()
+                db.session.commit()
+                print("✅ Circulation counters added and backfilled")
+
+        # Import jobs resume from the checkpoint of their upload
+        if 'import_jobs' in table_names:
+            columns = [col['name'] for col in inspector.get_columns('import_jobs')]
+            if 'checkpoint_key' not in columns:
+                with db.engine.connect() as conn:
+                    conn.execute(db.text("ALTER TABLE import_jobs ADD COLUMN checkpoint_key VARCHAR(64)"))
+                    conn.commit()
+        # ...and retry the chunks whose inserts failed
+        if 'import_checkpoints' in table_names:
+            columns = [col['name'] for col in inspector.get_columns('import_checkpoints')]
+            if 'pending_chunks' not in columns:
+                with db.engine.connect() as conn:
+                    conn.execute(db.text("ALTER TABLE import_checkpoints ADD COLUMN pending_chunks TEXT"))
+                    conn.commit()
+
+        # Indexes backing keyset (cursor) pagination; db.create_all() only adds them to new tables
+        keyset_indexes = [
+            ('ix_books_title', 'books', 'title'),
+            ('ix_users_created_at', 'users', 'created_at'),
+            ('ix_circulations_issue_date', 'circulations', 'issue_date'),
+            ('ix_gate_entry_logs_created_date', 'gate_entry_logs', 'created_date'),
+        ]
+        for index_name, table_name, column_name in keyset_indexes:
+            if table_name in table_names:
+                with db.engine.connect() as conn:
+                    conn.execute(db.text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({column_name})"))
+                    conn.commit()
+
+        # Hot-path secondary indexes declared on the models (same story as above)
+        create_model_indexes(table_names)
+
+        # Full-text index for the OPAC book search (/api/discover's comes after the table rebuilds below)
+        setup_books_fts()
+
+        # Change log behind the optional columnar catalogue snapshot
+        setup_book_change_log()
+
+        # Catalogue cache generation, which book writes only ever update
+        if 'cache_generations' in table_names:
+            seed_catalogue_generation()
+
+        # Seed the OPAC facet counts the first time
+        if 'book_facet_counts' in table_names and not BookFacetCount.query.first() and Book.query.first():
+            print("Building OPAC facet counts...")
+            rebuild_book_facets()
+            print("✅ OPAC facet counts built")
+
+        # Seed the daily circulation rollup the first time
+        if 'circulation_daily_stats' in table_names and not CirculationDailyStat.query.first() and Circulation.query.first():
+            print("Building daily circulation statistics...")
+            rows = rebuild_circulation_daily_stats()
+            db.session.commit()
+            print(f"✅ Daily circulation statistics built ({rows} rows)")
+
+        # Build the trigram vocabulary for fuzzy search the first time
+        if 'search_terms' in table_names and not SearchTerm.query.first() and Book.query.first():
+            print("Building fuzzy search trigram index...")
+            term_count = rebuild_search_terms()
+            print(f"✅ Fuzzy search index built ({term_count} terms)")
+
+        # Populate the normalized author index the first time
+        if 'authors' in table_names and not Author.query.first() and Book.query.first():
+            print("Building author index...")
+            author_count = rebuild_book_authors()
+            print(f"✅ Author index built ({author_count} authors)")
+
+        # Discovery source tables dropped and recreated below
+        recreated_discover_sources = False
+
         # Check and migrate news_clippings table
         if 'news_clippings' in table_names:
             print("Checking news_clippings table structure...")
             try:
                 # Check if the new columns exist
-                result = db.session.execute(text("PRAGMA table_info(news_clippings)"))
-                columns = [row[1] for row in result.fetchall()]
+                columns = [col['name'] for col in inspector.get_columns('news_clippings')]
 
                 required_columns = [
                     'clipping_no', 'newspaper_name', 'news_type', 'date', 'pages',
@@ -9934,6 +13872,7 @@ def run_migrations():
                     # Drop the old table
                     db.session.execute(text("DROP TABLE IF EXISTS news_clippings"))
                     db.session.commit()
+                    recreated_discover_sources = True
 
                     # Create the new table
                     db.create_all()
@@ -9947,6 +13886,7 @@ def run_migrations():
                 try:
                     db.session.execute(text("DROP TABLE IF EXISTS news_clippings"))
                     db.session.commit()
+                    recreated_discover_sources = True
                     db.create_all()
                     print("✅ News clippings table recreated")
                 except Exception as recreate_error:
@@ -9957,8 +13897,7 @@ def run_migrations():
             print("Checking ebooks table structure...")
             try:
                 # Check if the new columns exist
-                result = db.session.execute(text("PRAGMA table_info(ebooks)"))
-                columns = [row[1] for row in result.fetchall()]
+                columns = [col['name'] for col in inspector.get_columns('ebooks')]
 
                 required_columns = [
                     'access_no', 'website', 'web_detail', 'web_title', 'subject',
@@ -9974,6 +13913,7 @@ def run_migrations():
                     # Drop the old table
                     db.session.execute(text("DROP TABLE IF EXISTS ebooks"))
                     db.session.commit()
+                    recreated_discover_sources = True
 
                     # Create the new table
                     db.create_all()
@@ -9987,11 +13927,18 @@ def run_migrations():
                 try:
                     db.session.execute(text("DROP TABLE IF EXISTS ebooks"))
                     db.session.commit()
+                    recreated_discover_sources = True
                     db.create_all()
                     print("✅ Ebooks table recreated")
                 except Exception as recreate_error:
                     print(f"Error recreating ebooks table: {recreate_error}")
 
+        # Full-text index for /api/discover, after the rebuilds above: dropping a table drops its
+        # sync triggers too, and leaves its old rows in the index
+        if setup_discover_index() and recreated_discover_sources:
+            rebuild_discover_index()
+            db.session.commit()
+
         print("✅ Database schema is up to date!")
 
     except Exception as e:
@@ -10026,6 +13973,18 @@ if __name__ == '__main__':
         # Run migrations for existing databases
         run_migrations()
 
+        # Start loading the search-box autocomplete index now the tables are in place; a full
+        # build takes tens of seconds on a large catalogue, so don't leave it to the first request
+        start_suggest_index_build()
+
+        # Jobs the last run was importing died with it
+        try:
+            failed = fail_interrupted_import_jobs()
+            if failed:
+                print(f"⚠️  Marked {failed} interrupted import jobs failed")
+        except Exception as e:
+            print(f"Import job recovery error: {e}")
+
         # Create default admin user if not exists
         try:
             admin_user = User.query.filter_by(email='admin@library.com').first()
@@ -10077,11 +14036,12 @@ def admin_search_books_for_resources():
 
         access_no = request.args.get('access_no', '').strip()
         title = request.args.get('title', '').strip()
+        author = request.args.get('author', '').strip()
         start_date = request.args.get('start_date', '').strip()
         end_date = request.args.get('end_date', '').strip()
 
-        if not access_no and not title:
-            return jsonify({'error': 'Please provide either access number or title to search'}), 400
+        if not access_no and not title and not author:
+            return jsonify({'error': 'Please provide an access number, title or author to search'}), 400
 
         # Parse date filters
         date_filter = None
@@ -10100,20 +14060,23 @@ def admin_search_books_for_resources():
             book = Book.query.filter_by(access_no=access_no).first()
             if book:
                 books = [book]
-        elif title:
-            # Partial match for title
-            books = Book.query.filter(Book.title.ilike(f'%{title}%')).limit(20).all()
+        elif title or author:
+            # Partial match for title, author through the author index
+            query = Book.query
+            if title:
+                query = query.filter(Book.title.ilike(f'%{title}%'))
+            if author:
+                query = query.filter(Book.id.in_(author_book_ids(author)))
+            books = query.limit(20).all()
 
         # Get circulation statistics for each book
         results = []
         for book in books:
             # Count total issues for this book with date filtering
-            circulation_query = Circulation.query.filter_by(book_id=book.id)
-            if date_filter:
-                if 'start' in date_filter:
-                    circulation_query = circulation_query.filter(Circulation.issue_date >= date_filter['start'])
-                if 'end' in date_filter:
-                    circulation_query = circulation_query.filter(Circulation.issue_date <= date_filter['end'])
+            Loan = circulation_history((date_filter or {}).get('start'))
+            circulation_query = db.session.query(Loan).filter(
+                Loan.book_id == book.id, *issue_date_filters(date_filter, Loan)
+            )
 
             total_issues = circulation_query.count()
 
@@ -10151,6 +14114,62 @@ def admin_search_books_for_resources():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def issue_date_filters(date_filter, loans=Circulation):
+    """Issue date conditions on `loans` (Circulation or a circulation_history() alias) for a
+    report's start/end date filter"""
+    conditions = []
+    if date_filter:
+        if 'start' in date_filter:
+            conditions.append(loans.issue_date >= date_filter['start'])
+        if 'end' in date_filter:
+            conditions.append(loans.issue_date <= date_filter['end'])
+    return conditions
+
+def top_issued_books(limit, date_filter=None):
+    """The `limit` most issued books, from the per-book counters or, with a date filter, the loans in range.
+    Ties go to the newer book."""
+    columns = [Book.id, Book.access_no, Book.title, Book.author_1, Book.author, Book.publisher, Book.category,
+               Book.number_of_copies, Book.available_copies, Book.location, Book.issue_count_30d, Book.last_issued_at]
+    if not date_filter:
+        # Walks ix_books_issue_count backwards and stops after `limit` rows
+        return db.session.query(*columns, Book.issue_count).order_by(
+            Book.issue_count.desc(), Book.id.desc()
+        ).limit(limit).all()
+
+    # Only books issued in the range can rank, so count those loans and join just the top ones
+    Loan = circulation_history(date_filter.get('start'))
+    loans = db.func.count(Loan.id)
+    top = db.session.query(Loan.book_id, loans.label('issue_count')).filter(
+        *issue_date_filters(date_filter, Loan)
+    ).group_by(Loan.book_id).order_by(loans.desc(), Loan.book_id.desc()).limit(limit).subquery()
+    return db.session.query(*columns, top.c.issue_count).join(top, top.c.book_id == Book.id).order_by(
+        top.c.issue_count.desc(), Book.id.desc()
+    ).all()
+
+def book_issue_rank(book, date_filter=None):
+    """(rank, books compared) of `book` in top_issued_books order; rank is None if it wasn't issued in range"""
+    if not date_filter:
+        ahead = Book.query.filter(db.or_(
+            Book.issue_count > book.issue_count,
+            db.and_(Book.issue_count == book.issue_count, Book.id > book.id)
+        )).count()
+        return ahead + 1, Book.query.count()
+
+    Loan = circulation_history(date_filter.get('start'))
+    loans = db.func.count(Loan.id)
+    counts = db.session.query(Loan.book_id, loans.label('issue_count')).filter(
+        *issue_date_filters(date_filter, Loan)
+    ).group_by(Loan.book_id).subquery()
+    own = db.session.query(counts.c.issue_count).filter(counts.c.book_id == book.id).scalar()
+    compared = db.session.query(db.func.count()).select_from(counts).scalar()
+    if own is None:
+        return None, compared
+    ahead = db.session.query(db.func.count()).select_from(counts).filter(db.or_(
+        counts.c.issue_count > own,
+        db.and_(counts.c.issue_count == own, counts.c.book_id > book.id)
+    )).scalar()
+    return ahead + 1, compared
+
 # Admin - Top Books Report
 @app.route('/api/admin/frequently-accessed/top-books', methods=['GET'])
 @jwt_required()
@@ -10183,31 +14202,7 @@ def admin_top_books_report():
                 date_filter['end'] = datetime.strptime(end_date, '%Y-%m-%d')
 
         # Query to get books with their issue counts
-        from sqlalchemy import func
-        query = db.session.query(
-            Book.id,
-            Book.access_no,
-            Book.title,
-            Book.author_1,
-            Book.author,
-            Book.publisher,
-            Book.category,
-            Book.number_of_copies,
-            Book.available_copies,
-            Book.location,
-            func.count(Circulation.id).label('issue_count')
-        ).outerjoin(Circulation, Book.id == Circulation.book_id)
-
-        # Apply date filtering if provided
-        if date_filter:
-            if 'start' in date_filter:
-                query = query.filter(Circulation.issue_date >= date_filter['start'])
-            if 'end' in date_filter:
-                query = query.filter(Circulation.issue_date <= date_filter['end'])
-
-        top_books_query = query.group_by(Book.id)\
-                              .order_by(func.count(Circulation.id).desc())\
-                              .limit(limit).all()
+        top_books_query = top_issued_books(limit, date_filter)
 
         results = []
         for book_data in top_books_query:
@@ -10227,6 +14222,8 @@ def admin_top_books_report():
                 'total_copies': book_data.number_of_copies,
                 'available_copies': book_data.available_copies,
                 'total_issues': book_data.issue_count,
+                'issues_last_30_days': book_data.issue_count_30d,
+                'last_issued_at': book_data.last_issued_at.isoformat() if book_data.last_issued_at else None,
                 'current_status': current_status,
                 'location': book_data.location
             })
@@ -10258,11 +14255,12 @@ def librarian_search_books_for_resources():
 
         access_no = request.args.get('access_no', '').strip()
         title = request.args.get('title', '').strip()
+        author = request.args.get('author', '').strip()
         start_date = request.args.get('start_date', '').strip()
         end_date = request.args.get('end_date', '').strip()
 
-        if not access_no and not title:
-            return jsonify({'error': 'Please provide either access number or title to search'}), 400
+        if not access_no and not title and not author:
+            return jsonify({'error': 'Please provide an access number, title or author to search'}), 400
 
         # Parse date filters
         date_filter = None
@@ -10281,20 +14279,23 @@ def librarian_search_books_for_resources():
             book = Book.query.filter_by(access_no=access_no).first()
             if book:
                 books = [book]
-        elif title:
-            # Partial match for title
-            books = Book.query.filter(Book.title.ilike(f'%{title}%')).limit(20).all()
+        elif title or author:
+            # Partial match for title, author through the author index
+            query = Book.query
+            if title:
+                query = query.filter(Book.title.ilike(f'%{title}%'))
+            if author:
+                query = query.filter(Book.id.in_(author_book_ids(author)))
+            books = query.limit(20).all()
 
         # Get circulation statistics for each book
         results = []
         for book in books:
             # Count total issues for this book with date filtering
-            circulation_query = Circulation.query.filter_by(book_id=book.id)
-            if date_filter:
-                if 'start' in date_filter:
-                    circulation_query = circulation_query.filter(Circulation.issue_date >= date_filter['start'])
-                if 'end' in date_filter:
-                    circulation_query = circulation_query.filter(Circulation.issue_date <= date_filter['end'])
+            Loan = circulation_history((date_filter or {}).get('start'))
+            circulation_query = db.session.query(Loan).filter(
+                Loan.book_id == book.id, *issue_date_filters(date_filter, Loan)
+            )
 
             total_issues = circulation_query.count()
 
@@ -10364,31 +14365,7 @@ def librarian_top_books_report():
                 date_filter['end'] = datetime.strptime(end_date, '%Y-%m-%d')
 
         # Query to get books with their issue counts
-        from sqlalchemy import func
-        query = db.session.query(
-            Book.id,
-            Book.access_no,
-            Book.title,
-            Book.author_1,
-            Book.author,
-            Book.publisher,
-            Book.category,
-            Book.number_of_copies,
-            Book.available_copies,
-            Book.location,
-            func.count(Circulation.id).label('issue_count')
-        ).outerjoin(Circulation, Book.id == Circulation.book_id)
-
-        # Apply date filtering if provided
-        if date_filter:
-            if 'start' in date_filter:
-                query = query.filter(Circulation.issue_date >= date_filter['start'])
-            if 'end' in date_filter:
-                query = query.filter(Circulation.issue_date <= date_filter['end'])
-
-        top_books_query = query.group_by(Book.id)\
-                              .order_by(func.count(Circulation.id).desc())\
-                              .limit(limit).all()
+        top_books_query = top_issued_books(limit, date_filter)
 
         results = []
         for book_data in top_books_query:
@@ -10408,6 +14385,8 @@ def librarian_top_books_report():
                 'total_copies': book_data.number_of_copies,
                 'available_copies': book_data.available_copies,
                 'total_issues': book_data.issue_count,
+                'issues_last_30_days': book_data.issue_count_30d,
+                'last_issued_at': book_data.last_issued_at.isoformat() if book_data.last_issued_at else None,
                 'current_status': current_status,
                 'location': book_data.location
             })
@@ -10430,6 +14409,7 @@ def librarian_top_books_report():
 # Individual Book Frequency Report - Admin
 @app.route('/api/admin/frequently-accessed/book-report', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def admin_individual_book_report():
     try:
         user_id = int(get_jwt_identity())
@@ -10459,14 +14439,12 @@ def admin_individual_book_report():
                 date_filter['end'] = datetime.strptime(end_date, '%Y-%m-%d')
 
         # Get circulation history with date filtering
-        circulation_query = Circulation.query.filter_by(book_id=book.id)
-        if date_filter:
-            if 'start' in date_filter:
-                circulation_query = circulation_query.filter(Circulation.issue_date >= date_filter['start'])
-            if 'end' in date_filter:
-                circulation_query = circulation_query.filter(Circulation.issue_date <= date_filter['end'])
-
-        circulations = circulation_query.order_by(Circulation.issue_date.desc()).all()
+        Loan = circulation_history((date_filter or {}).get('start'))
+        circulation_query = db.session.query(Loan).filter(
+            Loan.book_id == book.id, *issue_date_filters(date_filter, Loan)
+        )
+
+        circulations = circulation_query.order_by(Loan.issue_date.desc()).all()
         total_issues = len(circulations)
 
         # Calculate monthly statistics
@@ -10477,28 +14455,7 @@ def admin_individual_book_report():
             monthly_stats[month_key] += 1
 
         # Get book ranking among all books
-        from sqlalchemy import func
-        all_books_query = db.session.query(
-            Book.id,
-            func.count(Circulation.id).label('issue_count')
-        ).outerjoin(Circulation, Book.id == Circulation.book_id)
-
-        if date_filter:
-            if 'start' in date_filter:
-                all_books_query = all_books_query.filter(Circulation.issue_date >= date_filter['start'])
-            if 'end' in date_filter:
-                all_books_query = all_books_query.filter(Circulation.issue_date <= date_filter['end'])
-
-        all_books_stats = all_books_query.group_by(Book.id)\
-                                        .order_by(func.count(Circulation.id).desc())\
-                                        .all()
-
-        # Find ranking
-        ranking = None
-        for idx, (bid, count) in enumerate(all_books_stats, 1):
-            if bid == book.id:
-                ranking = idx
-                break
+        ranking, total_books_compared = book_issue_rank(book, date_filter)
 
         # Get primary author
         primary_author = book.author_1 if book.author_1 else (book.author if book.author else 'Unknown')
@@ -10518,8 +14475,10 @@ def admin_individual_book_report():
             },
             'statistics': {
                 'total_issues': total_issues,
+                'issues_last_30_days': book.issue_count_30d,
+                'last_issued_at': book.last_issued_at.isoformat() if book.last_issued_at else None,
                 'ranking': ranking,
-                'total_books_compared': len(all_books_stats),
+                'total_books_compared': total_books_compared,
                 'monthly_breakdown': dict(monthly_stats)
             },
             'circulation_history': [{
@@ -10542,6 +14501,7 @@ def admin_individual_book_report():
 # Individual Book Frequency Report - Librarian
 @app.route('/api/librarian/frequently-accessed/book-report', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def librarian_individual_book_report():
     try:
         user_id = int(get_jwt_identity())
@@ -10572,14 +14532,12 @@ def librarian_individual_book_report():
                 date_filter['end'] = datetime.strptime(end_date, '%Y-%m-%d')
 
         # Get circulation history with date filtering
-        circulation_query = Circulation.query.filter_by(book_id=book.id)
-        if date_filter:
-            if 'start' in date_filter:
-                circulation_query = circulation_query.filter(Circulation.issue_date >= date_filter['start'])
-            if 'end' in date_filter:
-                circulation_query = circulation_query.filter(Circulation.issue_date <= date_filter['end'])
-
-        circulations = circulation_query.order_by(Circulation.issue_date.desc()).all()
+        Loan = circulation_history((date_filter or {}).get('start'))
+        circulation_query = db.session.query(Loan).filter(
+            Loan.book_id == book.id, *issue_date_filters(date_filter, Loan)
+        )
+
+        circulations = circulation_query.order_by(Loan.issue_date.desc()).all()
         total_issues = len(circulations)
 
         # Calculate monthly statistics
@@ -10590,28 +14548,7 @@ def librarian_individual_book_report():
             monthly_stats[month_key] += 1
 
         # Get book ranking among all books
-        from sqlalchemy import func
-        all_books_query = db.session.query(
-            Book.id,
-            func.count(Circulation.id).label('issue_count')
-        ).outerjoin(Circulation, Book.id == Circulation.book_id)
-
-        if date_filter:
-            if 'start' in date_filter:
-                all_books_query = all_books_query.filter(Circulation.issue_date >= date_filter['start'])
-            if 'end' in date_filter:
-                all_books_query = all_books_query.filter(Circulation.issue_date <= date_filter['end'])
-
-        all_books_stats = all_books_query.group_by(Book.id)\
-                                        .order_by(func.count(Circulation.id).desc())\
-                                        .all()
-
-        # Find ranking
-        ranking = None
-        for idx, (bid, count) in enumerate(all_books_stats, 1):
-            if bid == book.id:
-                ranking = idx
-                break
+        ranking, total_books_compared = book_issue_rank(book, date_filter)
 
         # Get primary author
         primary_author = book.author_1 if book.author_1 else (book.author if book.author else 'Unknown')
@@ -10631,8 +14568,10 @@ def librarian_individual_book_report():
             },
             'statistics': {
                 'total_issues': total_issues,
+                'issues_last_30_days': book.issue_count_30d,
+                'last_issued_at': book.last_issued_at.isoformat() if book.last_issued_at else None,
                 'ranking': ranking,
-                'total_books_compared': len(all_books_stats),
+                'total_books_compared': total_books_compared,
                 'monthly_breakdown': dict(monthly_stats)
             },
             'circulation_history': [{
@@ -10655,6 +14594,7 @@ def librarian_individual_book_report():
 # Download endpoints for reports
 @app.route('/api/admin/frequently-accessed/download/pdf', methods=['POST'])
 @jwt_required()
+@reporting_endpoint
 def admin_download_pdf_report():
     try:
         user_id = int(get_jwt_identity())
@@ -10721,6 +14661,7 @@ def admin_download_pdf_report():
 
 @app.route('/api/admin/frequently-accessed/download/excel', methods=['POST'])
 @jwt_required()
+@reporting_endpoint
 def admin_download_excel_report():
     try:
         user_id = int(get_jwt_identity())
@@ -10783,6 +14724,7 @@ def admin_download_excel_report():
 
 @app.route('/api/librarian/frequently-accessed/download/pdf', methods=['POST'])
 @jwt_required()
+@reporting_endpoint
 def librarian_download_pdf_report():
     try:
         user_id = int(get_jwt_identity())
@@ -10849,6 +14791,7 @@ def librarian_download_pdf_report():
 
 @app.route('/api/librarian/frequently-accessed/download/excel', methods=['POST'])
 @jwt_required()
+@reporting_endpoint
 def librarian_download_excel_report():
     try:
         user_id = int(get_jwt_identity())
@@ -10912,6 +14855,7 @@ def librarian_download_excel_report():
 # Library Collection Report endpoints
 @app.route('/api/admin/reports/library-collection', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def admin_library_collection_report():
     try:
         user_id = int(get_jwt_identity())
@@ -10975,6 +14919,7 @@ def admin_library_collection_report():
 # Pending Book Returns Report - Admin
 @app.route('/api/admin/reports/pending-returns', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_admin_pending_returns():
     try:
         current_user_id = int(get_jwt_identity())
@@ -11076,6 +15021,7 @@ def get_admin_pending_returns():
 # Pending Book Returns Export - Admin
 @app.route('/api/admin/reports/pending-returns/export', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def export_admin_pending_returns():
     try:
         current_user_id = int(get_jwt_identity())
@@ -11179,11 +15125,8 @@ def librarian_search_issued_books_by_isbn(isbn):
         if not isbn.strip():
             return jsonify({'error': 'ISBN is required'}), 400
 
-        # Search for issued books with the given ISBN
-        issued_books = db.session.query(Circulation, Book, User).join(Book).join(User).filter(
-            Book.isbn.ilike(f'%{isbn.strip()}%'),
-            Circulation.status == 'issued'
-        ).all()
+        # Search for issued books with the given ISBN or access number
+        issued_books = find_issued_books_by_code(isbn.strip(), ['issued'])
 
         # Calculate overdue status and fines
         from datetime import date
@@ -11232,6 +15175,7 @@ def librarian_search_issued_books_by_isbn(isbn):
 # Pending Book Returns Report - Librarian
 @app.route('/api/librarian/reports/pending-returns', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def get_librarian_pending_returns():
     try:
         current_user_id = int(get_jwt_identity())
@@ -11333,6 +15277,7 @@ def get_librarian_pending_returns():
 # Pending Book Returns Export - Librarian
 @app.route('/api/librarian/reports/pending-returns/export', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def export_librarian_pending_returns():
     try:
         current_user_id = int(get_jwt_identity())
@@ -11425,6 +15370,7 @@ def export_librarian_pending_returns():
 
 @app.route('/api/librarian/reports/library-collection', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def librarian_library_collection_report():
     try:
         user_id = int(get_jwt_identity())
@@ -11615,6 +15561,7 @@ def generate_library_collection_excel(collection_data):
 # Library Collection Report download endpoints
 @app.route('/api/admin/reports/library-collection/download/pdf', methods=['POST'])
 @jwt_required()
+@reporting_endpoint
 def admin_download_library_collection_pdf():
     try:
         user_id = int(get_jwt_identity())
@@ -11644,6 +15591,7 @@ def admin_download_library_collection_pdf():
 
 @app.route('/api/admin/reports/library-collection/download/excel', methods=['POST'])
 @jwt_required()
+@reporting_endpoint
 def admin_download_library_collection_excel():
     try:
         user_id = int(get_jwt_identity())
@@ -11673,6 +15621,7 @@ def admin_download_library_collection_excel():
 
 @app.route('/api/librarian/reports/library-collection/download/pdf', methods=['POST'])
 @jwt_required()
+@reporting_endpoint
 def librarian_download_library_collection_pdf():
     try:
         user_id = int(get_jwt_identity())
@@ -11702,6 +15651,7 @@ def librarian_download_library_collection_pdf():
 
 @app.route('/api/librarian/reports/library-collection/download/excel', methods=['POST'])
 @jwt_required()
+@reporting_endpoint
 def librarian_download_library_collection_excel():
     try:
         user_id = int(get_jwt_identity())
@@ -11733,52 +15683,72 @@ def librarian_download_library_collection_excel():
 # DATABASE BACKUP SYSTEM
 # ===============================
 
-import shutil
-import sqlite3
-import json
+import subprocess
 from threading import Timer
 import schedule
-import time
 
 # Create backups directory
 BACKUP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups')
 if not os.path.exists(BACKUP_DIR):
     os.makedirs(BACKUP_DIR)
 
+def sqlite_database_path():
+    """Filesystem path of the SQLite database, handling Flask's instance folder"""
+    db_uri = app.config['SQLALCHEMY_DATABASE_URI']
+    db_path = db_uri.replace('sqlite:///', '')
+
+    # If it's a relative path, check both instance folder and backend folder
+    if not os.path.isabs(db_path):
+        # First try instance folder (Flask default)
+        instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', db_path)
+        if os.path.exists(instance_path):
+            db_path = instance_path
+        else:
+            # Fallback to backend folder
+            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), db_path)
+
+    # Verify database file exists
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file not found at: {db_path}")
+    return db_path
+
+def write_sql_dump(sql_backup_path):
+    """Write a plain SQL dump of the database: sqlite3's iterdump, or pg_dump for PostgreSQL"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        db_path = sqlite_database_path()
+        app.logger.info(f"Creating SQL backup from database: {db_path}")
+        conn = sqlite3.connect(db_path)
+        try:
+            with open(sql_backup_path, 'w', encoding='utf-8') as f:
+                for line in conn.iterdump():
+                    f.write('%s\n' % line)
+        finally:
+            conn.close()
+    elif dialect == 'postgresql':
+        # libpq understands plain postgresql:// URLs; drop the SQLAlchemy driver suffix
+        url = db.engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        app.logger.info(f"Creating SQL backup with pg_dump from database: {db.engine.url.database}")
+        result = subprocess.run(
+            [os.getenv('PG_DUMP_PATH', 'pg_dump'), '--no-owner', '--no-privileges',
+             '--file', sql_backup_path, '--dbname', url],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"pg_dump failed: {result.stderr.strip()}")
+    else:
+        raise RuntimeError(f"SQL backups are not supported for the {dialect} backend")
+
 def create_sql_backup():
     """Create a SQL dump backup only"""
     try:
-        # Get current database path - handle Flask instance folder
-        db_uri = app.config['SQLALCHEMY_DATABASE_URI']
-        db_path = db_uri.replace('sqlite:///', '')
-
-        # If it's a relative path, check both instance folder and backend folder
-        if not os.path.isabs(db_path):
-            # First try instance folder (Flask default)
-            instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', db_path)
-            if os.path.exists(instance_path):
-                db_path = instance_path
-            else:
-                # Fallback to backend folder
-                db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), db_path)
-
-        # Verify database file exists
-        if not os.path.exists(db_path):
-            raise FileNotFoundError(f"Database file not found at: {db_path}")
-
-        app.logger.info(f"Creating SQL backup from database: {db_path}")
-
         # Create backup filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         sql_backup_filename = f'library_backup_{timestamp}.sql'
         sql_backup_path = os.path.join(BACKUP_DIR, sql_backup_filename)
 
         # Create SQL dump
-        conn = sqlite3.connect(db_path)
-        with open(sql_backup_path, 'w', encoding='utf-8') as f:
-            for line in conn.iterdump():
-                f.write('%s\n' % line)
-        conn.close()
+        write_sql_dump(sql_backup_path)
 
         # Clean up old backups (keep only last 30 backups)
         cleanup_old_backups()
@@ -11795,46 +15765,35 @@ def create_sql_backup():
         return {'success': False, 'error': str(e)}
 
 def create_database_backup():
-    """Create a backup of the SQLite database"""
-    try:
-        # Get current database path - handle Flask instance folder
-        db_uri = app.config['SQLALCHEMY_DATABASE_URI']
-        db_path = db_uri.replace('sqlite:///', '')
-
-        # If it's a relative path, check both instance folder and backend folder
-        if not os.path.isabs(db_path):
-            # First try instance folder (Flask default)
-            instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', db_path)
-            if os.path.exists(instance_path):
-                db_path = instance_path
-            else:
-                # Fallback to backend folder
-                db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), db_path)
-
-        # Verify database file exists
-        if not os.path.exists(db_path):
-            raise FileNotFoundError(f"Database file not found at: {db_path}")
-
-        app.logger.info(f"Creating backup from database: {db_path}")
-
+    """Create a backup of the database: a file copy plus SQL dump for SQLite, a SQL dump otherwise"""
+    try:
         # Create backup filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_filename = f'library_backup_{timestamp}.db'
-        backup_path = os.path.join(BACKUP_DIR, backup_filename)
+        backup_filename = None
+        size = 0
 
-        # Copy the database file
-        shutil.copy2(db_path, backup_path)
+        if db.engine.dialect.name == 'sqlite':
+            db_path = sqlite_database_path()
+            app.logger.info(f"Creating backup from database: {db_path}")
 
-        # Also create a SQL dump for better compatibility
+            backup_filename = f'library_backup_{timestamp}.db'
+            backup_path = os.path.join(BACKUP_DIR, backup_filename)
+
+            # Copy the database through SQLite's backup API: with WAL enabled the
+            # main file alone can be missing recently committed pages
+            source = sqlite3.connect(db_path)
+            target = sqlite3.connect(backup_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            size = os.path.getsize(backup_path)
+
+        # Also create a SQL dump for better compatibility (the only backup on server databases)
         sql_backup_filename = f'library_backup_{timestamp}.sql'
         sql_backup_path = os.path.join(BACKUP_DIR, sql_backup_filename)
-
-        # Create SQL dump
-        conn = sqlite3.connect(db_path)
-        with open(sql_backup_path, 'w') as f:
-            for line in conn.iterdump():
-                f.write('%s\n' % line)
-        conn.close()
+        write_sql_dump(sql_backup_path)
 
         # Clean up old backups (keep only last 30 backups)
         cleanup_old_backups()
@@ -11844,7 +15803,7 @@ def create_database_backup():
             'db_backup': backup_filename,
             'sql_backup': sql_backup_filename,
             'timestamp': timestamp,
-            'size': os.path.getsize(backup_path)
+            'size': size or os.path.getsize(sql_backup_path)
         }
 
     except Exception as e:
@@ -11878,22 +15837,39 @@ def cleanup_old_backups():
     except Exception as e:
         app.logger.error(f"Backup cleanup failed: {str(e)}")
 
+# The schedule below only runs inside `python app.py`. Under a WSGI server (one scheduler per
+# worker would repeat every job), run the nightly jobs from cron on one host instead:
+#   0 2 * * *  cd /path/to/backend && flask --app app reconcile-book-counters
+#   0 3 * * *  cd /path/to/backend && flask --app app archive-history
 def schedule_auto_backup():
     """Schedule automatic backups every 7 days"""
     def auto_backup_job():
         app.logger.info("Running scheduled automatic backup...")
-        result = create_database_backup()
+        with app.app_context():
+            result = create_database_backup()
         if result['success']:
-            app.logger.info(f"Automatic backup created successfully: {result['db_backup']}")
+            app.logger.info(f"Automatic backup created successfully: {result['db_backup'] or result['sql_backup']}")
         else:
             app.logger.error(f"Automatic backup failed: {result['error']}")
 
     # Schedule backup every 7 days
     schedule.every(7).days.do(auto_backup_job)
+    # Age the rolling 30-day issue counts once a day
+    schedule.every().day.at('02:00').do(reconcile_book_circulation_counters_job)
+    # Move closed loans and old gate logs out of the hot tables overnight
+    schedule.every().day.at('03:00').do(archive_history_job)
 
     # Also run backup on server start
     auto_backup_job()
 
+def start_scheduler(interval=60):
+    """Run due `schedule` jobs (backups, counter reconcile) from a daemon thread"""
+    def run():
+        while True:
+            schedule.run_pending()
+            time.sleep(interval)
+    threading.Thread(target=run, name='scheduler', daemon=True).start()
+
 # Manual backup endpoint
 @app.route('/api/admin/backup/create', methods=['POST'])
 @jwt_required()
@@ -12062,6 +16038,7 @@ def get_backup_settings():
 # Analytics Dashboard Routes
 @app.route('/api/admin/analytics/dashboard', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def admin_analytics_dashboard():
     try:
         print("Analytics endpoint called")
@@ -12109,12 +16086,15 @@ def admin_analytics_dashboard():
             if not selected_college:
                 return jsonify({'error': 'Invalid college selected'}), 400
 
+        # Loans in the report range, reading the archive too when the range reaches back into it
+        Loan = circulation_history(start_date_obj)
+
         # Base query for circulation with date filtering
-        circulation_query = Circulation.query
+        circulation_query = db.session.query(Loan)
         if start_date_obj:
-            circulation_query = circulation_query.filter(Circulation.issue_date >= start_date_obj)
+            circulation_query = circulation_query.filter(Loan.issue_date >= start_date_obj)
         if end_date_obj:
-            circulation_query = circulation_query.filter(Circulation.issue_date <= end_date_obj)
+            circulation_query = circulation_query.filter(Loan.issue_date <= end_date_obj)
 
         # Basic Statistics from real data
         total_books = Book.query.count() or 0
@@ -12126,7 +16106,7 @@ def admin_analytics_dashboard():
             filtered_circulation = circulation_query.filter_by(status='issued')
             total_issued = filtered_circulation.count() or 0
             total_returned = 0
-            total_overdue = filtered_circulation.filter(Circulation.due_date < datetime.now().date()).count() or 0
+            total_overdue = filtered_circulation.filter(Loan.due_date < datetime.now().date()).count() or 0
             report_title = "Book Issue Statistics"
 
         elif report_type == 'return_book':
@@ -12139,12 +16119,12 @@ def admin_analytics_dashboard():
 
         elif report_type == 'fine':
             # For fine report - show books with fines
-            filtered_circulation = circulation_query.filter(Circulation.fine_amount > 0)
+            filtered_circulation = circulation_query.filter(Loan.fine_amount > 0)
             total_issued = filtered_circulation.filter_by(status='issued').count() or 0
             total_returned = filtered_circulation.filter_by(status='returned').count() or 0
             total_overdue = filtered_circulation.filter(
-                Circulation.status == 'issued',
-                Circulation.due_date < datetime.now().date()
+                Loan.status == 'issued',
+                Loan.due_date < datetime.now().date()
             ).count() or 0
             report_title = "Fine Statistics"
 
@@ -12153,8 +16133,8 @@ def admin_analytics_dashboard():
             total_issued = circulation_query.filter_by(status='issued').count() or 0
             total_returned = circulation_query.filter_by(status='returned').count() or 0
             total_overdue = circulation_query.filter(
-                Circulation.status == 'issued',
-                Circulation.due_date < datetime.now().date()
+                Loan.status == 'issued',
+                Loan.due_date < datetime.now().date()
             ).count() or 0
             report_title = "Library Overview Statistics"
 
@@ -12163,17 +16143,17 @@ def admin_analytics_dashboard():
             total_issued = circulation_query.filter_by(status='issued').count() or 0
             total_returned = circulation_query.filter_by(status='returned').count() or 0
             total_overdue = circulation_query.filter(
-                Circulation.status == 'issued',
-                Circulation.due_date < datetime.now().date()
+                Loan.status == 'issued',
+                Loan.due_date < datetime.now().date()
             ).count() or 0
             report_title = "All Circulation Statistics"
 
         # Calculate active users - users with current borrowings
-        active_users_query = User.query.join(Circulation).filter(Circulation.status == 'issued')
+        active_users_query = User.query.join(Loan, Loan.user_id == User.id).filter(Loan.status == 'issued')
         if start_date_obj:
-            active_users_query = active_users_query.filter(Circulation.issue_date >= start_date_obj)
+            active_users_query = active_users_query.filter(Loan.issue_date >= start_date_obj)
         if end_date_obj:
-            active_users_query = active_users_query.filter(Circulation.issue_date <= end_date_obj)
+            active_users_query = active_users_query.filter(Loan.issue_date <= end_date_obj)
         active_users = active_users_query.distinct().count() or 0
 
         # Calculate return rate from real data
@@ -12182,10 +16162,8 @@ def admin_analytics_dashboard():
             return_rate = int((total_returned / (total_returned + total_issued)) * 100)
 
         # Fine statistics from real data
-        fine_query = circulation_query.filter(Circulation.fine_amount > 0)
         if report_type == 'fine':
-            fine_records = fine_query.all()
-            total_fines = sum([record.fine_amount or 0 for record in fine_records])
+            total_fines = circulation_stat_total(CirculationDailyStat.fine_total, start_date_obj, end_date_obj)
             # Assume 70% collection rate for collected vs pending
             total_fines_collected = total_fines * 0.7
             total_fines_pending = total_fines * 0.3
@@ -12204,17 +16182,17 @@ def admin_analytics_dashboard():
 
             if report_type in ['issue_book', 'return_book', 'fine']:
                 # Filter by circulation data
-                category_query = category_query.join(Circulation, Circulation.book_id == Book.id)
+                category_query = category_query.join(Loan, Loan.book_id == Book.id)
                 if start_date_obj:
-                    category_query = category_query.filter(Circulation.issue_date >= start_date_obj)
+                    category_query = category_query.filter(Loan.issue_date >= start_date_obj)
                 if end_date_obj:
-                    category_query = category_query.filter(Circulation.issue_date <= end_date_obj)
+                    category_query = category_query.filter(Loan.issue_date <= end_date_obj)
                 if report_type == 'issue_book':
-                    category_query = category_query.filter(Circulation.status == 'issued')
+                    category_query = category_query.filter(Loan.status == 'issued')
                 elif report_type == 'return_book':
-                    category_query = category_query.filter(Circulation.status == 'returned')
+                    category_query = category_query.filter(Loan.status == 'returned')
                 elif report_type == 'fine':
-                    category_query = category_query.filter(Circulation.fine_amount > 0)
+                    category_query = category_query.filter(Loan.fine_amount > 0)
 
             category_stats = category_query.group_by(Category.name).all()
             category_distribution = [
@@ -12223,30 +16201,28 @@ def admin_analytics_dashboard():
             ]
         except Exception as e:
             print(f"Category query error: {e}")
+            db.session.rollback()  # a failed statement aborts the rest of a PostgreSQL transaction
             category_distribution = []
 
         # Real monthly circulation data
         try:
-            monthly_query = db.session.query(
-                db.func.strftime('%Y-%m', Circulation.issue_date).label('month'),
-                db.func.count(Circulation.id).label('count')
-            )
-
-            if start_date_obj:
-                monthly_query = monthly_query.filter(Circulation.issue_date >= start_date_obj)
-            if end_date_obj:
-                monthly_query = monthly_query.filter(Circulation.issue_date <= end_date_obj)
+            stat_column = circulation_report_stat_column(report_type)
+            if stat_column is not None:
+                monthly_data = monthly_circulation_stat(stat_column, start_date_obj, end_date_obj)
+            else:
+                monthly_query = db.session.query(
+                    month_bucket(Loan.issue_date).label('month'),
+                    db.func.count(Loan.id).label('count')
+                ).filter(Loan.status == 'issued')
 
-            if report_type == 'issue_book':
-                monthly_query = monthly_query.filter(Circulation.status == 'issued')
-            elif report_type == 'return_book':
-                monthly_query = monthly_query.filter(Circulation.status == 'returned')
-            elif report_type == 'fine':
-                monthly_query = monthly_query.filter(Circulation.fine_amount > 0)
+                if start_date_obj:
+                    monthly_query = monthly_query.filter(Loan.issue_date >= start_date_obj)
+                if end_date_obj:
+                    monthly_query = monthly_query.filter(Loan.issue_date <= end_date_obj)
 
-            monthly_data = monthly_query.group_by(
-                db.func.strftime('%Y-%m', Circulation.issue_date)
-            ).order_by('month').limit(12).all()
+                monthly_data = monthly_query.group_by(
+                    month_bucket(Loan.issue_date)
+                ).order_by('month').limit(12).all()
 
             monthly_circulation = [
                 {'label': month or 'N/A', 'value': count}
@@ -12254,6 +16230,7 @@ def admin_analytics_dashboard():
             ]
         except Exception as e:
             print(f"Monthly query error: {e}")
+            db.session.rollback()
             monthly_circulation = []
 
         # Real user type distribution
@@ -12265,17 +16242,17 @@ def admin_analytics_dashboard():
 
             if report_type in ['issue_book', 'return_book', 'fine']:
                 # Filter by circulation data
-                user_type_query = user_type_query.join(Circulation, Circulation.user_id == User.id)
+                user_type_query = user_type_query.join(Loan, Loan.user_id == User.id)
                 if start_date_obj:
-                    user_type_query = user_type_query.filter(Circulation.issue_date >= start_date_obj)
+                    user_type_query = user_type_query.filter(Loan.issue_date >= start_date_obj)
                 if end_date_obj:
-                    user_type_query = user_type_query.filter(Circulation.issue_date <= end_date_obj)
+                    user_type_query = user_type_query.filter(Loan.issue_date <= end_date_obj)
                 if report_type == 'issue_book':
-                    user_type_query = user_type_query.filter(Circulation.status == 'issued')
+                    user_type_query = user_type_query.filter(Loan.status == 'issued')
                 elif report_type == 'return_book':
-                    user_type_query = user_type_query.filter(Circulation.status == 'returned')
+                    user_type_query = user_type_query.filter(Loan.status == 'returned')
                 elif report_type == 'fine':
-                    user_type_query = user_type_query.filter(Circulation.fine_amount > 0)
+                    user_type_query = user_type_query.filter(Loan.fine_amount > 0)
 
             user_type_stats = user_type_query.group_by(User.role).all()
             user_type_distribution = [
@@ -12284,6 +16261,7 @@ def admin_analytics_dashboard():
             ]
         except Exception as e:
             print(f"User type query error: {e}")
+            db.session.rollback()
             user_type_distribution = []
 
         # Pending books by department within selected college (for charts)
@@ -12292,17 +16270,17 @@ def admin_analytics_dashboard():
             try:
                 q = db.session.query(
                     Department.name.label('department'),
-                    db.func.count(Circulation.id).label('pending_count')
-                ).join(User, User.id == Circulation.user_id)
+                    db.func.count(Loan.id).label('pending_count')
+                ).join(User, User.id == Loan.user_id)
                 q = q.join(Department, Department.id == User.department_id)
                 q = q.filter(
-                    Circulation.status == 'issued',
+                    Loan.status == 'issued',
                     Department.college_id == selected_college.id
                 )
                 if start_date_obj:
-                    q = q.filter(Circulation.issue_date >= start_date_obj)
+                    q = q.filter(Loan.issue_date >= start_date_obj)
                 if end_date_obj:
-                    q = q.filter(Circulation.issue_date <= end_date_obj)
+                    q = q.filter(Loan.issue_date <= end_date_obj)
                 q = q.group_by(Department.id, Department.name)
                 results = q.all()
                 pending_by_department = [
@@ -12310,6 +16288,7 @@ def admin_analytics_dashboard():
                 ]
             except Exception as e:
                 print(f"Pending-by-department query error: {e}")
+                db.session.rollback()
                 pending_by_department = []
         # Build report-specific chart data
         report_bar = []
@@ -12321,17 +16300,17 @@ def admin_analytics_dashboard():
                     # Issues by department within selected college
                     dept_query = db.session.query(
                         Department.name.label('department'),
-                        db.func.count(Circulation.id).label('count')
-                    ).join(User, User.id == Circulation.user_id)
+                        db.func.count(Loan.id).label('count')
+                    ).join(User, User.id == Loan.user_id)
                     dept_query = dept_query.join(Department, Department.id == User.department_id)
                     dept_query = dept_query.filter(
-                        Circulation.status == 'issued',
+                        Loan.status == 'issued',
                         Department.college_id == selected_college.id
                     )
                     if start_date_obj:
-                        dept_query = dept_query.filter(Circulation.issue_date >= start_date_obj)
+                        dept_query = dept_query.filter(Loan.issue_date >= start_date_obj)
                     if end_date_obj:
-                        dept_query = dept_query.filter(Circulation.issue_date <= end_date_obj)
+                        dept_query = dept_query.filter(Loan.issue_date <= end_date_obj)
                     dept_data = dept_query.group_by(Department.id, Department.name).all()
                     chart_data = [{'label': dept or 'Unknown', 'value': int(count)} for dept, count in dept_data]
                     report_bar = chart_data
@@ -12341,17 +16320,17 @@ def admin_analytics_dashboard():
                     # Returns by department within selected college
                     dept_query = db.session.query(
                         Department.name.label('department'),
-                        db.func.count(Circulation.id).label('count')
-                    ).join(User, User.id == Circulation.user_id)
+                        db.func.count(Loan.id).label('count')
+                    ).join(User, User.id == Loan.user_id)
                     dept_query = dept_query.join(Department, Department.id == User.department_id)
                     dept_query = dept_query.filter(
-                        Circulation.status == 'returned',
+                        Loan.status == 'returned',
                         Department.college_id == selected_college.id
                     )
                     if start_date_obj:
-                        dept_query = dept_query.filter(Circulation.issue_date >= start_date_obj)
+                        dept_query = dept_query.filter(Loan.issue_date >= start_date_obj)
                     if end_date_obj:
-                        dept_query = dept_query.filter(Circulation.issue_date <= end_date_obj)
+                        dept_query = dept_query.filter(Loan.issue_date <= end_date_obj)
                     dept_data = dept_query.group_by(Department.id, Department.name).all()
                     chart_data = [{'label': dept or 'Unknown', 'value': int(count)} for dept, count in dept_data]
                     report_bar = chart_data
@@ -12395,14 +16374,14 @@ def admin_analytics_dashboard():
                     # Overview charts when college is selected
                     dept_query = db.session.query(
                         Department.name.label('department'),
-                        db.func.count(Circulation.id).label('count')
-                    ).join(User, User.id == Circulation.user_id)
+                        db.func.count(Loan.id).label('count')
+                    ).join(User, User.id == Loan.user_id)
                     dept_query = dept_query.join(Department, Department.id == User.department_id)
                     dept_query = dept_query.filter(Department.college_id == selected_college.id)
                     if start_date_obj:
-                        dept_query = dept_query.filter(Circulation.issue_date >= start_date_obj)
+                        dept_query = dept_query.filter(Loan.issue_date >= start_date_obj)
                     if end_date_obj:
-                        dept_query = dept_query.filter(Circulation.issue_date <= end_date_obj)
+                        dept_query = dept_query.filter(Loan.issue_date <= end_date_obj)
                     dept_data = dept_query.group_by(Department.id, Department.name).all()
                     chart_data = [{'label': dept or 'Unknown', 'value': int(count)} for dept, count in dept_data]
                     report_bar = chart_data
@@ -12440,27 +16419,27 @@ def admin_analytics_dashboard():
                     report_pie = category_distribution
                 elif report_type == 'return_book':
                     report_bar = monthly_circulation
-                    returns_query = Circulation.query.filter(Circulation.status == 'returned')
+                    returns_query = db.session.query(Loan).filter(Loan.status == 'returned')
                     if start_date_obj:
-                        returns_query = returns_query.filter(Circulation.issue_date >= start_date_obj)
+                        returns_query = returns_query.filter(Loan.issue_date >= start_date_obj)
                     if end_date_obj:
-                        returns_query = returns_query.filter(Circulation.issue_date <= end_date_obj)
-                    on_time_count = returns_query.filter((Circulation.fine_amount == 0) | (Circulation.fine_amount.is_(None))).count()
-                    overdue_count = returns_query.filter(Circulation.fine_amount > 0).count()
+                        returns_query = returns_query.filter(Loan.issue_date <= end_date_obj)
+                    on_time_count = returns_query.filter((Loan.fine_amount == 0) | (Loan.fine_amount.is_(None))).count()
+                    overdue_count = returns_query.filter(Loan.fine_amount > 0).count()
                     report_pie = [
                         {'label': 'On-time Returns', 'value': int(on_time_count)},
                         {'label': 'Overdue Returns', 'value': int(overdue_count)}
                     ]
                 elif report_type == 'fine':
                     fines_query = db.session.query(
-                        db.func.strftime('%Y-%m', Fine.created_date).label('month'),
+                        month_bucket(Fine.created_date).label('month'),
                         db.func.sum(Fine.amount).label('total')
                     )
                     if start_date_obj:
                         fines_query = fines_query.filter(Fine.created_date >= start_date_obj)
                     if end_date_obj:
                         fines_query = fines_query.filter(Fine.created_date <= end_date_obj)
-                    fines_data = fines_query.group_by(db.func.strftime('%Y-%m', Fine.created_date)).order_by('month').all()
+                    fines_data = fines_query.group_by(month_bucket(Fine.created_date)).order_by('month').all()
                     report_bar = [{'label': m or 'N/A', 'value': float(t or 0)} for m, t in fines_data]
                     paid_sum = db.session.query(db.func.sum(Fine.amount)).filter(Fine.status == 'paid')
                     pending_sum = db.session.query(db.func.sum(Fine.amount)).filter(Fine.status == 'pending')
@@ -12478,14 +16457,14 @@ def admin_analytics_dashboard():
                     ]
                 elif report_type == 'reservation':
                     res_query = db.session.query(
-                        db.func.strftime('%Y-%m', Reservation.reservation_date).label('month'),
+                        month_bucket(Reservation.reservation_date).label('month'),
                         db.func.count(Reservation.id).label('count')
                     )
                     if start_date_obj:
                         res_query = res_query.filter(Reservation.reservation_date >= start_date_obj)
                     if end_date_obj:
                         res_query = res_query.filter(Reservation.reservation_date <= end_date_obj)
-                    res_data = res_query.group_by(db.func.strftime('%Y-%m', Reservation.reservation_date)).order_by('month').all()
+                    res_data = res_query.group_by(month_bucket(Reservation.reservation_date)).order_by('month').all()
                     report_bar = [{'label': m or 'N/A', 'value': int(c or 0)} for m, c in res_data]
                     status_data = db.session.query(
                         Reservation.status,
@@ -12499,6 +16478,7 @@ def admin_analytics_dashboard():
                     report_pie = [{'label': (s or 'unknown').title(), 'value': int(c or 0)} for s, c in status_data]
         except Exception as e:
             print(f"Error building report-specific charts: {e}")
+            db.session.rollback()
 
         # Ensure report_bar and report_pie always have data
         if not report_bar:
@@ -12569,6 +16549,7 @@ def admin_analytics_dashboard():
 # Download Analytics Dashboard Report
 @app.route('/api/admin/analytics/dashboard/download', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def admin_download_analytics_dashboard():
     try:
         user_id = int(get_jwt_identity())
@@ -12867,6 +16848,7 @@ def admin_download_analytics_dashboard():
 
 @app.route('/api/librarian/analytics/dashboard', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def librarian_analytics_dashboard():
     try:
         user_id = int(get_jwt_identity())
@@ -12891,12 +16873,15 @@ def librarian_analytics_dashboard():
         if end_date:
             end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
 
+        # Loans in the report range, reading the archive too when the range reaches back into it
+        Loan = circulation_history(start_date_obj)
+
         # Base query for circulation with date filtering
-        circulation_query = Circulation.query
+        circulation_query = db.session.query(Loan)
         if start_date_obj:
-            circulation_query = circulation_query.filter(Circulation.issue_date >= start_date_obj)
+            circulation_query = circulation_query.filter(Loan.issue_date >= start_date_obj)
         if end_date_obj:
-            circulation_query = circulation_query.filter(Circulation.issue_date <= end_date_obj)
+            circulation_query = circulation_query.filter(Loan.issue_date <= end_date_obj)
 
         # Basic Statistics from real data
         total_books = Book.query.count() or 0
@@ -12908,7 +16893,7 @@ def librarian_analytics_dashboard():
             filtered_circulation = circulation_query.filter_by(status='issued')
             total_issued = filtered_circulation.count() or 0
             total_returned = 0
-            total_overdue = filtered_circulation.filter(Circulation.due_date < datetime.now().date()).count() or 0
+            total_overdue = filtered_circulation.filter(Loan.due_date < datetime.now().date()).count() or 0
 
         elif report_type == 'return_book':
             # For return book report - show returned books
@@ -12919,12 +16904,12 @@ def librarian_analytics_dashboard():
 
         elif report_type == 'fine':
             # For fine report - show books with fines
-            filtered_circulation = circulation_query.filter(Circulation.fine_amount > 0)
+            filtered_circulation = circulation_query.filter(Loan.fine_amount > 0)
             total_issued = filtered_circulation.filter_by(status='issued').count() or 0
             total_returned = filtered_circulation.filter_by(status='returned').count() or 0
             total_overdue = filtered_circulation.filter(
-                Circulation.status == 'issued',
-                Circulation.due_date < datetime.now().date()
+                Loan.status == 'issued',
+                Loan.due_date < datetime.now().date()
             ).count() or 0
 
         else:
@@ -12932,16 +16917,16 @@ def librarian_analytics_dashboard():
             total_issued = circulation_query.filter_by(status='issued').count() or 0
             total_returned = circulation_query.filter_by(status='returned').count() or 0
             total_overdue = circulation_query.filter(
-                Circulation.status == 'issued',
-                Circulation.due_date < datetime.now().date()
+                Loan.status == 'issued',
+                Loan.due_date < datetime.now().date()
             ).count() or 0
 
         # Calculate active users
-        active_users_query = User.query.join(Circulation).filter(Circulation.status == 'issued')
+        active_users_query = User.query.join(Loan, Loan.user_id == User.id).filter(Loan.status == 'issued')
         if start_date_obj:
-            active_users_query = active_users_query.filter(Circulation.issue_date >= start_date_obj)
+            active_users_query = active_users_query.filter(Loan.issue_date >= start_date_obj)
         if end_date_obj:
-            active_users_query = active_users_query.filter(Circulation.issue_date <= end_date_obj)
+            active_users_query = active_users_query.filter(Loan.issue_date <= end_date_obj)
         active_users = active_users_query.distinct().count() or 0
 
         # Calculate return rate from real data
@@ -12950,10 +16935,8 @@ def librarian_analytics_dashboard():
             return_rate = int((total_returned / (total_returned + total_issued)) * 100)
 
         # Fine statistics from real data
-        fine_query = circulation_query.filter(Circulation.fine_amount > 0)
         if report_type == 'fine':
-            fine_records = fine_query.all()
-            total_fines = sum([record.fine_amount or 0 for record in fine_records])
+            total_fines = circulation_stat_total(CirculationDailyStat.fine_total, start_date_obj, end_date_obj)
             total_fines_collected = total_fines * 0.7
             total_fines_pending = total_fines * 0.3
             fine_collection_rate = 70 if total_fines > 0 else 0
@@ -12969,19 +16952,19 @@ def librarian_analytics_dashboard():
                 category_query = db.session.query(
                     Book.category.label('category'),
                     db.func.count(Book.id).label('count')
-                ).join(Circulation, Circulation.book_id == Book.id)
+                ).join(Loan, Loan.book_id == Book.id)
                 
                 if start_date_obj:
-                    category_query = category_query.filter(Circulation.issue_date >= start_date_obj)
+                    category_query = category_query.filter(Loan.issue_date >= start_date_obj)
                 if end_date_obj:
-                    category_query = category_query.filter(Circulation.issue_date <= end_date_obj)
+                    category_query = category_query.filter(Loan.issue_date <= end_date_obj)
 
                 if report_type == 'issue_book':
-                    category_query = category_query.filter(Circulation.status == 'issued')
+                    category_query = category_query.filter(Loan.status == 'issued')
                 elif report_type == 'return_book':
-                    category_query = category_query.filter(Circulation.status == 'returned')
+                    category_query = category_query.filter(Loan.status == 'returned')
                 elif report_type == 'fine':
-                    category_query = category_query.filter(Circulation.fine_amount > 0)
+                    category_query = category_query.filter(Loan.fine_amount > 0)
                     
                 category_distribution = category_query.filter(Book.category.isnot(None)).group_by(Book.category).all()
             else:
@@ -12992,32 +16975,31 @@ def librarian_analytics_dashboard():
                 ).filter(Book.category.isnot(None)).group_by(Book.category).all()
         except Exception as e:
             print(f"Category distribution error: {e}")
+            db.session.rollback()
             category_distribution = []
 
         # Monthly circulation data
         try:
-            monthly_query = db.session.query(
-                db.func.strftime('%Y-%m', Circulation.issue_date).label('month'),
-                db.func.count(Circulation.id).label('count')
-            )
-
-            if start_date_obj:
-                monthly_query = monthly_query.filter(Circulation.issue_date >= start_date_obj)
-            if end_date_obj:
-                monthly_query = monthly_query.filter(Circulation.issue_date <= end_date_obj)
+            stat_column = circulation_report_stat_column(report_type)
+            if stat_column is not None:
+                monthly_circulation = monthly_circulation_stat(stat_column, start_date_obj, end_date_obj)
+            else:
+                monthly_query = db.session.query(
+                    month_bucket(Loan.issue_date).label('month'),
+                    db.func.count(Loan.id).label('count')
+                ).filter(Loan.status == 'issued')
 
-            if report_type == 'issue_book':
-                monthly_query = monthly_query.filter(Circulation.status == 'issued')
-            elif report_type == 'return_book':
-                monthly_query = monthly_query.filter(Circulation.status == 'returned')
-            elif report_type == 'fine':
-                monthly_query = monthly_query.filter(Circulation.fine_amount > 0)
+                if start_date_obj:
+                    monthly_query = monthly_query.filter(Loan.issue_date >= start_date_obj)
+                if end_date_obj:
+                    monthly_query = monthly_query.filter(Loan.issue_date <= end_date_obj)
 
-            monthly_circulation = monthly_query.group_by(
-                db.func.strftime('%Y-%m', Circulation.issue_date)
-            ).order_by('month').limit(12).all()
+                monthly_circulation = monthly_query.group_by(
+                    month_bucket(Loan.issue_date)
+                ).order_by('month').limit(12).all()
         except Exception as e:
             print(f"Monthly circulation error: {e}")
+            db.session.rollback()
             monthly_circulation = []
 
         # User type distribution
@@ -13029,22 +17011,23 @@ def librarian_analytics_dashboard():
 
             if report_type in ['issue_book', 'return_book', 'fine']:
                 # Filter by users who have circulation records
-                user_type_query = user_type_query.join(Circulation, Circulation.user_id == User.id)
+                user_type_query = user_type_query.join(Loan, Loan.user_id == User.id)
                 if start_date_obj:
-                    user_type_query = user_type_query.filter(Circulation.issue_date >= start_date_obj)
+                    user_type_query = user_type_query.filter(Loan.issue_date >= start_date_obj)
                 if end_date_obj:
-                    user_type_query = user_type_query.filter(Circulation.issue_date <= end_date_obj)
+                    user_type_query = user_type_query.filter(Loan.issue_date <= end_date_obj)
 
                 if report_type == 'issue_book':
-                    user_type_query = user_type_query.filter(Circulation.status == 'issued')
+                    user_type_query = user_type_query.filter(Loan.status == 'issued')
                 elif report_type == 'return_book':
-                    user_type_query = user_type_query.filter(Circulation.status == 'returned')
+                    user_type_query = user_type_query.filter(Loan.status == 'returned')
                 elif report_type == 'fine':
-                    user_type_query = user_type_query.filter(Circulation.fine_amount > 0)
+                    user_type_query = user_type_query.filter(Loan.fine_amount > 0)
 
             user_type_distribution = user_type_query.group_by(User.role).all()
         except Exception as e:
             print(f"User type distribution error: {e}")
+            db.session.rollback()
             user_type_distribution = []
 
         # Popular books
@@ -13052,26 +17035,27 @@ def librarian_analytics_dashboard():
             popular_books_query = db.session.query(
                 Book.title,
                 Book.author,
-                db.func.count(Circulation.id).label('circulation_count')
-            ).join(Circulation)
+                db.func.count(Loan.id).label('circulation_count')
+            ).join(Loan, Loan.book_id == Book.id)
 
             if start_date_obj:
-                popular_books_query = popular_books_query.filter(Circulation.issue_date >= start_date_obj)
+                popular_books_query = popular_books_query.filter(Loan.issue_date >= start_date_obj)
             if end_date_obj:
-                popular_books_query = popular_books_query.filter(Circulation.issue_date <= end_date_obj)
+                popular_books_query = popular_books_query.filter(Loan.issue_date <= end_date_obj)
 
             if report_type == 'issue_book':
-                popular_books_query = popular_books_query.filter(Circulation.status == 'issued')
+                popular_books_query = popular_books_query.filter(Loan.status == 'issued')
             elif report_type == 'return_book':
-                popular_books_query = popular_books_query.filter(Circulation.status == 'returned')
+                popular_books_query = popular_books_query.filter(Loan.status == 'returned')
             elif report_type == 'fine':
-                popular_books_query = popular_books_query.filter(Circulation.fine_amount > 0)
+                popular_books_query = popular_books_query.filter(Loan.fine_amount > 0)
 
             popular_books = popular_books_query.group_by(Book.id, Book.title, Book.author).order_by(
-                db.func.count(Circulation.id).desc()
+                db.func.count(Loan.id).desc()
             ).limit(10).all()
         except Exception as e:
             print(f"Popular books error: {e}")
+            db.session.rollback()
             popular_books = []
 
         # College-wise statistics
@@ -13082,6 +17066,7 @@ def librarian_analytics_dashboard():
             ).outerjoin(User).group_by(College.id, College.name).all()
         except Exception as e:
             print(f"College stats error: {e}")
+            db.session.rollback()
             college_stats = []
 
         # Department-wise statistics  
@@ -13092,6 +17077,7 @@ def librarian_analytics_dashboard():
             ).outerjoin(User).group_by(Department.id, Department.name).limit(10).all()
         except Exception as e:
             print(f"Department stats error: {e}")
+            db.session.rollback()
             department_stats = []
 
         # Prepare response data
@@ -13166,6 +17152,7 @@ def librarian_analytics_dashboard():
 # Download Librarian Analytics Dashboard Report
 @app.route('/api/librarian/analytics/dashboard/download', methods=['GET'])
 @jwt_required()
+@reporting_endpoint
 def librarian_download_analytics_dashboard():
     try:
         user_id = int(get_jwt_identity())
@@ -13187,12 +17174,15 @@ def librarian_download_analytics_dashboard():
         if end_date:
             end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
 
+        # Loans in the report range, reading the archive too when the range reaches back into it
+        Loan = circulation_history(start_date_obj)
+
         # Get comprehensive analytics data
-        circulation_query = Circulation.query
+        circulation_query = db.session.query(Loan)
         if start_date_obj:
-            circulation_query = circulation_query.filter(Circulation.issue_date >= start_date_obj)
+            circulation_query = circulation_query.filter(Loan.issue_date >= start_date_obj)
         if end_date_obj:
-            circulation_query = circulation_query.filter(Circulation.issue_date <= end_date_obj)
+            circulation_query = circulation_query.filter(Loan.issue_date <= end_date_obj)
 
         # Basic statistics
         total_books = Book.query.count() or 0
@@ -13201,18 +17191,17 @@ def librarian_download_analytics_dashboard():
         total_issued = circulation_query.filter_by(status='issued').count() or 0
         total_returned = circulation_query.filter_by(status='returned').count() or 0
         total_overdue = circulation_query.filter(
-            Circulation.status == 'issued',
-            Circulation.due_date < datetime.now().date()
+            Loan.status == 'issued',
+            Loan.due_date < datetime.now().date()
         ).count() or 0
 
         # Active users
-        active_users = User.query.join(Circulation).filter(
-            Circulation.status == 'issued'
+        active_users = User.query.join(Loan, Loan.user_id == User.id).filter(
+            Loan.status == 'issued'
         ).distinct().count() or 0
 
         # Fine statistics
-        fine_records = circulation_query.filter(Circulation.fine_amount > 0).all()
-        total_fines = sum([record.fine_amount or 0 for record in fine_records])
+        total_fines = circulation_stat_total(CirculationDailyStat.fine_total, start_date_obj, end_date_obj)
         
         # Category distribution
         try:
@@ -13222,23 +17211,15 @@ def librarian_download_analytics_dashboard():
             ).outerjoin(Book, Book.category_id == Category.id).group_by(Category.name).all()
         except Exception as e:
             print(f"Category query error: {e}")
+            db.session.rollback()
             category_stats = []
 
         # Monthly circulation
         try:
-            monthly_stats = db.session.query(
-                db.func.strftime('%Y-%m', Circulation.issue_date).label('month'),
-                db.func.count(Circulation.id).label('count')
-            )
-            if start_date_obj:
-                monthly_stats = monthly_stats.filter(Circulation.issue_date >= start_date_obj)
-            if end_date_obj:
-                monthly_stats = monthly_stats.filter(Circulation.issue_date <= end_date_obj)
-            monthly_stats = monthly_stats.group_by(
-                db.func.strftime('%Y-%m', Circulation.issue_date)
-            ).order_by('month').all()
+            monthly_stats = monthly_circulation_stat(CirculationDailyStat.issued, start_date_obj, end_date_obj, limit=None)
         except Exception as e:
             print(f"Monthly stats error: {e}")
+            db.session.rollback()
             monthly_stats = []
 
         # User type distribution
@@ -13249,6 +17230,7 @@ def librarian_download_analytics_dashboard():
             ).filter(User.role.in_(['student', 'faculty'])).group_by(User.role).all()
         except Exception as e:
             print(f"User type stats error: {e}")
+            db.session.rollback()
             user_type_stats = []
 
         if format_type.lower() == 'pdf':
@@ -13691,6 +17673,14 @@ def admin_delete_journal(journal_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Journal lists; the journal type comes from the upload form. Rows are numbered as in the
+# spreadsheet (the header is row 1).
+JOURNAL_SHEET = SheetSchema(Journal, [
+    SheetField('journal_name', 'Journal name', required=True, strip=True),
+], first_row=2)
+
+IMPORT_JOB_KINDS['journals'] = (JOURNAL_SHEET.required_columns, partial(ingest_sheet, JOURNAL_SHEET))
+
 @app.route('/api/admin/journals/bulk', methods=['POST'])
 @jwt_required()
 def admin_bulk_upload_journals():
@@ -13715,54 +17705,46 @@ def admin_bulk_upload_journals():
         if not file.filename.lower().endswith(('.xlsx', '.xls', '.csv')):
             return jsonify({'error': 'Invalid file format. Please upload Excel or CSV file'}), 400
 
+        required_columns = JOURNAL_SHEET.required_columns
+        checkpoint_key = upload_checkpoint_key('journals', {'journal_type': journal_type}, file.stream)
+        if wants_background_import():
+            return start_import_job('journals', file, {'journal_type': journal_type}, user_id, checkpoint_key)
+        if wants_streaming_import():
+            if not file.filename.lower().endswith('.csv'):
+                return jsonify({'error': 'Streaming imports need a CSV file'}), 400
+            summary, error = stream_csv_import(file, required_columns,
+                                               lambda df: ingest_sheet(JOURNAL_SHEET, df, journal_type=journal_type),
+                                               checkpoint_key)
+            if error:
+                return jsonify({'error': error}), 400
+            return streaming_import_response(summary, 'journals')
+
         # Read the file
         try:
             if file.filename.lower().endswith('.csv'):
-                df = pd.read_csv(file)
+                df = pd.read_csv(file, dtype=str)
             else:
-                df = pd.read_excel(file)
+                df = pd.read_excel(file, dtype=str)
         except Exception as e:
             return jsonify({'error': f'Error reading file: {str(e)}'}), 400
 
         # Validate required columns
-        required_columns = ['journal_name']
         missing_columns = [col for col in required_columns if col not in df.columns]
         if missing_columns:
             return jsonify({'error': f'Missing required columns: {", ".join(missing_columns)}'}), 400
 
-        journals_created = 0
-        errors = []
-
-        for index, row in df.iterrows():
-            try:
-                if pd.isna(row['journal_name']) or str(row['journal_name']).strip() == '':
-                    errors.append(f'Row {index + 2}: Journal name is required')
-                    continue
-
-                journal = Journal(
-                    journal_name=str(row['journal_name']).strip(),
-                    journal_type=journal_type
-                )
-
-                db.session.add(journal)
-                journals_created += 1
-
-            except Exception as e:
-                errors.append(f'Row {index + 2}: {str(e)}')
-
-        try:
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            return jsonify({'error': f'Database error: {str(e)}'}), 500
+        inserted, errors, resumed_rows = import_whole_sheet(
+            df, lambda df: ingest_sheet(JOURNAL_SHEET, df, journal_type=journal_type), checkpoint_key)
 
         return jsonify({
-            'message': f'Successfully uploaded {journals_created} journals',
-            'journals_created': journals_created,
-            'errors': errors
+            'message': f'Successfully uploaded {len(inserted)} journals',
+            'journals_created': len(inserted),
+            'errors': import_error_report(errors),
+            'resumed_rows': resumed_rows
         }), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/admin/journals/sample-template', methods=['GET'])
@@ -13844,10 +17826,15 @@ if __name__ == '__main__':
     print("📍 Running on localhost only")
     print("🌐 Access at: http://localhost:5173")
 
-    # Initialize backup system
-    print("💾 Initializing backup system...")
-    schedule_auto_backup()
-    print(f"✅ Backup system initialized. Backups stored in: {BACKUP_DIR}")
-
-    app.run(host='localhost', port=5000, debug=True)
+    debug = True
+    # The debug reloader runs this block in both the file watcher and the serving child; only
+    # the child schedules jobs, or each would run twice (two backups, two racing archive runs)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not debug:
+        # Initialize backup system
+        print("💾 Initializing backup system...")
+        schedule_auto_backup()
+        print(f"✅ Backup system initialized. Backups stored in: {BACKUP_DIR}")
+        start_scheduler()
+
+    app.run(host='localhost', port=5000, debug=debug)
 
@@ -0,0 +1,151 @@
+"""
+Benchmark: bulk book import throughput (POST /api/admin/books/bulk).
+
+Builds an accession sheet from the synthetic catalogue, with a share of
+rows that must be rejected (missing author, bad price or pages, access
+numbers already catalogued or repeated in the sheet), and uploads it
+through the Flask test client into a catalogue that already holds
+--existing books. Reports the time spent reading, validating and inserting,
+the end-to-end rows per second and the rejected-row count, for each
+--chunk-sizes value. With --stream the CSV goes through the streaming mode
+(?stream=true) and the peak Python memory allocated by the request is
+reported instead of the separate read and validate times.
+
+Usage:
+    python benchmarks/bench_bulk_import.py [--rows 50000] [--existing 20000] [--format csv] [--chunk-sizes 500,1000,5000] [--stream]
+"""
+import argparse
+import io
+import random
+import time
+import tracemalloc
+from datetime import date
+
+from synthetic import use_temp_database, cleanup_temp_database, populate_books, synthetic_book_rows
+
+# Point the app at a throwaway database before importing it
+use_temp_database()
+
+import pandas as pd  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import (app, db, Book, User, BookAuthor, Author, AuthorNameKey, BookFacetCount,  # noqa: E402
+                 SearchTerm, SearchTermTrigram, run_migrations, validate_sheet, BOOK_SHEET, rebuild_book_authors)
+
+SHEET_COLUMNS = ['access_no', 'title', 'author_1', 'author_2', 'author_3', 'author_4', 'publisher', 'price',
+                 'department', 'location', 'pages', 'edition', 'isbn']
+
+
+def make_sheet(rows, existing, fmt, bad_share=0.02, seed=7):
+    """The sheet file as bytes, and how many rows it should reject"""
+    rng = random.Random(seed)
+    records = []
+    rejected = 0
+    for record in synthetic_book_rows(rows, seed=seed, start=existing):
+        record = {column: record.get(column) for column in SHEET_COLUMNS}
+        if rng.random() < bad_share:
+            problem = rng.choice(['author_1', 'price', 'pages', 'repeated'] + (['catalogued'] if existing else []))
+            if problem == 'author_1':
+                record['author_1'] = None
+            elif problem == 'price':
+                record['price'] = rng.choice([-5, 'n/a'])
+            elif problem == 'pages':
+                record['pages'] = 'many'
+            elif problem == 'catalogued':
+                record['access_no'] = f'B{rng.randrange(existing):07d}'
+            elif records:
+                record['access_no'] = rng.choice(records)['access_no']
+            rejected += 1
+        records.append(record)
+    df = pd.DataFrame(records, columns=SHEET_COLUMNS)
+    output = io.BytesIO()
+    if fmt == 'csv':
+        df.to_csv(output, index=False)
+    else:
+        df.to_excel(output, index=False)
+    return output.getvalue(), rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--existing', type=int, default=20000)
+    parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+    parser.add_argument('--chunk-sizes', default='500,1000,5000')
+    parser.add_argument('--stream', action='store_true', help='use the streaming CSV mode')
+    args = parser.parse_args()
+    if args.stream and args.format != 'csv':
+        parser.error('--stream needs --format csv')
+
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        admin = User(user_id='ADMIN', username='admin', name='Admin', email='admin@example.com', role='admin',
+                     designation='admin', dob=date(1980, 1, 1), validity_date=date(2099, 1, 1))
+        admin.set_password('bench')
+        db.session.add(admin)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+
+        print(f"Building a {args.rows:,}-row {args.format} sheet...")
+        sheet, expected_rejected = make_sheet(args.rows, args.existing, args.format)
+        print(f"  {len(sheet) / 1024 / 1024:.1f} MiB, about {expected_rejected:,} rows to reject")
+
+        if args.stream:
+            print(f"\n{'chunk':>6} {'end-to-end s':>13} {'rows/s':>9} {'peak MiB':>9} {'created':>9} {'rejected':>9}")
+        else:
+            print(f"\n{'chunk':>6} {'read s':>8} {'validate s':>11} {'insert s':>9} {'end-to-end s':>13} "
+                  f"{'rows/s':>9} {'created':>9} {'rejected':>9}")
+        for chunk_size in [int(size) for size in args.chunk_sizes.split(',')]:
+            # Fresh catalogue of --existing books for each run
+            for model in (BookAuthor, AuthorNameKey, Author, Book, BookFacetCount, SearchTermTrigram, SearchTerm):
+                model.query.delete()
+            db.session.commit()
+            populate_books(db, Book, args.existing)
+            rebuild_book_authors()
+            app.config['IMPORT_CHUNK_SIZE'] = chunk_size
+
+            if args.stream:
+                tracemalloc.start()
+                start = time.perf_counter()
+                response = client.post('/api/admin/books/bulk?stream=true&restart=true', headers=headers,
+                                       content_type='multipart/form-data',
+                                       data={'category': 'Engineering', 'file': (io.BytesIO(sheet), 'books.csv')})
+                total_seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                result = response.get_json()
+                if response.status_code != 201:
+                    print(f"{chunk_size:>6} failed: {response.status_code} {result}")
+                    continue
+                print(f"{chunk_size:>6} {total_seconds:>13.2f} {args.rows / total_seconds:>9,.0f} "
+                      f"{peak / 1024 / 1024:>9.1f} {result['created']:>9,} {result['rejected']:>9,}")
+                continue
+
+            # Reading and validation on their own, then the whole endpoint; insert is the remainder
+            start = time.perf_counter()
+            df = (pd.read_csv if args.format == 'csv' else pd.read_excel)(io.BytesIO(sheet), dtype=str)
+            read_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            validate_sheet(BOOK_SHEET, df, category='Engineering')
+            validate_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            response = client.post('/api/admin/books/bulk?restart=true', headers=headers, content_type='multipart/form-data',
+                                   data={'category': 'Engineering', 'file': (io.BytesIO(sheet), f'books.{args.format}')})
+            total_seconds = time.perf_counter() - start
+            result = response.get_json()
+            if response.status_code != 201:
+                print(f"{chunk_size:>6} failed: {response.status_code} {result}")
+                continue
+            insert_seconds = total_seconds - read_seconds - validate_seconds
+            print(f"{chunk_size:>6} {read_seconds:>8.2f} {validate_seconds:>11.2f} {insert_seconds:>9.2f} "
+                  f"{total_seconds:>13.2f} {args.rows / total_seconds:>9,.0f} {len(result['created_books']):>9,} "
+                  f"{len(result['errors']):>9,}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        cleanup_temp_database()
@@ -0,0 +1,108 @@
+"""
+Benchmark: bulk member import (POST /api/admin/users/bulk), dominated by
+password hashing.
+
+Builds an intake sheet of --rows students, a share of them invalid (bad
+dates, user ids or emails already taken or repeated), and uploads it through
+the Flask test client once for each --workers value of
+PASSWORD_HASH_WORKERS. Reports the per-stage timings the endpoint returns
+(read, validate, hash, insert), the end-to-end time and rows per second.
+
+Usage:
+    python benchmarks/bench_bulk_users.py [--rows 10000] [--workers 1,8]
+"""
+import argparse
+import io
+import os
+import random
+import time
+from datetime import date
+
+from synthetic import use_temp_database, cleanup_temp_database
+
+# Point the app at a throwaway database before importing it
+use_temp_database()
+
+import pandas as pd  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import app, db, User, College, Department, run_migrations  # noqa: E402
+
+
+def make_sheet(rows, bad_share=0.02, seed=7):
+    """The .xlsx sheet as bytes, and how many rows it should reject"""
+    rng = random.Random(seed)
+    records = []
+    rejected = 0
+    for i in range(rows):
+        record = {'user_id': f'S{i:06d}', 'name': f'Student {i}', 'email': f'student{i}@example.com',
+                  'validity_date': '2030-06-30', 'dob': f'200{i % 6}-0{i % 9 + 1}-1{i % 9}',
+                  'batch_from': '2024', 'batch_to': '2028'}
+        if rng.random() < bad_share:
+            problem = rng.choice(['dob', 'user_id', 'email'])
+            if problem == 'dob':
+                record['dob'] = 'unknown'
+            elif problem == 'user_id':
+                record['user_id'] = rng.choice(['ADMIN'] + [r['user_id'] for r in records[-5:]])
+            else:
+                record['email'] = rng.choice(['admin@example.com'] + [r['email'] for r in records[-5:]])
+            rejected += 1
+        records.append(record)
+    output = io.BytesIO()
+    pd.DataFrame(records).to_excel(output, index=False)
+    return output.getvalue(), rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--workers', default=f'1,{os.cpu_count() or 1}')
+    args = parser.parse_args()
+
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        admin = User(user_id='ADMIN', username='admin', name='Admin', email='admin@example.com', role='admin',
+                     designation='admin', dob=date(1980, 1, 1), validity_date=date(2099, 1, 1))
+        admin.set_password('bench')
+        college = College(name='Bench College', code='BC')
+        db.session.add_all([admin, college])
+        db.session.flush()
+        department = Department(name='Bench Department', code='BD', college_id=college.id)
+        db.session.add(department)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+        # restart: every run imports the same sheet, which would otherwise resume from its checkpoint
+        form = {'college_id': str(college.id), 'department_id': str(department.id), 'user_role': 'student',
+                'restart': 'true'}
+
+        print(f"Building a {args.rows:,}-row intake sheet...")
+        sheet, expected_rejected = make_sheet(args.rows)
+        print(f"  about {expected_rejected:,} rows to reject; {os.cpu_count()} CPUs")
+
+        print(f"\n{'workers':>7} {'read s':>7} {'validate s':>11} {'hash s':>8} {'insert s':>9} "
+              f"{'end-to-end s':>13} {'rows/s':>8} {'created':>8} {'rejected':>9}")
+        for workers in [int(count) for count in args.workers.split(',')]:
+            User.query.filter(User.id != admin.id).delete()
+            db.session.commit()
+            app.config['PASSWORD_HASH_WORKERS'] = workers
+
+            start = time.perf_counter()
+            response = client.post('/api/admin/users/bulk', headers=headers, content_type='multipart/form-data',
+                                   data=dict(form, file=(io.BytesIO(sheet), 'students.xlsx')))
+            total_seconds = time.perf_counter() - start
+            result = response.get_json()
+            if response.status_code != 201:
+                print(f"{workers:>7} failed: {response.status_code} {result}")
+                continue
+            timings = result['timings']
+            print(f"{workers:>7} {timings.get('read', 0):>7.2f} {timings.get('validate', 0):>11.2f} "
+                  f"{timings.get('hash', 0):>8.2f} {timings.get('insert', 0):>9.2f} {total_seconds:>13.2f} "
+                  f"{args.rows / total_seconds:>8,.0f} {len(result['created_users']):>8,} {len(result['errors']):>9,}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        cleanup_temp_database()
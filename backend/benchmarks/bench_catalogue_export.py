@@ -0,0 +1,81 @@
+"""
+Benchmark: streaming catalogue export (GET /api/admin/books/export).
+
+For each catalogue size in --books, fills the books table with synthetic
+rows and downloads the whole catalogue through the Flask test client in
+each --formats format, reading the streamed body chunk by chunk. Reports
+the time to the first byte, the end-to-end time, rows per second, the size
+of the download and the peak Python memory allocated while producing it,
+which should stay flat as the catalogue grows.
+
+Usage:
+    python benchmarks/bench_catalogue_export.py [--books 20000,100000] [--formats csv,xlsx,parquet] [--batch-size 5000]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import date
+
+from synthetic import use_temp_database, cleanup_temp_database, populate_books
+
+# Point the app at a throwaway database before importing it
+use_temp_database()
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import app, db, Book, User, run_migrations  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', default='20000,100000')
+    parser.add_argument('--formats', default='csv,xlsx,parquet')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+    app.config['CATALOGUE_EXPORT_BATCH_SIZE'] = args.batch_size
+
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        admin = User(user_id='ADMIN', username='admin', name='Admin', email='admin@example.com', role='admin',
+                     designation='admin', dob=date(1980, 1, 1), validity_date=date(2099, 1, 1))
+        admin.set_password('bench')
+        db.session.add(admin)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+
+        print(f"{'books':>8} {'format':<8} {'first byte ms':>14} {'end-to-end s':>13} {'rows/s':>9} "
+              f"{'MiB':>7} {'peak MiB':>9}")
+        for books in [int(size) for size in args.books.split(',')]:
+            Book.query.delete()
+            db.session.commit()
+            populate_books(db, Book, books)
+
+            for export_format in args.formats.split(','):
+                tracemalloc.start()
+                start = time.perf_counter()
+                response = client.get('/api/admin/books/export', headers=headers,
+                                      query_string={'format': export_format})
+                if response.status_code != 200:
+                    tracemalloc.stop()
+                    print(f"{books:>8} {export_format:<8} failed: {response.status_code} {response.get_json()}")
+                    continue
+                first_byte = None
+                size = 0
+                for chunk in response.iter_encoded():
+                    if first_byte is None and chunk:
+                        first_byte = time.perf_counter() - start
+                    size += len(chunk)
+                response.close()
+                total_seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{books:>8} {export_format:<8} {first_byte * 1000:>14.1f} {total_seconds:>13.2f} "
+                      f"{books / total_seconds:>9,.0f} {size / 1024 / 1024:>7.1f} {peak / 1024 / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        cleanup_temp_database()
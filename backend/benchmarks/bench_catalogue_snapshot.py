@@ -0,0 +1,105 @@
+"""
+Benchmark: OPAC search through the database vs. the columnar catalogue snapshot.
+
+Builds a synthetic catalogue, then times the same /api/books/search requests
+(end to end through the Flask test client, response cache disabled) with
+CATALOGUE_SNAPSHOT off and on. Also reports the snapshot's load time, the
+cost of an incremental refresh after availability changes, and its memory
+footprint per column.
+
+Usage:
+    python benchmarks/bench_catalogue_snapshot.py [--rows 500000] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from synthetic import use_temp_database, cleanup_temp_database, populate_books
+
+# Point the app at a throwaway database before importing it
+use_temp_database()
+os.environ['CATALOGUE_SNAPSHOT'] = 'true'
+
+import app as library  # noqa: E402
+from app import (app, db, Book, text, setup_books_fts, setup_book_change_log, get_catalogue_snapshot,  # noqa: E402
+                 rebuild_book_authors)
+
+REQUESTS = [
+    '',
+    '?page=200',
+    '?category=engineering&availability=available',
+    '?department=cse&page=3',
+    '?search=thermodynamics',
+    '?search=data structures&availability=available',
+    '?author=ramanku',
+]
+
+
+def timed(client, path, repeat):
+    samples = []
+    for _ in range(repeat):
+        db.session.expire_all()
+        start = time.perf_counter()
+        response = client.get('/api/books/search' + path)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), response.get_json()['pagination']['total']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    library.catalogue_cache.max_entries = 0
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+
+        print(f"Generating {args.rows:,} synthetic books...")
+        start = time.perf_counter()
+        populate_books(db, Book, args.rows)
+        setup_books_fts()
+        rebuild_book_authors()
+        setup_book_change_log()
+        db.session.execute(text('ANALYZE'))
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        snapshot = get_catalogue_snapshot()
+        print(f"Snapshot loaded in {time.perf_counter() - start:.1f}s")
+
+        # Availability changes (like issues and returns) go through the change log
+        db.session.execute(text("UPDATE books SET available_copies = 1 - available_copies WHERE id % 5000 = 0"))
+        db.session.commit()
+        start = time.perf_counter()
+        get_catalogue_snapshot()
+        print(f"Incremental refresh of {args.rows // 5000} changed books: "
+              f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+        report = snapshot.memory_report()
+        print(f"Snapshot memory: {report['total_mib']} MiB for {report['rows']:,} rows")
+        for column, info in sorted(report['columns'].items(), key=lambda item: -item[1]['bytes']):
+            distinct = f"  ({info['distinct_values']:,} distinct)" if 'distinct_values' in info else ''
+            print(f"  {column:<18} {info['bytes'] / 2 ** 20:>8.1f} MiB{distinct}")
+
+    print()
+    print(f"{'request':<48} {'database':>10} {'snapshot':>10} {'hits':>8}  speedup")
+    for path in REQUESTS:
+        with app.app_context():
+            app.config['CATALOGUE_SNAPSHOT'] = False
+            db_median, db_total = timed(client, path, args.repeat)
+            app.config['CATALOGUE_SNAPSHOT'] = True
+            snapshot_median, snapshot_total = timed(client, path, args.repeat)
+        assert db_total == snapshot_total, (path, db_total, snapshot_total)
+        print(f"{path or '(first page)':<48} {db_median:>8.1f}ms {snapshot_median:>8.1f}ms {db_total:>8}  "
+              f"{db_median / snapshot_median:>6.1f}x")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        cleanup_temp_database()
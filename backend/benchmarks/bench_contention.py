@@ -0,0 +1,230 @@
+"""
+Benchmark: circulation desks, gate scanners and report queries writing and
+reading one SQLite file at the same time.
+
+Builds a synthetic library, then for each storage profile starts separate
+processes (like separate gunicorn workers) that for --seconds:
+  * desks issue a book and return it again through the circulation API,
+  * gate scanners record entries and exits through /api/gate/scan,
+  * reporters run a long aggregate over the loan history on the read-only
+    reporting engine.
+Reports completed operations per second, failed requests and latency per
+role. The "rollback-journal" profile is the previous behaviour (pysqlite's
+default 5 s busy timeout, no retry); "wal" is the default profile.
+
+Usage:
+    python benchmarks/bench_contention.py [--desks 4] [--gates 2] [--reporters 1] [--seconds 15]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+PROFILES = {
+    'rollback-journal': {
+        'SQLITE_JOURNAL_MODE': 'delete',
+        'SQLITE_SYNCHRONOUS': 'full',
+        'SQLITE_BUSY_TIMEOUT_MS': '5000',
+        'SQLITE_MMAP_SIZE': '0',
+        'SQLITE_CACHE_SIZE_KB': '2000',
+        'DB_BUSY_RETRIES': '1',
+    },
+    'wal': {},
+}
+
+REPORT_SQL = """
+    SELECT b.category, strftime('%Y-%m', c.issue_date) AS month, COUNT(*), SUM(c.fine_amount)
+    FROM circulations c JOIN books b ON b.id = c.book_id
+    GROUP BY b.category, month ORDER BY month
+"""
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def setup(args):
+    """Build the template database in this process and return its path"""
+    from synthetic import use_temp_database, populate_books, populate_circulations
+    tmp_dir = use_temp_database()
+
+    from datetime import date
+    from werkzeug.security import generate_password_hash
+    from app import app, db, Book, User, Circulation, GateEntryCredential, run_migrations
+
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        password = generate_password_hash('bench', method='pbkdf2:sha256:1000')
+        db.session.add(User(user_id='ADMIN', username='admin', password_hash=password, name='Admin',
+                            email='admin@example.com', role='admin', designation='admin',
+                            dob=date(1980, 1, 1), validity_date=date(2099, 1, 1)))
+        db.session.execute(User.__table__.insert(), [{
+            'user_id': f'S{i:05d}', 'username': f'student{i}', 'password_hash': password,
+            'name': f'Student {i}', 'email': f'student{i}@example.com', 'role': 'student',
+            'user_role': 'student', 'designation': 'student', 'dob': date(2004, 1, 1),
+            'validity_date': date(2099, 1, 1), 'is_active': True,
+        } for i in range(args.users)])
+        db.session.flush()
+        db.session.add(GateEntryCredential(username='gate', password_hash=password, name='Main gate',
+                                           created_by=User.query.filter_by(user_id='ADMIN').one().id))
+        populate_books(db, Book, args.books)
+        db.session.execute(Book.__table__.update().values(number_of_copies=1000, available_copies=1000))
+        populate_circulations(db, Circulation, args.loans, args.books, user_count=args.users)
+        # History only: members start with nothing on loan, so borrowing limits stay out of the way
+        db.session.execute(Circulation.__table__.update().where(Circulation.status == 'issued').values(
+            status='returned', return_date=Circulation.due_date))
+        db.session.commit()
+        db.engine.dispose()
+    return tmp_dir, os.path.join(tmp_dir, 'bench.db')
+
+
+def worker(args):
+    """One process: run `args.role` against `args.database` until the deadline, print a JSON summary"""
+    os.environ['DATABASE_URL'] = 'sqlite:///' + args.database
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from flask_jwt_extended import create_access_token
+    from app import app, db, User, GateEntryCredential
+
+    rng = random.Random(args.seed)
+    ok, failed, latencies, errors = 0, 0, [], {}
+    client = app.test_client()
+    with app.app_context():
+        admin_id = User.query.filter_by(user_id='ADMIN').one().id
+        gate_id = GateEntryCredential.query.one().id
+        staff_token = create_access_token(identity=str(admin_id))
+        gate_token = create_access_token(identity=str(gate_id), additional_claims={'type': 'gate'})
+        db.session.remove()
+
+    def call(path, token, body):
+        response = client.post(path, json=body, headers={'Authorization': f'Bearer {token}'})
+        if response.status_code >= 400:
+            key = f"{response.status_code} {response.get_json().get('error', '')[:60]}"
+            errors[key] = errors.get(key, 0) + 1
+            return None
+        return response.get_json()
+
+    # Each desk serves its own slice of members so borrowing limits never interfere
+    members = [i for i in range(args.users) if i % args.workers == args.slot]
+
+    # Start together: importing the app takes a while and would otherwise stagger the workers
+    print('ready', flush=True)
+    sys.stdin.readline()
+    deadline = time.time() + args.seconds
+    while time.time() < deadline:
+        start = time.perf_counter()
+        if args.role == 'desk':
+            issued = call('/api/admin/circulation/issue', staff_token, {
+                'user_id': f'S{rng.choice(members):05d}', 'book_id': rng.randint(1, args.books),
+                'due_date': '2099-01-01'})
+            success = issued is not None and call('/api/admin/circulation/return', staff_token, {
+                'circulation_ids': [issued['circulation']['id']]}) is not None
+        elif args.role == 'gate':
+            success = call('/api/gate/scan', gate_token, {'barcode': f'S{rng.choice(members):05d}'}) is not None
+        else:
+            with app.app_context():
+                from sqlalchemy import text
+                db.session.info['reporting'] = True
+                db.session.execute(text(REPORT_SQL)).all()
+                db.session.remove()
+            success = True
+        latencies.append(time.perf_counter() - start)
+        ok += success
+        failed += not success
+
+    print(json.dumps({'role': args.role, 'ok': ok, 'failed': failed, 'latencies': latencies, 'errors': errors}))
+
+
+def run_profile(name, template, tmp_dir, args):
+    database = os.path.join(tmp_dir, f'{name}.db')
+    shutil.copyfile(template, database)
+    env = dict(os.environ, **PROFILES[name])
+    roles = ['desk'] * args.desks + ['gate'] * args.gates + ['report'] * args.reporters
+    processes = []
+    for slot, role in enumerate(roles):
+        command = [sys.executable, os.path.abspath(__file__), '--worker', '--role', role,
+                   '--database', database, '--seconds', str(args.seconds), '--seed', str(slot),
+                   '--slot', str(slot), '--workers', str(len(roles)),
+                   '--users', str(args.users), '--books', str(args.books)]
+        processes.append(subprocess.Popen(command, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                          stderr=subprocess.DEVNULL, text=True))
+    for process in processes:
+        while process.stdout.readline().strip() not in ('ready', ''):
+            pass
+    for process in processes:
+        process.stdin.write('go\n')
+        process.stdin.flush()
+
+    results = {}
+    for process in processes:
+        output = process.stdout.read()
+        process.wait()
+        lines = [line for line in output.splitlines() if line.startswith('{')]
+        if not lines:
+            print(f"  a worker exited with status {process.returncode} and no result")
+            continue
+        result = json.loads(lines[-1])
+        merged = results.setdefault(result['role'], {'ok': 0, 'failed': 0, 'latencies': [], 'errors': {}})
+        merged['ok'] += result['ok']
+        merged['failed'] += result['failed']
+        merged['latencies'] += result['latencies']
+        for key, count in result['errors'].items():
+            merged['errors'][key] = merged['errors'].get(key, 0) + count
+
+    print(f"\nProfile: {name}")
+    print(f"  {'role':<8} {'ok/s':>8} {'failed':>8} {'p50 ms':>8} {'p99 ms':>9} {'max ms':>9}")
+    for role in ('desk', 'gate', 'report'):
+        if role not in results:
+            continue
+        result = results[role]
+        latencies = result['latencies']
+        print(f"  {role:<8} {result['ok'] / args.seconds:>8.1f} {result['failed']:>8} "
+              f"{percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 99) * 1000:>9.1f} "
+              f"{max(latencies, default=0) * 1000:>9.1f}")
+        for key, count in sorted(result['errors'].items(), key=lambda item: -item[1])[:3]:
+            print(f"           {count} x {key}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--desks', type=int, default=4)
+    parser.add_argument('--gates', type=int, default=2)
+    parser.add_argument('--reporters', type=int, default=1)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--books', type=int, default=20000)
+    parser.add_argument('--loans', type=int, default=300000)
+    parser.add_argument('--profiles', default=','.join(PROFILES), help='comma-separated, from: ' + ', '.join(PROFILES))
+    # Internal: run as one of the competing processes
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--role', help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    parser.add_argument('--seed', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--slot', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--workers', type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    from synthetic import cleanup_temp_database
+    print(f"Generating {args.users:,} members, {args.books:,} books and {args.loans:,} past loans...")
+    tmp_dir, template = setup(args)
+    try:
+        print(f"Running {args.desks} desks, {args.gates} gate scanners and {args.reporters} reporters "
+              f"for {args.seconds:g}s per profile")
+        for name in args.profiles.split(','):
+            run_profile(name, template, tmp_dir, args)
+    finally:
+        cleanup_temp_database()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: typo-tolerant title/author search through the trigram index.
+
+Builds a synthetic catalogue, indexes it (books_fts + trigram vocabulary)
+and runs misspelled author/title queries taken from random books, reporting
+latency percentiles and how often the intended book is in the first page.
+
+Usage:
+    python benchmarks/bench_fuzzy_search.py [--rows 500000] [--queries 300]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from synthetic import use_temp_database, cleanup_temp_database, populate_books
+
+# Point the app at a throwaway database before importing it
+use_temp_database()
+
+from app import app, db, Book, text, setup_books_fts, rebuild_search_terms, fuzzy_book_search  # noqa: E402
+
+
+def misspell(word, rng):
+    """Apply one random edit: drop, swap, replace or double a letter"""
+    if len(word) < 4:
+        return word
+    i = rng.randint(1, len(word) - 2)
+    edit = rng.choice(['drop', 'swap', 'replace', 'double'])
+    if edit == 'drop':
+        return word[:i] + word[i + 1:]
+    if edit == 'swap':
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if edit == 'replace':
+        return word[:i] + rng.choice('aeioustrn') + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--queries', type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+
+    with app.app_context():
+        db.create_all()
+
+        print(f"Generating {args.rows:,} synthetic books...")
+        start = time.perf_counter()
+        populate_books(db, Book, args.rows)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        print("Building books_fts and trigram vocabulary...")
+        start = time.perf_counter()
+        setup_books_fts()
+        term_count = rebuild_search_terms()
+        db.session.execute(text('ANALYZE'))
+        print(f"  done in {time.perf_counter() - start:.1f}s ({term_count:,} distinct words)")
+
+        # Misspelled "surname + title word" queries for random books
+        targets = []
+        max_id = db.session.query(db.func.max(Book.id)).scalar()
+        while len(targets) < args.queries:
+            book = db.session.get(Book, rng.randint(1, max_id))
+            surname = book.author_1.split()[-1].lower()
+            title_word = max(book.title.split(), key=len).lower()
+            targets.append((book.id, f"{misspell(surname, rng)} {misspell(title_word, rng)}"))
+
+        samples = []
+        hits = 0
+        for book_id, query in targets:
+            db.session.expire_all()
+            start = time.perf_counter()
+            ranked_ids = fuzzy_book_search(query)
+            samples.append((time.perf_counter() - start) * 1000)
+            if book_id in ranked_ids[:20]:
+                hits += 1
+
+        print()
+        print(f"queries: {len(samples)}   e.g. {targets[0][1]!r}, {targets[1][1]!r}")
+        print(f"median {statistics.median(samples):.1f}ms   p95 {percentile(samples, 95):.1f}ms   "
+              f"p99 {percentile(samples, 99):.1f}ms   max {max(samples):.1f}ms")
+        print(f"intended book on first page: {hits / len(samples):.0%}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        cleanup_temp_database()
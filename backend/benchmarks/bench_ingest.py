@@ -0,0 +1,139 @@
+"""
+Benchmark: the shared sheet ingest core across every bulk import it serves.
+
+For books, e-resources, journals and holidays, builds a CSV sheet of --rows
+rows with a share of invalid ones (a blank required cell, a bad value, a key
+already in the table or repeated in the sheet), uploads it through the
+endpoint with the Flask test client and reports the time spent validating
+and the end-to-end time, rows per second and the created and rejected counts.
+
+Usage:
+    python benchmarks/bench_ingest.py [--rows 20000] [--kinds books,ebooks,journals,holidays]
+"""
+import argparse
+import io
+import random
+import time
+from datetime import date, timedelta
+
+from synthetic import use_temp_database, cleanup_temp_database, synthetic_book_rows, make_name, make_title
+
+# Point the app at a throwaway database before importing it
+use_temp_database()
+
+import pandas as pd  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import (app, db, User, run_migrations, validate_sheet, BOOK_SHEET, EBOOK_SHEET,  # noqa: E402
+                 JOURNAL_SHEET, HOLIDAY_SHEET, EBOOK_TYPES)
+
+
+def book_records(rows, rng):
+    for record in synthetic_book_rows(rows, seed=rng.random()):
+        record = {column: record.get(column) for column in
+                  ('access_no', 'title', 'author_1', 'author_2', 'publisher', 'price', 'pages', 'isbn')}
+        problem = rng.random() < 0.02 and rng.choice(['author_1', 'price', 'repeat'])
+        if problem == 'author_1':
+            record['author_1'] = None
+        elif problem == 'price':
+            record['price'] = 'n/a'
+        elif problem == 'repeat':
+            record['access_no'] = 'B0000000'
+        yield record
+
+
+def ebook_records(rows, rng):
+    for i in range(rows):
+        record = {'access_no': f'E{i:07d}', 'website': f'https://resource{i}.example.org', 'web_title': make_title(rng),
+                  'subject': make_title(rng), 'type': rng.choice(EBOOK_TYPES), 'web_detail': ''}
+        problem = rng.random() < 0.02 and rng.choice(['website', 'type', 'repeat'])
+        if problem == 'website':
+            record['website'] = None
+        elif problem == 'type':
+            record['type'] = 'Magazine'
+        elif problem == 'repeat':
+            record['access_no'] = 'E0000000'
+        yield record
+
+
+def journal_records(rows, rng):
+    for i in range(rows):
+        yield {'journal_name': '' if rng.random() < 0.02 else f'Journal of {make_title(rng)} {i}'}
+
+
+def holiday_records(rows, rng):
+    first = date(2000, 1, 1)
+    for i in range(rows):
+        record = {'name': f'{make_name(rng)} Day', 'date': (first + timedelta(days=i)).isoformat(),
+                  'description': '', 'is_recurring': rng.choice(['yes', 'no'])}
+        problem = rng.random() < 0.02 and rng.choice(['date', 'is_recurring', 'repeat'])
+        if problem == 'date':
+            record['date'] = '2000-02-30'
+        elif problem == 'is_recurring':
+            record['is_recurring'] = 'sometimes'
+        elif problem == 'repeat':
+            record['date'] = first.isoformat()
+        yield record
+
+
+# kind -> (schema, endpoint, form fields, import parameters, sheet rows)
+KINDS = {
+    'books': (BOOK_SHEET, '/api/admin/books/bulk', {'category': 'Engineering'}, {'category': 'Engineering'}, book_records),
+    'ebooks': (EBOOK_SHEET, '/api/admin/ebooks/bulk', {}, {'created_by': 1}, ebook_records),
+    'journals': (JOURNAL_SHEET, '/api/admin/journals/bulk', {'journal_type': 'National Journal'},
+                 {'journal_type': 'National Journal'}, journal_records),
+    'holidays': (HOLIDAY_SHEET, '/api/admin/holidays/bulk', {}, {'created_by': 1}, holiday_records),
+}
+
+
+def created_count(result):
+    for key in ('created_books', 'created_ebooks', 'created_holidays'):
+        if key in result:
+            return len(result[key])
+    return result['journals_created']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--kinds', default=','.join(KINDS))
+    args = parser.parse_args()
+
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        admin = User(user_id='ADMIN', username='admin', name='Admin', email='admin@example.com', role='admin',
+                     designation='admin', dob=date(1980, 1, 1), validity_date=date(2099, 1, 1))
+        admin.set_password('bench')
+        db.session.add(admin)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+
+        print(f"{'kind':<9} {'validate s':>11} {'end-to-end s':>13} {'rows/s':>9} {'created':>9} {'rejected':>9}")
+        for kind in args.kinds.split(','):
+            schema, endpoint, form, params, records = KINDS[kind]
+            df = pd.DataFrame(list(records(args.rows, random.Random(kind))))
+            sheet = df.to_csv(index=False).encode()
+
+            # Validation on its own (nothing in the table yet), then the whole endpoint
+            start = time.perf_counter()
+            validate_sheet(schema, pd.read_csv(io.BytesIO(sheet), dtype=str), **params)
+            validate_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            response = client.post(endpoint, headers=headers, content_type='multipart/form-data',
+                                   data=dict(form, file=(io.BytesIO(sheet), f'{kind}.csv')))
+            total_seconds = time.perf_counter() - start
+            result = response.get_json()
+            if response.status_code not in (200, 201):
+                print(f"{kind:<9} failed: {response.status_code} {result}")
+                continue
+            print(f"{kind:<9} {validate_seconds:>11.2f} {total_seconds:>13.2f} {args.rows / total_seconds:>9,.0f} "
+                  f"{created_count(result):>9,} {len(result['errors']):>9,}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        cleanup_temp_database()
@@ -0,0 +1,85 @@
+"""
+Benchmark: OPAC book search, FTS5 index vs. the legacy LIKE scan.
+
+Builds a synthetic catalogue in a temporary SQLite database and times the
+same searches through both paths (first page of 20 + total count, which is
+what /api/books/search does on every keystroke).
+
+Usage:
+    python benchmarks/bench_opac_search.py [--rows 500000] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+
+from synthetic import use_temp_database, cleanup_temp_database, populate_books
+
+# Point the app at a throwaway database before importing it
+use_temp_database()
+
+from app import app, db, Book, text, setup_books_fts, books_fts_subquery, apply_books_like_search  # noqa: E402
+
+SEARCHES = ['thermodynamics', 'data structures', 'ramanku', 'wiley', 'algor', 'B0123456']
+
+
+def run_like(search):
+    query = apply_books_like_search(Book.query, search)
+    total = query.count()
+    items = query.order_by(Book.title).limit(20).all()
+    return total, items
+
+
+def run_fts(search):
+    fts_match = books_fts_subquery(search)
+    query = Book.query.join(fts_match, fts_match.c.book_id == Book.id)
+    total = query.count()
+    items = query.order_by(fts_match.c.rank, Book.title).limit(20).all()
+    return total, items
+
+
+def timed(fn, search, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        db.session.expire_all()
+        start = time.perf_counter()
+        result = fn(search)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples), result[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+
+        print(f"Generating {args.rows:,} synthetic books...")
+        start = time.perf_counter()
+        populate_books(db, Book, args.rows)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        print("Building books_fts index...")
+        start = time.perf_counter()
+        setup_books_fts()
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+        db.session.execute(text('ANALYZE'))
+
+        print()
+        print(f"{'search':<20} {'LIKE median':>12} {'LIKE max':>10} {'hits':>8}   "
+              f"{'FTS median':>11} {'FTS max':>9} {'hits':>8}  speedup")
+        for search in SEARCHES:
+            like_median, like_max, like_hits = timed(run_like, search, args.repeat)
+            fts_median, fts_max, fts_hits = timed(run_fts, search, args.repeat)
+            print(f"{search:<20} {like_median:>10.1f}ms {like_max:>8.1f}ms {like_hits:>8}   "
+                  f"{fts_median:>9.1f}ms {fts_max:>7.1f}ms {fts_hits:>8}  {like_median / fts_median:>6.1f}x")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        cleanup_temp_database()
@@ -0,0 +1,92 @@
+"""
+Benchmark: search-box autocomplete from the in-memory suggest index.
+
+Builds a synthetic catalogue with skewed circulation history, loads the
+suggest index and times prefix lookups of 1-8 characters taken from real
+titles and author names, reporting build time, index memory and latency
+percentiles.
+
+Usage:
+    python benchmarks/bench_suggest.py [--rows 500000] [--loans 1000000] [--queries 5000] [--memory]
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+
+from synthetic import use_temp_database, cleanup_temp_database, populate_books, populate_circulations
+
+# Point the app at a throwaway database before importing it
+use_temp_database()
+
+from app import app, db, Book, Circulation, build_suggest_index  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--loans', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--memory', action='store_true', help='also measure index memory (slow build under tracemalloc)')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+
+    with app.app_context():
+        db.create_all()
+
+        print(f"Generating {args.rows:,} synthetic books and {args.loans:,} loans...")
+        start = time.perf_counter()
+        populate_books(db, Book, args.rows)
+        populate_circulations(db, Circulation, args.loans, args.rows)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        print("Building suggest index...")
+        start = time.perf_counter()
+        index = build_suggest_index()
+        print(f"  done in {time.perf_counter() - start:.1f}s: {index.stats()}")
+
+        if args.memory:
+            tracemalloc.start()
+            measured = build_suggest_index()
+            retained = sum(stat.size for stat in tracemalloc.take_snapshot().statistics('filename'))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del measured
+            print(f"  index memory: {retained / 2 ** 20:.0f} MiB retained, {peak / 2 ** 20:.0f} MiB peak while building")
+
+        # Prefixes as typed: the first 1-8 characters of a title or author word
+        max_id = db.session.query(db.func.max(Book.id)).scalar()
+        prefixes = []
+        while len(prefixes) < args.queries:
+            book = db.session.get(Book, rng.randint(1, max_id))
+            value = rng.choice([book.title, book.author_1, book.publisher])
+            word = rng.choice(value.split())
+            prefixes.append(word[:rng.randint(1, 8)])
+
+        samples = []
+        empty = 0
+        for prefix in prefixes:
+            start = time.perf_counter()
+            suggestions = index.lookup(prefix, 10)
+            samples.append((time.perf_counter() - start) * 1000)
+            if not suggestions:
+                empty += 1
+
+        print()
+        print(f"lookups: {len(samples)}   e.g. {prefixes[0]!r}, {prefixes[1]!r}, {prefixes[2]!r}")
+        print(f"median {statistics.median(samples):.2f}ms   p95 {percentile(samples, 95):.2f}ms   "
+              f"p99 {percentile(samples, 99):.2f}ms   max {max(samples):.2f}ms   empty {empty}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        cleanup_temp_database()
@@ -0,0 +1,229 @@
+"""
+Backend portability check: exercises the circulation, search, reporting,
+archival and backup paths against a database and reports any endpoint that fails.
+
+With no arguments it runs against a throwaway SQLite file. To check a server
+database, point it at an EMPTY scratch database; every table is dropped
+again at the end unless --keep is given:
+
+    createdb library_check
+    python benchmarks/check_backend.py --database-url postgresql://localhost/library_check
+
+Exits with status 1 if any check fails.
+"""
+import argparse
+import io
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+from synthetic import use_temp_database, cleanup_temp_database, populate_books
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--database-url', help='scratch database to check (default: a temporary SQLite file)')
+parser.add_argument('--keep', action='store_true', help='leave the tables in place afterwards')
+parser.add_argument('--books', type=int, default=500)
+args = parser.parse_args()
+
+tmp_dir = use_temp_database()
+if args.database_url:
+    os.environ['DATABASE_URL'] = args.database_url
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+import app as library  # noqa: E402
+from app import (app, db, Book, User, Fine, Reservation, Circulation, CirculationArchive, run_migrations,  # noqa: E402
+                 archive_history, rebuild_book_authors, refresh_suggest_index, create_sql_backup, InlineExecutor,
+                 set_import_executor)
+
+
+def make_user(user_id, role):
+    return User(user_id=user_id, username=user_id.lower(), name=user_id.title(), email=f'{user_id.lower()}@example.com',
+                password_hash=generate_password_hash('check', method='pbkdf2:sha256:1000'), role=role,
+                designation=role, dob=date(1990, 1, 1), validity_date=date.today() + timedelta(days=365))
+
+
+def main():
+    failures = []
+
+    def check(name, response, expected=200):
+        ok = response.status_code == expected
+        detail = '' if ok else f" -> {response.status_code} {response.get_data(as_text=True)[:200]}"
+        print(f"[{'ok' if ok else 'FAIL':>4}] {name}{detail}")
+        if not ok:
+            failures.append(name)
+        return response.get_json(silent=True)
+
+    with app.app_context():
+        if db.inspect(db.engine).has_table('users') and User.query.first():
+            sys.exit('Refusing to run against a database that already has users; use an empty scratch database')
+        print(f"Backend: {db.engine.dialect.name} ({db.engine.url.render_as_string(hide_password=True)})")
+        db.create_all()
+        run_migrations()
+        try:
+            admin, librarian, student = make_user('ADMIN', 'admin'), make_user('LIB', 'librarian'), make_user('S001', 'student')
+            db.session.add_all([admin, librarian, student])
+            db.session.commit()
+            populate_books(db, Book, args.books)
+            rebuild_book_authors()
+            # Some history in past months, for the monthly report buckets
+            for months_ago in range(1, 4):
+                issued = datetime.utcnow() - timedelta(days=30 * months_ago)
+                circulation = Circulation(user_id=student.id, book_id=months_ago, issue_date=issued,
+                                          due_date=issued + timedelta(days=14), return_date=issued + timedelta(days=20),
+                                          status='returned', fine_amount=6.0)
+                db.session.add(circulation)
+                db.session.flush()
+                db.session.add(Fine(user_id=student.id, circulation_id=circulation.id, amount=6.0, reason='Overdue', status='paid',
+                                    created_date=issued + timedelta(days=20), paid_date=issued + timedelta(days=21),
+                                    created_by=admin.id))
+                db.session.add(Reservation(user_id=student.id, book_id=10 + months_ago, reservation_date=issued,
+                                           expiry_date=issued + timedelta(days=7), status='expired', queue_position=1))
+                # A loan without a fine, old enough to be archived below
+                db.session.add(Circulation(user_id=student.id, book_id=20 + months_ago, issue_date=issued,
+                                           due_date=issued + timedelta(days=14), return_date=issued + timedelta(days=7),
+                                           status='returned', fine_amount=0.0))
+            db.session.commit()
+
+            client = app.test_client()
+            admin_headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+            librarian_headers = {'Authorization': f'Bearer {create_access_token(identity=str(librarian.id))}'}
+
+            title = db.session.get(Book, 1).title
+            check('OPAC search', client.get('/api/books/search', query_string={'search': title.split()[0]}))
+            check('OPAC search, fuzzy', client.get('/api/books/search', query_string={'search': title.split()[0][:-1] + 'x', 'fuzzy': 'true'}))
+            author = check('OPAC author filter', client.get('/api/books/search', query_string={
+                'author': db.session.get(Book, 1).author_1.split()[-1]}))
+            if author is not None and 1 not in [book['id'] for book in author['books']]:
+                print('[FAIL] OPAC author filter missed the book')
+                failures.append('OPAC author filter')
+            check('discover', client.get('/api/discover', query_string={'search': title.split()[0]}))
+            warming = check('suggest while the index loads', client.get('/api/books/suggest', query_string={'q': title[:3]}))
+            if warming is not None and not warming.get('warming'):
+                print('[FAIL] suggest waited for the index build')
+                failures.append('suggest warming')
+            refresh_suggest_index()
+            suggested = check('suggest', client.get('/api/books/suggest', query_string={'q': title[:3]}))
+            if suggested is not None and not suggested['suggestions']:
+                print('[FAIL] suggest found nothing')
+                failures.append('suggest results')
+
+            issued = check('issue book', client.post('/api/admin/circulation/issue', headers=admin_headers, json={
+                'user_id': 'S001', 'book_id': 100, 'due_date': (date.today() + timedelta(days=14)).isoformat()}), 201)
+            if issued and 'circulation' in issued:
+                check('return book', client.post('/api/admin/circulation/return', headers=admin_headers, json={
+                    'circulation_ids': [issued['circulation']['id']]}))
+
+            sheet = ('access_no,title,author_1,publisher,price,pages,isbn\n'
+                     'CHK-1,Check One,Ann Check,Pub,10,100,9780123456789\n'
+                     'CHK-2,Check Two,,Pub,10,100,\n'
+                     'CHK-3,Check Three,Bob Check,Pub,12.5,,\n')
+            imported = check('bulk book import', client.post('/api/admin/books/bulk', headers=admin_headers, data={
+                'category': 'Reference', 'file': (io.BytesIO(sheet.encode()), 'books.csv')}), 201)
+            if imported is not None and (len(imported['created_books']), len(imported['errors'])) != (2, 1):
+                print(f"[FAIL] bulk book import created {len(imported['created_books'])}, rejected {len(imported['errors'])}")
+                failures.append('bulk book import rows')
+            streamed = check('streaming book import', client.post('/api/admin/books/bulk', headers=admin_headers, data={
+                'category': 'Reference', 'stream': 'true',
+                'file': (io.BytesIO(sheet.replace('CHK-', 'STR-').encode()), 'books.csv')}), 201)
+            if streamed is not None and (streamed['created'], streamed['rejected']) != (2, 1):
+                print(f"[FAIL] streaming book import created {streamed['created']}, rejected {streamed['rejected']}")
+                failures.append('streaming book import rows')
+            # Run the job in this thread so its result is there when the request returns
+            set_import_executor(InlineExecutor())
+            queued = check('background book import', client.post('/api/admin/books/bulk', headers=admin_headers, data={
+                'category': 'Reference', 'background': 'true',
+                'file': (io.BytesIO(sheet.replace('CHK-', 'JOB-').encode()), 'books.csv')}), 202)
+            if queued is not None:
+                job = check('import job status', client.get(f"/api/admin/import-jobs/{queued['job']['id']}",
+                                                            headers=admin_headers))
+                if job is not None and (job['job']['status'], job['job']['created'], job['job']['rejected']) != ('done', 2, 1):
+                    print(f"[FAIL] background book import ended {job['job']['status']}: {job['job']['message']}")
+                    failures.append('background book import rows')
+
+            for report_type in ('overview', 'issue_book', 'return_book', 'fine', 'reservation'):
+                check(f'admin analytics: {report_type}', client.get(
+                    '/api/admin/analytics/dashboard', headers=admin_headers, query_string={'reportType': report_type}))
+            check('librarian analytics', client.get('/api/librarian/analytics/dashboard', headers=librarian_headers))
+            check('librarian analytics download', client.get(
+                '/api/librarian/analytics/dashboard/download', headers=librarian_headers, query_string={'format': 'csv'}))
+            for export_format in ('csv', 'xlsx', 'parquet'):
+                exported = client.get('/api/admin/books/export', headers=librarian_headers,
+                                      query_string={'format': export_format})
+                check(f'catalogue export: {export_format}', exported)
+                # Closing the streamed response pops its request context
+                exported.close()
+            exported = client.get('/api/admin/books/export', headers=librarian_headers)
+            exported_rows = exported.get_data(as_text=True).count('\n') - 1
+            exported.close()
+            if exported_rows != Book.query.count():
+                print(f"[FAIL] catalogue export has {exported_rows} rows, not {Book.query.count()}")
+                failures.append('catalogue export rows')
+
+            app.config['ARCHIVE_CIRCULATIONS_AFTER_DAYS'] = 7
+            try:
+                moved = archive_history()
+                print(f"[{'ok' if moved['circulations'] else 'FAIL':>4}] archive history ({moved['circulations']} loans)")
+                if not moved['circulations']:
+                    failures.append('archive history')
+            except Exception as e:
+                db.session.rollback()
+                print(f"[FAIL] archive history -> {e}")
+                failures.append('archive history')
+            since = (date.today() - timedelta(days=120)).isoformat()
+            check('circulation history with archive', client.get(
+                '/api/admin/circulation/history', headers=admin_headers, query_string={'from_date': since}))
+            student_headers = {'Authorization': f'Bearer {create_access_token(identity=str(student.id))}'}
+            borrowed = check('student borrowing history with archive', client.get(
+                '/api/student/borrowing-history', headers=student_headers, query_string={'per_page': 100}))
+            loans = (Circulation.query.filter_by(user_id=student.id).count()
+                     + CirculationArchive.query.filter_by(user_id=student.id).count())
+            if borrowed is not None and borrowed['total'] != loans:
+                print(f"[FAIL] student borrowing history has {borrowed['total']} loans, not {loans}")
+                failures.append('student borrowing history rows')
+            check('member circulation info with archive', client.get(
+                '/api/admin/circulation/user/S001', headers=librarian_headers))
+            check('counter report with archive', client.get(
+                '/api/admin/reports/counter', headers=admin_headers, query_string={'type': 'return', 'from_date': since}))
+            check('admin analytics with archive', client.get(
+                '/api/admin/analytics/dashboard', headers=admin_headers, query_string={'startDate': since}))
+            check('reconcile counters with archive', client.post(
+                '/api/admin/books/circulation-counters/reconcile', headers=admin_headers))
+
+            reporting_queries = []
+            reporting_engine = db.engines['reporting']
+            count_query = lambda *_: reporting_queries.append(1)  # noqa: E731
+            event.listen(reporting_engine, 'before_cursor_execute', count_query)
+            check('counter report (reporting engine)', client.get('/api/admin/reports/counter', headers=admin_headers))
+            event.remove(reporting_engine, 'before_cursor_execute', count_query)
+            print(f"[{'ok' if reporting_queries else 'FAIL':>4}] report routed to the reporting engine "
+                  f"({len(reporting_queries)} queries)")
+            if not reporting_queries:
+                failures.append('reporting routing')
+
+            if args.database_url:
+                # Dump into the scratch directory, where pruning to the last 30 backups can't
+                # delete real ones
+                library.BACKUP_DIR = tmp_dir
+                result = create_sql_backup()
+                print(f"[{'ok' if result['success'] else 'FAIL':>4}] SQL backup"
+                      f"{'' if result['success'] else ' -> ' + result['error']}")
+                if not result['success']:
+                    failures.append('SQL backup')
+        finally:
+            db.session.rollback()
+            if args.database_url and not args.keep:
+                db.drop_all()
+
+    print()
+    print(f"{len(failures)} check(s) failed" if failures else 'All checks passed')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    try:
+        status = main()
+    finally:
+        cleanup_temp_database()
+    sys.exit(status)
@@ -0,0 +1,119 @@
+"""
+Query-plan regression check for the circulation, fine, reservation, gate,
+member, top-books, circulation statistics and author search hot paths.
+
+Runs EXPLAIN QUERY PLAN on the queries the busiest endpoints issue and fails
+(exit status 1) if any of them reads its table with a full scan instead of
+an index search, or sorts where the index should already give the order.
+By default it checks a fresh database built by db.create_all(); pass
+--database to check a copy of an existing database after run_migrations().
+
+Usage:
+    python benchmarks/check_query_plans.py [--database path/to/library.db]
+"""
+import argparse
+import os
+import shutil
+import sys
+from datetime import datetime, date
+
+from synthetic import use_temp_database, cleanup_temp_database
+
+tmp_dir = use_temp_database()
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--database', help='existing SQLite database to check (a copy is migrated, not the original)')
+args = parser.parse_args()
+if args.database:
+    copy = os.path.join(tmp_dir, 'bench.db')
+    shutil.copyfile(args.database, copy)
+
+from app import (app, db, Book, User, Circulation, Fine, Reservation, GateEntryLog,  # noqa: E402
+                 CirculationDailyStat, circulation_stat_filters, author_book_ids, run_migrations)
+
+NOW = datetime(2024, 1, 1)
+
+# (description, table that must be searched through an index, query, whether ORDER BY must come from the index)
+CHECKS = [
+    ("member's issued books", 'circulations',
+     lambda: Circulation.query.filter_by(user_id=1, status='issued'), False),
+    ("book's current circulation", 'circulations',
+     lambda: Circulation.query.filter_by(book_id=1, status='issued'), False),
+    ('overdue sweep', 'circulations',
+     lambda: Circulation.query.filter(Circulation.status == 'issued', Circulation.due_date < NOW), False),
+    ("member's pending fines", 'fines',
+     lambda: Fine.query.filter_by(user_id=1, status='pending'), False),
+    ("circulation's pending fine", 'fines',
+     lambda: Fine.query.filter_by(circulation_id=1, status='pending'), False),
+    ("book's reservation queue", 'reservations',
+     lambda: Reservation.query.filter_by(book_id=1, status='active').order_by(Reservation.queue_position), True),
+    ("member's latest gate entry", 'gate_entry_logs',
+     lambda: GateEntryLog.query.filter_by(user_id=1).order_by(GateEntryLog.created_date.desc()).limit(1), True),
+    ("member's gate entries since a date", 'gate_entry_logs',
+     lambda: GateEntryLog.query.filter(GateEntryLog.user_id == 1, GateEntryLog.created_date >= NOW), False),
+    ('books in a category', 'books',
+     lambda: Book.query.filter(Book.category == 'Engineering'), False),
+    ('most issued books', 'books',
+     lambda: Book.query.order_by(Book.issue_count.desc(), Book.id.desc()).limit(10), True),
+    ("a book's issue rank", 'books',
+     lambda: Book.query.filter(Book.issue_count > 5), False),
+    ('active students', 'users',
+     lambda: User.query.filter(User.role == 'student', User.is_active == True,  # noqa: E712
+                               User.validity_date > date(2024, 1, 1)), False),
+    ('circulation statistics for a period', 'circulation_daily_stats',
+     lambda: CirculationDailyStat.query.filter(*circulation_stat_filters(date(2024, 1, 1), date(2024, 3, 31))), False),
+    ('books by an author', 'book_authors',
+     lambda: Book.query.filter(Book.id.in_(author_book_ids('smith'))), False),
+]
+
+
+def explain(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).all()
+    return [row[-1] for row in rows]
+
+
+def check(table, plan, ordered):
+    """Problems with a plan: a full scan of `table`, or a separate sort step"""
+    problems = []
+    searched = any(line.startswith(f'SEARCH {table} ') for line in plan)
+    if ordered:
+        # ORDER BY ... LIMIT may walk an index in order instead of searching it
+        searched = searched or any(line.startswith((f'SCAN {table} USING INDEX', f'SCAN {table} USING COVERING INDEX'))
+                                   for line in plan)
+    if not searched or any(line == f'SCAN {table}' for line in plan):
+        problems.append(f'{table} is not searched through an index')
+    if ordered and any('USE TEMP B-TREE FOR ORDER BY' in line for line in plan):
+        problems.append('ORDER BY needs a separate sort')
+    return problems
+
+
+def main():
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+
+        for description, table, build_query, ordered in CHECKS:
+            plan = explain(build_query())
+            problems = check(table, plan, ordered)
+            status = 'FAIL' if problems else 'ok'
+            print(f"[{status:>4}] {description}")
+            for line in plan:
+                print(f"         {line}")
+            for problem in problems:
+                print(f"         -> {problem}")
+            failures += bool(problems)
+
+    print()
+    print(f"{len(CHECKS) - failures}/{len(CHECKS)} query plans use their index")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    try:
+        status = main()
+    finally:
+        cleanup_temp_database()
+    sys.exit(status)
@@ -0,0 +1,135 @@
+"""
+Shared helpers for the benchmarks: a throwaway database and a synthetic catalogue.
+
+use_temp_database() must be called before `app` is imported, since the app
+reads DATABASE_URL at import time.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = ['introduction', 'advanced', 'principles', 'applied', 'modern', 'engineering', 'mathematics',
+         'physics', 'chemistry', 'biology', 'computer', 'science', 'data', 'structures', 'algorithms',
+         'database', 'systems', 'networks', 'thermodynamics', 'mechanics', 'electronics', 'circuits',
+         'signals', 'control', 'design', 'analysis', 'management', 'economics', 'statistics', 'calculus']
+SYLLABLES = ['ra', 'man', 'ku', 'mar', 'shi', 'van', 'la', 'ksh', 'mi', 'pri', 'ya', 'ar', 'un', 'na',
+             'ir', 'red', 'dy', 'son', 'wil', 'bro', 'wn', 'das', 'sub', 'ram', 'nat', 'han', 'go', 'pal',
+             'sel', 'vi', 'ka', 'the', 'ven', 'dra', 'jo', 'hn', 'sa', 'rah', 'da', 'vid']
+PUBLISHERS = ['Pearson', 'McGraw Hill', 'Wiley', 'Springer', 'Oxford', 'Cambridge', 'Tata', 'PHI']
+CATEGORIES = ['Engineering', 'Science', 'Management', 'Reference', 'Fiction']
+DEPARTMENTS = ['CSE', 'ECE', 'EEE', 'MECH', 'CIVIL', 'MBA']
+
+_tmp_dir = None
+
+
+def use_temp_database():
+    """Point the app at a fresh SQLite file in a temporary directory"""
+    global _tmp_dir
+    _tmp_dir = tempfile.mkdtemp(prefix='library_bench_')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp_dir, 'bench.db')
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    return _tmp_dir
+
+
+def cleanup_temp_database():
+    if _tmp_dir:
+        shutil.rmtree(_tmp_dir, ignore_errors=True)
+
+
+def make_name(rng):
+    """A made-up two-part name, so the author vocabulary is realistically large"""
+    def part():
+        return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+    return f"{part()} {part()}"
+
+
+def make_title(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(2, 4))]
+    if rng.random() < 0.3:
+        words.append(''.join(rng.choice(SYLLABLES) for _ in range(3)))
+    return ' '.join(words).title()
+
+
+def synthetic_book_rows(rows, seed=42, start=0):
+    """Yield Book column dicts for a synthetic catalogue"""
+    rng = random.Random(seed)
+    for i in range(start, start + rows):
+        first_author = make_name(rng)
+        yield {
+            'access_no': f'B{i:07d}',
+            'title': make_title(rng),
+            'author_1': first_author,
+            'author_2': make_name(rng) if rng.random() < 0.4 else None,
+            'author_3': make_name(rng) if rng.random() < 0.1 else None,
+            'author_4': None,
+            'author': first_author,
+            'publisher': rng.choice(PUBLISHERS),
+            'department': rng.choice(DEPARTMENTS),
+            'category': rng.choice(CATEGORIES),
+            'location': 'A1',
+            'number_of_copies': 1,
+            'available_copies': rng.randint(0, 1),
+            'isbn': f'978{rng.randint(0, 9999999999):010d}',
+            'pages': rng.randint(100, 900),
+            'price': rng.randint(100, 2000),
+            'edition': '1st',
+        }
+
+
+def populate_books(db, Book, rows, seed=42, batch_size=10000):
+    """Bulk insert a synthetic catalogue with executemany"""
+    insert = Book.__table__.insert()
+    batch = []
+    for row in synthetic_book_rows(rows, seed):
+        batch.append(row)
+        if len(batch) == batch_size:
+            db.session.execute(insert, batch)
+            batch = []
+    if batch:
+        db.session.execute(insert, batch)
+    db.session.commit()
+
+
+def synthetic_circulation_rows(rows, book_count, user_count=2000, days=730, seed=42):
+    """Yield Circulation column dicts: skewed book popularity, most loans already returned"""
+    from datetime import datetime, timedelta
+
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+    for _ in range(rows):
+        # A few books account for most loans, like a real library
+        book_id = min(book_count, int(rng.paretovariate(1.2))) if rng.random() < 0.5 else rng.randint(1, book_count)
+        issue_date = now - timedelta(days=rng.uniform(0, days))
+        due_date = issue_date + timedelta(days=14)
+        returned = rng.random() < 0.9
+        return_date = issue_date + timedelta(days=rng.uniform(1, 30)) if returned else None
+        yield {
+            'user_id': rng.randint(1, user_count),
+            'book_id': book_id,
+            'issue_date': issue_date,
+            'due_date': due_date,
+            'return_date': return_date,
+            'status': 'returned' if returned else 'issued',
+            'fine_amount': 0.0,
+            'renewal_count': 0,
+            'max_renewals': 2,
+        }
+
+
+def populate_circulations(db, Circulation, rows, book_count, seed=42, batch_size=10000, **kwargs):
+    """Bulk insert synthetic loans for books 1..book_count"""
+    insert = Circulation.__table__.insert()
+    batch = []
+    for row in synthetic_circulation_rows(rows, book_count, seed=seed, **kwargs):
+        batch.append(row)
+        if len(batch) == batch_size:
+            db.session.execute(insert, batch)
+            batch = []
+    if batch:
+        db.session.execute(insert, batch)
+    db.session.commit()
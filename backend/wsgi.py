@@ -0,0 +1,12 @@
+"""
+WSGI entry point, for serving the app with e.g.
+
+    gunicorn --chdir backend --workers 4 wsgi:app
+
+Unlike importing app (flask commands, scripts), this starts loading the
+suggest index in the background straight away. Run the migrations and
+`flask --app app fail-interrupted-import-jobs` before starting the server.
+"""
+from app import app, start_suggest_index_build
+
+start_suggest_index_build()